@@ -1,20 +1,35 @@
+import hashlib
+import hmac
 import os
+import time
 import uuid
 
-from flask import Flask, Response, redirect, request, send_from_directory
+from flask import Flask, Response, redirect, request, send_from_directory, session
 from flask_cors import CORS
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_wtf.csrf import generate_csrf
+from itsdangerous import BadData
+from itsdangerous.encoding import base64_decode, bytes_to_int
 
+from .assets import init_app as init_assets
+from .cli import mix_cli, model_cli, taste_cli
 from .config import Config
-from .models import User, db
-from .routes import auth_bp, playlist_bp
+from .models import User, db, init_engine
+from .profiler import init_profiler
+from .routes import admin_bp, auth_bp, export_bp, init_playlist_model, playlist_bp
 
 app = Flask(__name__, static_folder="../frontend/dist", static_url_path="/")
+app.config.from_object(Config)
 app.register_blueprint(auth_bp, url_prefix="/api/auth")
 app.register_blueprint(playlist_bp, url_prefix="/api/playlists")
-app.config.from_object(Config)
+app.register_blueprint(export_bp, url_prefix="/api/playlists")
+app.register_blueprint(admin_bp, url_prefix="/api/admin")
+init_profiler(app)
+index_page = init_assets(app)
+app.cli.add_command(model_cli)
+app.cli.add_command(mix_cli)
+app.cli.add_command(taste_cli)
 
 login = LoginManager()
 login.init_app(app)
@@ -34,12 +49,16 @@ def load_user(user_id_str):
 
 
 db.init_app(app)
+init_engine(app)
 
 migrate = Migrate()
 migrate.init_app(app, db)
 
 CORS(app)
 
+if app.config["PRELOAD_MODEL"]:
+    init_playlist_model(app)
+
 
 @app.before_request
 def https_redirect() -> Response | None:
@@ -50,11 +69,65 @@ def https_redirect() -> Response | None:
             return redirect(url, code=code)  # pyright: ignore
 
 
+# Endpoints whose responses never need a CSRF token (and must stay cacheable)
+CSRF_EXEMPT_ENDPOINTS = {"static", "assets"}
+CSRF_MIMETYPES = {"text/html", "application/json"}
+
+
+# Session key holding a fingerprint of the CSRF cookie last issued to it
+CSRF_COOKIE_FINGERPRINT = "_csrf_cookie"
+
+
+def csrf_cookie_fingerprint(token: str) -> str:
+    """Keyed BLAKE2b digest of a CSRF cookie, cheaper than its HMAC check"""
+    key = hashlib.sha256(str(app.config["SECRET_KEY"]).encode()).digest()
+    return hashlib.blake2b(token.encode(), key=key, digest_size=16).hexdigest()
+
+
+def csrf_cookie_is_fresh() -> bool:
+    """
+    Whether the request's CSRF cookie can be kept: it was issued for this
+    session's raw token and its timestamp is not about to expire.
+
+    The cookie is matched to the session by a keyed fingerprint stored when
+    it was issued, and the timestamp is read without checking the signature,
+    so keeping a cookie costs no HMAC verification. Every state-changing
+    request still goes through the full CSRF check.
+    """
+    token = request.cookies.get("csrf_token")
+    if not token or app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token") not in session:
+        return False
+    fingerprint = session.get(CSRF_COOKIE_FINGERPRINT)
+    if not fingerprint or not hmac.compare_digest(
+        fingerprint, csrf_cookie_fingerprint(token)
+    ):
+        return False
+
+    time_limit = app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+    if time_limit is None:
+        return True
+    time_limit = max(time_limit - app.config["CSRF_REFRESH_MARGIN"], 0)
+
+    # itsdangerous tokens end in ".<base64 timestamp>.<signature>"
+    try:
+        issued = bytes_to_int(base64_decode(token.rsplit(".", 2)[1]))
+    except (IndexError, BadData):
+        return False
+    return time.time() - issued < time_limit
+
+
 @app.after_request
 def inject_csrf_token(response: Response) -> Response:
+    if request.endpoint in CSRF_EXEMPT_ENDPOINTS:
+        return response
+    if response.mimetype not in CSRF_MIMETYPES or csrf_cookie_is_fresh():
+        return response
+
+    token = generate_csrf()
+    session[CSRF_COOKIE_FINGERPRINT] = csrf_cookie_fingerprint(token)
     response.set_cookie(
         "csrf_token",
-        generate_csrf(),
+        token,
         secure=True if os.environ.get("FLASK_ENV") == "production" else False,
         samesite="Strict" if os.environ.get("FLASK_ENV") == "production" else None,
         httponly=True,
@@ -67,9 +140,12 @@ def inject_csrf_token(response: Response) -> Response:
 def react_root(path) -> Response:
     if path == "favicon.ico":
         return send_from_directory("public", "favicon.ico")
-    return app.send_static_file("index.html")
+    return index_page.response()
 
 
 @app.errorhandler(404)
-def not_found(e) -> Response:
-    return app.send_static_file("index.html")
+def not_found(e):
+    # A missing fingerprinted asset is a real 404, not a client-side route
+    if request.path.startswith("/assets/"):
+        return e
+    return index_page.response()
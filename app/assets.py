@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+import click
+from flask import Flask, Response, request, send_from_directory
+from werkzeug.utils import safe_join
+
+# Vite fingerprints everything under assets/, so a URL never changes content
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferred first; variants are produced by `flask assets compress`
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+MIN_COMPRESS_SIZE = 1024
+
+
+def accepts_encoding(encoding: str) -> bool:
+    return request.accept_encodings[encoding] > 0
+
+
+class IndexPage:
+    """
+    The SPA shell, kept in memory with a content ETag.
+
+    Every client-side route serves this file, so it is read once (and again
+    only when the build replaces it) instead of going through send_file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mtime: int | None = None
+        self._body = b""
+        self._gzipped = b""
+        self._etag = ""
+
+    def _refresh(self) -> None:
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+
+        with open(self.path, "rb") as f:
+            body = f.read()
+        self._body = body
+        self._gzipped = gzip.compress(body, compresslevel=9)
+        self._etag = hashlib.sha1(body).hexdigest()[:16]
+        self._mtime = mtime
+
+    def response(self) -> Response:
+        self._refresh()
+
+        if accepts_encoding("gzip"):
+            response = Response(self._gzipped, mimetype="text/html")
+            response.headers["Content-Encoding"] = "gzip"
+            response.set_etag(f"{self._etag}-gz")
+        else:
+            response = Response(self._body, mimetype="text/html")
+            response.set_etag(self._etag)
+
+        # Always revalidate: the shell points at the current asset hashes
+        response.headers["Cache-Control"] = "no-cache"
+        response.vary.add("Accept-Encoding")
+        return response.make_conditional(request)
+
+
+def send_asset(directory: str, filename: str) -> Response:
+    """Serve a fingerprinted asset, preferring a precompressed variant"""
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    for encoding, suffix in PRECOMPRESSED:
+        variant = safe_join(directory, filename + suffix)
+        if variant and os.path.isfile(variant) and accepts_encoding(encoding):
+            response = send_from_directory(
+                directory, filename + suffix, mimetype=mimetype
+            )
+            response.headers["Content-Encoding"] = encoding
+            break
+    else:
+        response = send_from_directory(directory, filename)
+
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def compress_directory(directory: str) -> int:
+    """
+    Write .gz (and .br, when brotli is installed) next to compressible files
+
+    Args:
+        directory: Build output directory to walk
+
+    Returns:
+        Number of variant files written
+    """
+    try:
+        import brotli  # pyright: ignore
+    except ImportError:
+        brotli = None
+
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+
+            with open(path, "rb") as f:
+                data = f.read()
+
+            with open(path + ".gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9))
+            written += 1
+
+            if brotli is not None:
+                with open(path + ".br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+                written += 1
+
+    return written
+
+
+def init_app(app: Flask) -> IndexPage:
+    """Register the asset route and CLI commands; returns the shell page"""
+    static_folder = app.static_folder or ""
+    assets_folder = os.path.join(static_folder, "assets")
+    index_page = IndexPage(os.path.join(static_folder, "index.html"))
+
+    @app.route("/assets/<path:filename>")
+    def assets(filename) -> Response:
+        return send_asset(assets_folder, filename)
+
+    @app.cli.group("assets")
+    def assets_cli():
+        """Manage the built frontend assets."""
+
+    @assets_cli.command("compress")
+    def compress_command():
+        """Precompress the frontend build for static serving."""
+        written = compress_directory(static_folder)
+        click.echo(f"Wrote {written} precompressed files in {static_folder}")
+
+    return index_page
@@ -0,0 +1,103 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from .ml.model_store import current_version, list_versions, publish
+
+model_cli = AppGroup("model", help="Train and manage recommendation models.")
+mix_cli = AppGroup("mix", help="Precompute daily mixes.")
+taste_cli = AppGroup("taste", help="Maintain users' taste profiles.")
+
+
+@model_cli.command("train")
+@click.option(
+    "--activate/--no-activate", default=True, help="Point CURRENT at the new model."
+)
+@click.option(
+    "--memory-limit",
+    type=float,
+    help="Fail if serving the model would take more than this many MB "
+    "(default: MODEL_MEMORY_LIMIT_MB).",
+)
+def train_command(activate, memory_limit):
+    """Train a new model version from the CSV datasets."""
+    from .ml.train_model import train_playlist_model
+
+    if memory_limit is None:
+        memory_limit = current_app.config["MODEL_MEMORY_LIMIT_MB"]
+    limit = int(memory_limit * 2**20) if memory_limit else None
+    if not train_playlist_model(
+        activate=activate,
+        memory_limit=limit,
+        scoring_precision=current_app.config["SCORING_PRECISION"],
+    ):
+        raise click.ClickException("No model was saved")
+
+
+@model_cli.command("versions")
+def versions_command():
+    """List trained model versions."""
+    active = current_version()
+    for version in list_versions():
+        marker = "*" if version == active else " "
+        click.echo(f"{marker} {version}")
+
+
+@model_cli.command("activate")
+@click.argument("version")
+def activate_command(version):
+    """Point CURRENT at an existing model version."""
+    publish(version)
+    click.echo(f"Activated model version {version}")
+
+
+@mix_cli.command("refresh")
+@click.option("--force", is_flag=True, help="Recompute mixes that are still fresh.")
+@click.option("--limit", type=int, help="Refresh at most this many users.")
+@click.option("--batch-size", type=int, help="Users per scoring pass.")
+def refresh_mix_command(force, limit, batch_size):
+    """Precompute daily mixes for active users (run off-peak, e.g. from cron)."""
+    from .daily_mix import refresh_daily_mixes
+    from .routes.playlist import daily_mix_options
+
+    options = daily_mix_options(current_app.config)
+    if batch_size:
+        options["batch_size"] = batch_size
+    result = refresh_daily_mixes(force=force, limit=limit, **options)
+    click.echo(
+        f"Refreshed {result['refreshed']} of {result['users']} users "
+        f"({result['skipped']} skipped) in {result['seconds']:.1f}s, "
+        f"{result['scoring_seconds']:.1f}s scoring"
+    )
+
+
+@taste_cli.command("rebuild")
+@click.option(
+    "--all", "rebuild_all", is_flag=True, help="Rebuild current profiles too."
+)
+def rebuild_taste_command(rebuild_all):
+    """Rebuild taste profiles that are missing or built for another model."""
+    from .models import Playlist, UserTaste, db
+    from .routes.playlist import get_generator, rebuild_taste
+
+    generator = get_generator()
+    if generator.tracks_df is None and not generator.load_model():
+        raise click.ClickException("Recommendation model not available")
+
+    users = [user_id for (user_id,) in db.session.query(Playlist.user_id).distinct()]
+    if not rebuild_all:
+        current = {
+            user_id
+            for (user_id,) in db.session.query(UserTaste.user_id).filter(
+                UserTaste.model_version == generator.model_version
+            )
+        }
+        users = [user_id for user_id in users if user_id not in current]
+
+    rebuilt = 0
+    for user_id in users:
+        row = db.session.get(UserTaste, user_id)
+        if rebuild_taste(user_id, generator, row=row) is not None:
+            rebuilt += 1
+        db.session.commit()
+    click.echo(f"Rebuilt {rebuilt} taste profiles for model {generator.model_version}")
@@ -1,13 +1,160 @@
 import os
 
+from sqlalchemy.engine import make_url
+
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def database_uri(uri: str | None) -> str | None:
+    """The database URL in a form SQLAlchemy accepts"""
+    # Heroku-style URLs use a scheme SQLAlchemy no longer accepts
+    if uri and uri.startswith("postgres://"):
+        return uri.replace("postgres://", "postgresql://", 1)
+    return uri
+
+
+def engine_options(uri: str | None) -> dict:
+    """SQLAlchemy engine options for the configured database"""
+    options = {
+        # Compiled statement cache, shared by every connection of the engine
+        "query_cache_size": int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 500)),
+    }
+    if not uri or uri.startswith("sqlite"):
+        # SQLite tuning happens per connection, see app.models.db.init_engine
+        return options
+
+    options.update(
+        pool_size=int(os.environ.get("DB_POOL_SIZE", 5)),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        # Recycle before server or proxy idle timeouts drop the connection
+        pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        pool_pre_ping=env_flag("DB_POOL_PRE_PING", True),
+    )
+    if make_url(uri).get_driver_name() == "psycopg":
+        # psycopg 3 prepares statements server-side after this many executions
+        options["connect_args"] = {
+            "prepare_threshold": int(os.environ.get("DB_PREPARE_THRESHOLD", 5))
+        }
+    return options
+
 
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY")
     FLASK_RUN_PORT = os.environ.get("FLASK_RUN_PORT")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
+    SQLALCHEMY_DATABASE_URI = database_uri(os.environ.get("DATABASE_URL"))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_ECHO = env_flag("SQLALCHEMY_ECHO", True)
+
+    # SQLite only: write-ahead logging with synchronous=NORMAL, and a
+    # memory-mapped read window (bytes, 0 disables)
+    SQLITE_WAL = env_flag("SQLITE_WAL", True)
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+    # Reissue the CSRF cookie once it is this close (in seconds) to expiring
+    CSRF_REFRESH_MARGIN = int(os.environ.get("CSRF_REFRESH_MARGIN", 300))
+
+    # Load the recommendation model at startup instead of on first use. With
+    # `gunicorn --preload` this happens once in the master, and forked workers
+    # share the model's pages copy-on-write.
+    PRELOAD_MODEL = env_flag("PRELOAD_MODEL", False)
+
+    # Candidate pools cached between /generate requests (0 disables the cache)
+    GENERATE_CACHE_SIZE = int(os.environ.get("GENERATE_CACHE_SIZE", 256))
+    GENERATE_CACHE_TTL = float(os.environ.get("GENERATE_CACHE_TTL", 600))
+
+    # Bounded pool for /generate: concurrent jobs, waiting jobs, deadline (s)
+    GENERATE_WORKERS = int(os.environ.get("GENERATE_WORKERS", 2))
+    GENERATE_QUEUE_DEPTH = int(os.environ.get("GENERATE_QUEUE_DEPTH", 8))
+    GENERATE_TIMEOUT = float(os.environ.get("GENERATE_TIMEOUT", 10))
+    GENERATE_RETRY_AFTER = int(os.environ.get("GENERATE_RETRY_AFTER", 2))
+    # Run generation on forked processes instead of threads: whole jobs run
+    # in parallel, each process with its own caches (see app/ml/executor.py)
+    GENERATE_PROCESSES = env_flag("GENERATE_PROCESSES", False)
+
+    # Poll the model CURRENT pointer and hot-swap on change (seconds, 0 = off).
+    # Every worker process polls and swaps its own copy of the model
+    MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 30))
+
+    # Shared secret for /api/admin; the admin routes are disabled when unset
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+    # Default MMR re-ranking trade-off for /generate and /extend (1.0 = pure
+    # relevance, 0.0 = pure novelty); unset leaves re-ranking off
+    GENERATE_MMR_LAMBDA = (
+        float(os.environ["GENERATE_MMR_LAMBDA"])
+        if os.environ.get("GENERATE_MMR_LAMBDA")
+        else None
+    )
+
+    # Storage for the scoring matrix: float64, float32 or quantized (float16
+    # audio block); see app/ml/scoring.py
+    SCORING_PRECISION = os.environ.get("SCORING_PRECISION", "float32")
+
+    # Serving memory budget for `flask model train` (MB, 0 = no limit): a
+    # model whose loaded size would exceed it is not saved
+    MODEL_MEMORY_LIMIT_MB = float(os.environ.get("MODEL_MEMORY_LIMIT_MB", 0))
+
+    # Per-artist/genre TF-IDF components kept between requests
+    QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", 4096))
+
+    # Write-behind saves: /save journals the playlist and returns 202, and a
+    # background worker persists journalled saves in batches
+    SAVE_WRITE_BEHIND = env_flag("SAVE_WRITE_BEHIND", False)
+    SAVE_JOURNAL_DIR = os.environ.get("SAVE_JOURNAL_DIR")  # default: instance/
+    SAVE_BATCH_SIZE = int(os.environ.get("SAVE_BATCH_SIZE", 100))
+    SAVE_FLUSH_INTERVAL = float(os.environ.get("SAVE_FLUSH_INTERVAL", 0.5))
+
+    # Playlist exports: background exports per process, requests in flight
+    # per export, and API roots (point these at app/export/mock_server.py
+    # for local testing)
+    EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", 2))
+    EXPORT_CONCURRENCY = int(os.environ.get("EXPORT_CONCURRENCY", 8))
+    SPOTIFY_API_URL = os.environ.get("SPOTIFY_API_URL")
+    YOUTUBE_API_URL = os.environ.get("YOUTUBE_API_URL")
+
+    # Personalised /generate: share of the candidate ranking taken from the
+    # user's taste profile (0 disables), decay applied per saved playlist, and sparse
+    # components kept per profile
+    TASTE_WEIGHT = float(os.environ.get("TASTE_WEIGHT", 0.3))
+    TASTE_DECAY = float(os.environ.get("TASTE_DECAY", 0.9))
+    TASTE_COMPONENTS = int(os.environ.get("TASTE_COMPONENTS", 256))
+
+    # Daily mixes: precomputed per active user by `flask mix refresh` or,
+    # with DAILY_MIX_SCHEDULE, by an in-process scheduler at DAILY_MIX_HOUR
+    # (local time). Hours for REFRESH_AFTER and TTL.
+    DAILY_MIX_SCHEDULE = env_flag("DAILY_MIX_SCHEDULE", False)
+    DAILY_MIX_HOUR = int(os.environ.get("DAILY_MIX_HOUR", 4))
+    DAILY_MIX_TRACKS = int(os.environ.get("DAILY_MIX_TRACKS", 30))
+    DAILY_MIX_ACTIVE_DAYS = float(os.environ.get("DAILY_MIX_ACTIVE_DAYS", 30))
+    DAILY_MIX_REFRESH_AFTER = float(os.environ.get("DAILY_MIX_REFRESH_AFTER", 20))
+    DAILY_MIX_TTL = float(os.environ.get("DAILY_MIX_TTL", 30))
+    DAILY_MIX_BATCH_SIZE = int(os.environ.get("DAILY_MIX_BATCH_SIZE", 64))
 
-    if SQLALCHEMY_DATABASE_URI:
-        SQLALCHEMY_DATABASE_URI.replace("postgres://", "postgresql://")
+    # Sampled capture of /generate payloads for benchmarks/replay.py: fraction
+    # recorded (0 = off), directory (default instance/traffic/), and rotation
+    TRAFFIC_CAPTURE_RATE = float(os.environ.get("TRAFFIC_CAPTURE_RATE", 0))
+    TRAFFIC_CAPTURE_DIR = os.environ.get("TRAFFIC_CAPTURE_DIR")
+    TRAFFIC_CAPTURE_MAX_BYTES = int(
+        os.environ.get("TRAFFIC_CAPTURE_MAX_BYTES", 10 * 2**20)
+    )
+    TRAFFIC_CAPTURE_BACKUPS = int(os.environ.get("TRAFFIC_CAPTURE_BACKUPS", 5))
 
-    SQLALCHEMY_ECHO = True
+    # Sampling profiler for slow endpoints: fraction of requests profiled (0 =
+    # only admin requests sent with "X-Profile: 1"), sampling interval (s),
+    # where collapsed-stack files go (default instance/profiles/), how many
+    # to keep
+    PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+    PROFILE_ENDPOINTS = os.environ.get(
+        "PROFILE_ENDPOINTS",
+        "playlist.generate_playlist,playlist.save_playlist,playlist.extend_playlist",
+    ).split(",")
+    PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.005))
+    PROFILE_DIR = os.environ.get("PROFILE_DIR")
+    PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 100))
@@ -0,0 +1,201 @@
+import fcntl
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from flask import Flask
+
+from .models import DailyMix, Playlist, db
+
+LOCK_NAME = "daily-mix.lock"
+
+
+def utcnow() -> datetime:
+    """Naive UTC, like the database's CURRENT_TIMESTAMP"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def active_users(since: datetime) -> list:
+    """Users who saved a playlist since the given time"""
+    return [
+        user_id
+        for (user_id,) in db.session.query(Playlist.user_id)
+        .filter(Playlist.created_at >= since)
+        .distinct()
+    ]
+
+
+def refresh_daily_mixes(
+    num_tracks: int = 30,
+    active_days: float = 30,
+    refresh_after: float = 20,
+    ttl: float = 30,
+    batch_size: int = 64,
+    force: bool = False,
+    limit: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Precompute daily mixes for active users; needs an app context
+
+    Users are scored against their taste profiles in batches, one catalog
+    pass per batch (see PlaylistGenerator.recommend_for_tastes). Tracks a
+    user already saved are left out.
+
+    Args:
+        num_tracks: Tracks per mix
+        active_days: Users who saved a playlist in this many days get a mix
+        refresh_after: Hours before an existing mix is recomputed
+        ttl: Hours a mix is served for
+        batch_size: Users per scoring pass
+        force: Recompute every active user's mix
+        limit: Maximum number of users to refresh
+
+    Returns:
+        Counts of users considered, refreshed and skipped, and timing
+    """
+    # The routes import this module, so their helpers are imported on use
+    from .routes.playlist import get_generator, load_taste, owned_catalog_ids
+
+    started = time.perf_counter()
+    now = utcnow()
+    generator = get_generator()
+    if generator.tracks_df is None and not generator.load_model():
+        raise RuntimeError("Recommendation model not available")
+
+    users = active_users(now - timedelta(days=active_days))
+    if not force:
+        fresh = {
+            user_id
+            for (user_id,) in db.session.query(DailyMix.user_id).filter(
+                DailyMix.created_at >= now - timedelta(hours=refresh_after),
+                DailyMix.model_version == generator.model_version,
+            )
+        }
+        users = [user_id for user_id in users if user_id not in fresh]
+    if limit is not None:
+        users = users[:limit]
+
+    refreshed = skipped = 0
+    scoring_seconds = 0.0
+    for start in range(0, len(users), batch_size):
+        batch, tastes, excludes = [], [], []
+        for user_id in users[start : start + batch_size]:
+            taste = load_taste(user_id, generator, rebuild=True)
+            if taste is None:
+                skipped += 1
+                continue
+            batch.append(user_id)
+            tastes.append(taste)
+            excludes.append(generator.rows_for_catalog_ids(owned_catalog_ids(user_id)))
+        if not batch:
+            continue
+
+        scoring_started = time.perf_counter()
+        playlists = generator.recommend_for_tastes(tastes, num_tracks, excludes)
+        scoring_seconds += time.perf_counter() - scoring_started
+
+        catalog_ids = generator.tracks_df["catalog_id"].to_numpy()  # type: ignore
+        for user_id, rows in zip(batch, playlists):
+            if not len(rows):
+                skipped += 1
+                continue
+            mix = db.session.get(DailyMix, user_id) or DailyMix(user_id=user_id)
+            mix.model_version = generator.model_version
+            mix.catalog_ids = catalog_ids[rows].astype("<i8").tobytes()
+            mix.created_at = now
+            mix.expires_at = now + timedelta(hours=ttl)
+            db.session.add(mix)
+            refreshed += 1
+        db.session.commit()
+
+    return {
+        "users": len(users),
+        "refreshed": refreshed,
+        "skipped": skipped,
+        "scoring_seconds": round(scoring_seconds, 3),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class MixScheduler:
+    """
+    Runs refresh_daily_mixes once a day at a fixed local hour.
+
+    Every process may run a scheduler; a file lock in the instance folder
+    lets one of them do the work, and the others find the mixes fresh.
+    """
+
+    def __init__(self, app: Flask, hour: int = 4, **options) -> None:
+        """
+        Args:
+            app: Application whose context the job runs in
+            hour: Local hour (0-23) to run at
+            options: Passed to refresh_daily_mixes
+        """
+        self.app = app
+        self.hour = hour
+        self.options = options
+        self.lock_path = os.path.join(app.instance_path, LOCK_NAME)
+        self._started = False
+        self._start_lock = threading.Lock()
+
+        self.next_run: Optional[float] = None
+        self.last_run: Optional[float] = None
+        self.last_result: Optional[dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        """Start the scheduler thread; idempotent"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="daily-mix", daemon=True).start()
+
+    def seconds_until_next_run(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now()
+        run_at = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+        if run_at <= now:
+            run_at += timedelta(days=1)
+        return (run_at - now).total_seconds()
+
+    def run_once(self) -> Optional[dict[str, Any]]:
+        """Refresh now unless another process holds the lock"""
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            with self.app.app_context():
+                try:
+                    result = refresh_daily_mixes(**self.options)
+                finally:
+                    db.session.remove()
+        self.last_run = time.time()
+        self.last_result = result
+        self.last_error = None
+        self.app.logger.info(f"Daily mixes refreshed: {result}")
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hour": self.hour,
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+    def _run(self) -> None:
+        while True:
+            delay = self.seconds_until_next_run()
+            self.next_run = time.time() + delay
+            time.sleep(delay)
+            try:
+                self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                self.app.logger.error(f"Daily mix refresh failed: {str(e)}")
@@ -0,0 +1,3 @@
+from .client import ExportError, ProviderClient
+from .exporter import ExportState, export_playlist
+from .providers import PROVIDERS, Provider, SpotifyProvider, YouTubeMusicProvider
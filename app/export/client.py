@@ -0,0 +1,138 @@
+import asyncio
+import random
+from typing import Any, Optional
+
+import httpx
+
+
+class ExportError(Exception):
+    """A provider call failed for good (bad token, bad request, retries exhausted)"""
+
+
+class ProviderClient:
+    """
+    Pooled async HTTP client for one provider and one user's token.
+
+    Every request goes through a semaphore, so no more than ``concurrency``
+    calls are in flight however many tasks the exporter starts. A 429 pauses
+    every request on the client until the provider's Retry-After has passed,
+    since provider rate limits are per app and token rather than per call;
+    throttled calls are retried without using up ``max_retries``. 5xx
+    responses and dropped connections are retried with exponential backoff
+    and jitter.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        concurrency: int = 8,
+        max_retries: int = 5,
+        max_throttled: int = 50,
+        backoff: float = 0.5,
+        timeout: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            base_url: Provider API root
+            token: OAuth access token sent as a bearer token
+            concurrency: Maximum requests in flight
+            max_retries: Retries per request after errors before giving up
+            max_throttled: 429s per request before giving up
+            backoff: First retry delay in seconds (429s use Retry-After)
+            timeout: Per-request timeout in seconds
+        """
+        self.max_retries = max_retries
+        self.max_throttled = max_throttled
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # Event-loop time before which nothing is sent
+        self._resume_at = 0.0
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+        )
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+    async def __aenter__(self) -> "ProviderClient":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def request(self, method: str, path: str, **kwargs) -> Any:
+        """
+        Send a request, retrying throttled and failed attempts
+
+        Returns:
+            Decoded JSON body, or None for an empty response
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        throttled = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    while (delay := self._resume_at - loop.time()) > 0:
+                        await asyncio.sleep(delay)
+                    self.requests += 1
+                    response = await self._client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise ExportError(f"{method} {path} failed: {e}") from e
+            else:
+                if response.status_code < 400:
+                    return response.json() if response.content else None
+                if response.status_code == 429:
+                    self.throttled += 1
+                    throttled += 1
+                    if throttled > self.max_throttled:
+                        raise ExportError(
+                            f"{method} {path} throttled {throttled} times"
+                        )
+                    retry_after = _retry_after(response.headers.get("Retry-After"))
+                    if retry_after is None:
+                        retry_after = self.backoff * 2 ** min(throttled - 1, 6)
+                    self._resume_at = max(self._resume_at, loop.time() + retry_after)
+                    self.retries += 1
+                    continue
+                if response.status_code < 500:
+                    raise ExportError(
+                        f"{method} {path} returned {response.status_code}: "
+                        f"{response.text[:200]}"
+                    )
+                if attempt >= self.max_retries:
+                    raise ExportError(
+                        f"{method} {path} still failing after {attempt} retries "
+                        f"({response.status_code})"
+                    )
+
+            # Back off outside the semaphore so failing calls don't hold a slot
+            attempt += 1
+            self.retries += 1
+            delay = self.backoff * 2 ** (attempt - 1)
+            await asyncio.sleep(delay * (1 + random.random() * 0.25))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        return None
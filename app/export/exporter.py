@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+from .client import ProviderClient
+from .providers import Provider
+
+# Searches started together between progress checkpoints
+SEARCH_CHUNK = 50
+
+
+class ExportState:
+    """
+    Resumable progress of one playlist's export to one provider.
+
+    ``matches`` is aligned with the playlist's tracks: None for tracks not
+    searched yet, "" for tracks the provider has no match for, otherwise the
+    provider's item ID. ``added`` counts matched items already appended to
+    the remote playlist, in order.
+    """
+
+    def __init__(
+        self,
+        remote_id: Optional[str] = None,
+        matches: Optional[list[Optional[str]]] = None,
+        added: int = 0,
+        status: str = "pending",
+        error: Optional[str] = None,
+    ) -> None:
+        self.remote_id = remote_id
+        self.matches = matches or []
+        self.added = added
+        self.status = status
+        self.error = error
+
+    @property
+    def matched(self) -> list[str]:
+        return [match for match in self.matches if match]
+
+    def to_dict(self) -> dict[str, Any]:
+        searched = sum(match is not None for match in self.matches)
+        return {
+            "remote_id": self.remote_id,
+            "status": self.status,
+            "error": self.error,
+            "tracks": len(self.matches),
+            "searched": searched,
+            "matched": len(self.matched),
+            "unmatched": searched - len(self.matched),
+            "added": self.added,
+        }
+
+
+async def export_playlist(
+    provider: Provider,
+    client: ProviderClient,
+    title: str,
+    tracks: list[dict[str, Any]],
+    state: ExportState,
+    checkpoint: Callable[[ExportState], None],
+    description: str = "Exported from CueMe",
+) -> ExportState:
+    """
+    Create (or resume) a remote copy of a playlist
+
+    Searches run concurrently, bounded by the client's connection limit.
+    Adds run one batch at a time so the remote playlist keeps the original
+    order. ``checkpoint`` is called after every step that changes the state,
+    so an interrupted export picks up where it stopped.
+
+    Args:
+        provider: Target service
+        client: Client authorised for the user's account on that service
+        title: Remote playlist name
+        tracks: Track dicts with title and artist, in playlist order
+        state: Progress so far; updated in place
+        checkpoint: Persists the state
+
+    Returns:
+        The final state
+
+    Raises:
+        ExportError: A provider call failed after retries; the state holds
+            the progress made before it
+    """
+    if len(state.matches) != len(tracks):
+        # First attempt, or the playlist changed since the last one: the old
+        # remote copy no longer lines up, so start a new one
+        state.remote_id = None
+        state.matches = [None] * len(tracks)
+        state.added = 0
+
+    resuming = state.remote_id is not None
+    state.status = "running"
+    state.error = None
+    if not resuming:
+        state.remote_id = await provider.create_playlist(client, title, description)
+    checkpoint(state)
+    remote_id: str = state.remote_id  # type: ignore
+
+    pending = [i for i, match in enumerate(state.matches) if match is None]
+    for start in range(0, len(pending), SEARCH_CHUNK):
+        chunk = pending[start : start + SEARCH_CHUNK]
+        found = await asyncio.gather(
+            *(provider.search(client, tracks[i]) for i in chunk)
+        )
+        for i, item_id in zip(chunk, found):
+            state.matches[i] = item_id or ""
+        checkpoint(state)
+
+    matched = state.matched
+    if resuming:
+        # A batch may have landed after the last checkpoint was written
+        remote_count = await provider.count(client, remote_id)
+        state.added = max(state.added, min(remote_count, len(matched)))
+
+    while state.added < len(matched):
+        batch = matched[state.added : state.added + provider.add_batch_limit]
+        await provider.add(client, remote_id, batch)
+        state.added += len(batch)
+        checkpoint(state)
+
+    state.status = "done"
+    checkpoint(state)
+    return state
@@ -0,0 +1,295 @@
+"""
+Local stand-in for the Spotify and YouTube Data APIs.
+
+Serves just the calls the exporter makes, under /spotify/v1 and /youtube/v3,
+with a token-bucket rate limit that answers 429 + Retry-After the way the
+real services do, optional latency and optional injected 5xx errors. Point
+the exporter at it with SPOTIFY_API_URL / YOUTUBE_API_URL.
+
+    python -m app.export.mock_server [--port 8765] [--rate 50] [--burst 20]
+        [--latency 0.02] [--error-rate 0]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+SPOTIFY_ADD_LIMIT = 100
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """0 if a token was taken, otherwise seconds until one is available"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class MockProviderServer:
+    """Threaded mock provider; each provider has its own rate limit"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate: float = 50.0,
+        burst: int = 20,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        tokens: Optional[set[str]] = None,
+    ) -> None:
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind; 0 picks a free one
+            rate: Requests per second allowed per provider (0 = unlimited)
+            burst: Bucket size
+            latency: Seconds added to every response
+            error_rate: Fraction of requests answered with a 503
+            tokens: Bearer tokens accepted; None accepts any
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.tokens = tokens
+        self.buckets = {
+            name: TokenBucket(rate, burst) if rate > 0 else None
+            for name in ("spotify", "youtube")
+        }
+        self.playlists: dict[str, list[str]] = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockProviderServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="mock-provider", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def create_playlist(self) -> str:
+        playlist_id = uuid.uuid4().hex[:22]
+        with self.lock:
+            self.playlists[playlist_id] = []
+        return playlist_id
+
+    def add(self, playlist_id: str, items: list[str]) -> bool:
+        with self.lock:
+            if playlist_id not in self.playlists:
+                return False
+            self.playlists[playlist_id].extend(items)
+            return True
+
+    def count(self, playlist_id: str) -> Optional[int]:
+        with self.lock:
+            items = self.playlists.get(playlist_id)
+            return None if items is None else len(items)
+
+
+def _item_id(query: str) -> Optional[str]:
+    """Deterministic fake match; queries mentioning 'nomatch' find nothing"""
+    if "nomatch" in query.lower():
+        return None
+    return hashlib.sha1(query.encode()).hexdigest()[:22]
+
+
+def _handler(server: MockProviderServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            self.dispatch("GET")
+
+        def do_POST(self) -> None:
+            self.dispatch("POST")
+
+        def send(self, status: int, body: Any, headers: Optional[dict] = None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def dispatch(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            url = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            provider, _, path = url.path.lstrip("/").partition("/")
+
+            with server.lock:
+                server.requests += 1
+            if server.latency:
+                time.sleep(server.latency)
+
+            if provider not in server.buckets:
+                return self.send(404, {"error": "Unknown provider"})
+            scheme, _, token = self.headers.get("Authorization", "").partition(" ")
+            if scheme != "Bearer" or not token:
+                return self.send(401, {"error": "Missing token"})
+            if server.tokens is not None and token not in server.tokens:
+                return self.send(401, {"error": "Invalid token"})
+
+            bucket = server.buckets[provider]
+            wait = bucket.take() if bucket else 0.0
+            if wait:
+                with server.lock:
+                    server.throttled += 1
+                return self.send(
+                    429, {"error": "Rate limited"}, {"Retry-After": f"{wait:.3f}"}
+                )
+            if server.error_rate and random.random() < server.error_rate:
+                return self.send(503, {"error": "Injected failure"})
+
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                return self.send(400, {"error": "Invalid JSON"})
+
+            route = SPOTIFY_ROUTES if provider == "spotify" else YOUTUBE_ROUTES
+            for route_method, pattern, view in route:
+                match = re.fullmatch(pattern, path)
+                if match and route_method == method:
+                    status, result = view(server, query, body, *match.groups())
+                    return self.send(status, result)
+            self.send(404, {"error": "Not found"})
+
+    return Handler
+
+
+def _spotify_me(server, query, body):
+    return 200, {"id": "mock-user"}
+
+
+def _spotify_create(server, query, body, user_id):
+    return 201, {"id": server.create_playlist(), "name": body.get("name")}
+
+
+def _spotify_search(server, query, body):
+    item_id = _item_id(query.get("q", ""))
+    items = [{"uri": f"spotify:track:{item_id}"}] if item_id else []
+    return 200, {"tracks": {"items": items}}
+
+
+def _spotify_add(server, query, body, playlist_id):
+    uris = body.get("uris") or []
+    if len(uris) > SPOTIFY_ADD_LIMIT:
+        return 400, {"error": f"At most {SPOTIFY_ADD_LIMIT} uris per request"}
+    if not server.add(playlist_id, uris):
+        return 404, {"error": "Unknown playlist"}
+    return 201, {"snapshot_id": uuid.uuid4().hex}
+
+
+def _spotify_playlist(server, query, body, playlist_id):
+    count = server.count(playlist_id)
+    if count is None:
+        return 404, {"error": "Unknown playlist"}
+    return 200, {"tracks": {"total": count}}
+
+
+def _youtube_create(server, query, body):
+    return 200, {"id": server.create_playlist(), "snippet": body.get("snippet")}
+
+
+def _youtube_search(server, query, body):
+    item_id = _item_id(query.get("q", ""))
+    items = [{"id": {"kind": "youtube#video", "videoId": item_id}}] if item_id else []
+    return 200, {"items": items}
+
+
+def _youtube_insert(server, query, body):
+    snippet = body.get("snippet", {})
+    video_id = snippet.get("resourceId", {}).get("videoId")
+    if not video_id:
+        return 400, {"error": "Missing videoId"}
+    if not server.add(snippet.get("playlistId"), [video_id]):
+        return 404, {"error": "Unknown playlist"}
+    return 200, {"id": uuid.uuid4().hex}
+
+
+def _youtube_items(server, query, body):
+    count = server.count(query.get("playlistId", ""))
+    if count is None:
+        return 404, {"error": "Unknown playlist"}
+    return 200, {"items": [], "pageInfo": {"totalResults": count}}
+
+
+SPOTIFY_ROUTES = [
+    ("GET", r"v1/me", _spotify_me),
+    ("POST", r"v1/users/([^/]+)/playlists", _spotify_create),
+    ("GET", r"v1/search", _spotify_search),
+    ("POST", r"v1/playlists/([^/]+)/tracks", _spotify_add),
+    ("GET", r"v1/playlists/([^/]+)", _spotify_playlist),
+]
+
+YOUTUBE_ROUTES = [
+    ("POST", r"v3/playlists", _youtube_create),
+    ("GET", r"v3/search", _youtube_search),
+    ("POST", r"v3/playlistItems", _youtube_insert),
+    ("GET", r"v3/playlistItems", _youtube_items),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockProviderServer(
+        args.host, args.port, args.rate, args.burst, args.latency, args.error_rate
+    )
+    print(f"Mock providers on {server.url}/spotify/v1 and {server.url}/youtube/v3")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from .client import ProviderClient
+
+
+class Provider(ABC):
+    """
+    One streaming service's API, expressed as the four calls an export
+    needs. ``add_batch_limit`` is the most items a single add call accepts.
+    """
+
+    name: str
+    default_url: str
+    add_batch_limit: int
+
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        self.base_url = base_url or self.default_url
+
+    @abstractmethod
+    async def create_playlist(
+        self, client: ProviderClient, title: str, description: str
+    ) -> str:
+        """Create an empty remote playlist and return its ID"""
+
+    @abstractmethod
+    async def search(
+        self, client: ProviderClient, track: dict[str, Any]
+    ) -> Optional[str]:
+        """Remote ID of the best match for a track, or None"""
+
+    @abstractmethod
+    async def add(
+        self, client: ProviderClient, playlist_id: str, item_ids: list[str]
+    ) -> None:
+        """Append items (at most add_batch_limit) to a remote playlist"""
+
+    @abstractmethod
+    async def count(self, client: ProviderClient, playlist_id: str) -> int:
+        """Number of items in a remote playlist"""
+
+
+class SpotifyProvider(Provider):
+    name = "spotify"
+    default_url = "https://api.spotify.com/v1"
+    add_batch_limit = 100
+
+    async def create_playlist(self, client, title, description):
+        me = await client.request("GET", "/me")
+        playlist = await client.request(
+            "POST",
+            f"/users/{me['id']}/playlists",
+            json={"name": title, "description": description, "public": False},
+        )
+        return playlist["id"]
+
+    async def search(self, client, track):
+        query = f'track:"{track["title"]}" artist:"{track["artist"]}"'
+        result = await client.request(
+            "GET", "/search", params={"q": query, "type": "track", "limit": 1}
+        )
+        items = result.get("tracks", {}).get("items", [])
+        return items[0]["uri"] if items else None
+
+    async def add(self, client, playlist_id, item_ids):
+        await client.request(
+            "POST", f"/playlists/{playlist_id}/tracks", json={"uris": item_ids}
+        )
+
+    async def count(self, client, playlist_id):
+        result = await client.request(
+            "GET", f"/playlists/{playlist_id}", params={"fields": "tracks.total"}
+        )
+        return int(result["tracks"]["total"])
+
+
+class YouTubeMusicProvider(Provider):
+    """YouTube Music playlists, through the YouTube Data API"""
+
+    name = "youtube"
+    default_url = "https://www.googleapis.com/youtube/v3"
+    # playlistItems.insert takes one video per call
+    add_batch_limit = 1
+
+    async def create_playlist(self, client, title, description):
+        playlist = await client.request(
+            "POST",
+            "/playlists",
+            params={"part": "snippet,status"},
+            json={
+                "snippet": {"title": title, "description": description},
+                "status": {"privacyStatus": "private"},
+            },
+        )
+        return playlist["id"]
+
+    async def search(self, client, track):
+        result = await client.request(
+            "GET",
+            "/search",
+            params={
+                "part": "snippet",
+                "type": "video",
+                "videoCategoryId": "10",  # Music
+                "maxResults": 1,
+                "q": f"{track['artist']} - {track['title']}",
+            },
+        )
+        items = result.get("items", [])
+        return items[0]["id"]["videoId"] if items else None
+
+    async def add(self, client, playlist_id, item_ids):
+        for video_id in item_ids:
+            await client.request(
+                "POST",
+                "/playlistItems",
+                params={"part": "snippet"},
+                json={
+                    "snippet": {
+                        "playlistId": playlist_id,
+                        "resourceId": {"kind": "youtube#video", "videoId": video_id},
+                    }
+                },
+            )
+
+    async def count(self, client, playlist_id):
+        result = await client.request(
+            "GET",
+            "/playlistItems",
+            params={"part": "id", "playlistId": playlist_id, "maxResults": 0},
+        )
+        return int(result["pageInfo"]["totalResults"])
+
+
+PROVIDERS: dict[str, type[Provider]] = {
+    SpotifyProvider.name: SpotifyProvider,
+    YouTubeMusicProvider.name: YouTubeMusicProvider,
+}
@@ -0,0 +1,333 @@
+import hashlib
+import re
+from bisect import bisect_left
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+_WHITESPACE = re.compile(r"\s+")
+
+# NOTE: The Spotify export joins collaborating artists with ";"
+ARTIST_SEPARATOR = ";"
+# Joins the labels of tracks merged during deduplication
+GENRE_SEPARATOR = "|"
+
+
+def normalize_name(value: object) -> str:
+    """Normalise an artist or genre name for index lookups"""
+    if not isinstance(value, str):
+        return ""
+    return _WHITESPACE.sub(" ", value).strip().casefold()
+
+
+def catalog_id(artist: object, title: object) -> int:
+    """
+    Stable 64-bit catalog ID for a track, derived from its normalised artist
+    and title so it survives retraining. Signed, to fit a BIGINT column.
+    """
+    key = f"{normalize_name(artist)}\x1f{normalize_name(title)}".encode()
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _trigrams(value: str) -> set[str]:
+    return {value[i : i + 3] for i in range(len(value) - 2)}
+
+
+def _padded_trigrams(value: str) -> set[str]:
+    # Padding gives word edges their own trigrams, as pg_trgm does, so short
+    # names still share enough of them with a misspelling
+    return _trigrams(f"  {value} ")
+
+
+class TermIndex:
+    """
+    Posting lists from normalised terms to the catalog rows that carry them.
+
+    Terms are kept sorted so the same structure serves exact lookups, prefix
+    ranges and (through the trigram map) substring and misspelt matches.
+    Postings are stored CSR-style: the rows for term ``i`` are
+    ``rows[offsets[i]:offsets[i + 1]]``.
+    """
+
+    keys: list[str]
+    labels: list[str]
+    offsets: np.ndarray
+    rows: np.ndarray
+    trigrams: dict[str, np.ndarray]
+    trigram_counts: np.ndarray
+
+    def __init__(self, terms: pd.Series, names: Optional[pd.Series] = None) -> None:
+        """
+        Args:
+            terms: Normalised term per catalog row, indexed by row id. A row may
+                appear several times (e.g. after exploding multi-artist tracks).
+            names: Original spelling aligned with ``terms``; the most common
+                spelling of each term is used as its display label
+        """
+        keep = (terms != "").to_numpy()
+        terms = terms[keep]
+        codes, uniques = pd.factorize(terms, sort=True)
+        order = np.argsort(codes, kind="stable")
+
+        self.keys = list(uniques)
+        self.labels = self.keys
+        if names is not None:
+            spellings = pd.DataFrame(
+                {"term": terms.to_numpy(), "name": names.to_numpy()[keep]}
+            )
+            most_common = (
+                spellings.value_counts()
+                .reset_index()
+                .drop_duplicates("term")
+                .set_index("term")["name"]
+            )
+            self.labels = most_common.reindex(self.keys).astype(str).tolist()
+
+        self.rows = terms.index.to_numpy()[order].astype(np.int32)
+        self.offsets = np.zeros(len(self.keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(self.keys)), out=self.offsets[1:])
+
+        trigram_lists: dict[str, list[int]] = {}
+        self.trigram_counts = np.zeros(len(self.keys), dtype=np.int32)
+        for key_id, key in enumerate(self.keys):
+            grams = _padded_trigrams(key)
+            self.trigram_counts[key_id] = len(grams)
+            for gram in grams:
+                trigram_lists.setdefault(gram, []).append(key_id)
+        self.trigrams = {
+            gram: np.array(ids, dtype=np.int32) for gram, ids in trigram_lists.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def counts(self) -> np.ndarray:
+        """Number of catalog rows per term, aligned with ``keys``"""
+        return np.diff(self.offsets)
+
+    def prefix_range(self, prefix: str) -> tuple[int, int]:
+        """Half-open range of term ids starting with the normalised prefix"""
+        key = normalize_name(prefix)
+        low = bisect_left(self.keys, key)
+        high = bisect_left(self.keys, key + "\U0010ffff", lo=low)
+        return low, high
+
+    def top_by_prefix(self, prefix: str, limit: int) -> list[tuple[str, int]]:
+        """
+        Most common terms starting with the prefix
+
+        Args:
+            prefix: Free-text prefix
+            limit: Maximum number of terms to return
+
+        Returns:
+            (label, track count) pairs, most tracks first
+        """
+        low, high = self.prefix_range(prefix)
+        if low >= high or limit <= 0:
+            return []
+
+        counts = self.offsets[low + 1 : high + 1] - self.offsets[low:high]
+        if high - low > limit:
+            top = np.argpartition(-counts, limit - 1)[:limit]
+        else:
+            top = np.arange(high - low)
+        top = top[np.argsort(-counts[top], kind="stable")]
+        return [(self.labels[low + i], int(counts[i])) for i in top]
+
+    def top_similar(
+        self, query: str, limit: int, threshold: float = 0.3
+    ) -> list[tuple[str, int]]:
+        """
+        Terms spelt like the query, for typos: trigram similarity (shared
+        over combined trigrams) of at least ``threshold``
+
+        Returns:
+            (label, track count) pairs, most similar first
+        """
+        key = normalize_name(query)
+        if not key or limit <= 0:
+            return []
+
+        grams = _padded_trigrams(key)
+        hits = [self.trigrams[gram] for gram in grams if gram in self.trigrams]
+        if not hits:
+            return []
+        key_ids, shared = np.unique(np.concatenate(hits), return_counts=True)
+        similarity = shared / (len(grams) + self.trigram_counts[key_ids] - shared)
+
+        keep = similarity >= threshold
+        key_ids, similarity = key_ids[keep], similarity[keep]
+        counts = self.offsets[key_ids + 1] - self.offsets[key_ids]
+        top = np.lexsort((-counts, -similarity))[:limit]
+        return [(self.labels[key_ids[i]], int(counts[i])) for i in top]
+
+    def postings(self, key_ids: Iterable[int]) -> np.ndarray:
+        """Union of the rows for the given term ids"""
+        parts = [self.rows[self.offsets[i] : self.offsets[i + 1]] for i in key_ids]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(parts))
+
+    def exact(self, query: str) -> np.ndarray:
+        """Rows whose term equals the normalised query"""
+        key = normalize_name(query)
+        key_id = self._find(key)
+        if key_id is None:
+            return np.empty(0, dtype=np.int32)
+        return self.postings([key_id])
+
+    def containing(self, query: str) -> np.ndarray:
+        """Rows whose term contains the normalised query as a substring"""
+        return self.postings(self.matching_keys(query))
+
+    def matching_keys(self, query: str) -> list[int]:
+        """Ids of the terms containing the normalised query as a substring"""
+        key = normalize_name(query)
+        if not key:
+            return []
+        return self._matching_keys(key)
+
+    def posting_count(self, key_ids: Iterable[int]) -> int:
+        """Total length of the terms' posting lists; rows may repeat across terms"""
+        return sum(int(self.offsets[i + 1] - self.offsets[i]) for i in key_ids)
+
+    def _find(self, key: str) -> Optional[int]:
+        pos = bisect_left(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            return pos
+        return None
+
+    def _matching_keys(self, key: str) -> list[int]:
+        if len(key) < 3:
+            # Too short for trigrams, but the vocabulary is far smaller than the catalog
+            return [i for i, term in enumerate(self.keys) if key in term]
+
+        candidates: Optional[np.ndarray] = None
+        for gram in sorted(_trigrams(key), key=lambda g: len(self.trigrams.get(g, ()))):
+            ids = self.trigrams.get(gram)
+            if ids is None:
+                return []
+            candidates = (
+                ids
+                if candidates is None
+                else np.intersect1d(candidates, ids, assume_unique=True)
+            )
+            if len(candidates) == 0:
+                return []
+
+        # Trigram hits are only candidates, e.g. "abcab" for "cabc"
+        return [int(i) for i in candidates if key in self.keys[i]]  # type: ignore
+
+
+class CatalogIndex:
+    """Artist and genre posting lists over the rows of ``tracks_df``"""
+
+    artists: TermIndex
+    genres: TermIndex
+
+    def __init__(self, tracks_df: pd.DataFrame) -> None:
+        # Posting lists hold positional row ids, whatever the frame's index is
+        tracks_df = tracks_df.reset_index(drop=True)
+        artist_names = (
+            tracks_df["artist"]
+            .fillna("")
+            .astype(str)
+            .str.split(ARTIST_SEPARATOR)
+            .explode()
+            .str.strip()
+        )
+        self.artists = TermIndex(artist_names.map(normalize_name), artist_names)
+
+        if "genres" in tracks_df.columns or "genre" in tracks_df.columns:
+            genre_column = tracks_df.get("genres", tracks_df.get("genre"))
+            genre_names = (
+                genre_column.fillna("")  # type: ignore
+                .astype(str)
+                .str.split(GENRE_SEPARATOR)
+                .explode()
+                .str.strip()
+            )
+        else:
+            genre_names = pd.Series([], dtype=object)
+        self.genres = TermIndex(genre_names.map(normalize_name), genre_names)
+
+        print(
+            f"Built catalog index with {len(self.artists)} artists and {len(self.genres)} genres"
+        )
+
+    def candidates(self, artists: list[str], genres: list[str]) -> np.ndarray:
+        """
+        Rows matching any requested artist or genre (substring match)
+
+        Args:
+            artists: Free-text artist names
+            genres: Free-text genre names
+
+        Returns:
+            Sorted array of row ids
+        """
+        parts = [self.artists.containing(artist) for artist in artists]
+        parts += [self.genres.containing(genre) for genre in genres]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(parts))
+
+    def candidates_up_to(
+        self, artists: list[str], genres: list[str], max_rows: int
+    ) -> Optional[np.ndarray]:
+        """
+        candidates(), or None when the matching posting lists hold more than
+        max_rows rows between them; that is checked before any are merged
+
+        Args:
+            artists: Free-text artist names
+            genres: Free-text genre names
+            max_rows: Largest union worth materialising
+        """
+        matches = [(self.artists, self.artists.matching_keys(a)) for a in artists]
+        matches += [(self.genres, self.genres.matching_keys(g)) for g in genres]
+        if sum(index.posting_count(ids) for index, ids in matches) > max_rows:
+            return None
+        parts = [index.postings(ids) for index, ids in matches]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(parts))
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Autocomplete artist and genre names by prefix, ranked by track count.
+        Slots the prefix matches leave free go to names spelt like the query,
+        so a typo still finds the name meant.
+
+        Args:
+            query: Free-text prefix typed by the user
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of suggestion dictionaries with name, type and track_count
+        """
+        if not normalize_name(query):
+            return []
+
+        indexes = (("artist", self.artists), ("genre", self.genres))
+        suggestions = [
+            {"name": name, "type": kind, "track_count": count}
+            for kind, index in indexes
+            for name, count in index.top_by_prefix(query, limit)
+        ]
+        suggestions.sort(key=lambda s: s["track_count"], reverse=True)
+        suggestions = suggestions[:limit]
+
+        if len(suggestions) < limit:
+            seen = {(s["type"], s["name"]) for s in suggestions}
+            for kind, index in indexes:
+                for name, count in index.top_similar(query, limit):
+                    if len(suggestions) < limit and (kind, name) not in seen:
+                        seen.add((kind, name))
+                        suggestions.append(
+                            {"name": name, "type": kind, "track_count": count}
+                        )
+        return suggestions
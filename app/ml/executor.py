@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the queue is full"""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a job does not finish within its deadline"""
+
+
+class GenerationExecutor:
+    """
+    Runs CPU-bound generator calls on a bounded pool with admission control.
+
+    Thread workers share the loaded (read-only) model instead of each
+    holding a copy, but only the parts of a job that release the GIL (the
+    sparse and BLAS kernels) run in parallel. Process workers are forked
+    from the web worker, so they start with its model in shared
+    copy-on-write pages, and whole jobs run in parallel across cores. The
+    calling thread waits for the result either way; the pool caps how many
+    generations run at once, so the request threads serving auth and
+    static files stay free. Jobs beyond ``workers + queue_depth`` are
+    refused right away instead of queueing without limit.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_depth: int = 8,
+        timeout: float = 10.0,
+        processes: bool = False,
+    ) -> None:
+        """
+        Args:
+            workers: Number of generations allowed to run concurrently
+            queue_depth: Number of jobs allowed to wait for a worker
+            timeout: Default per-job deadline in seconds
+            processes: Run jobs on forked processes instead of threads; jobs
+                and their arguments must then be picklable
+        """
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.processes = processes
+        self._pool: Optional[Executor] = None
+        self._pool_pid: Optional[int] = None
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run ``fn`` on the pool and wait for its result
+
+        Raises:
+            ExecutorSaturated: No worker or queue slot is free
+            DeadlineExceeded: The job did not finish before the deadline
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorSaturated("Playlist generation queue is full")
+
+        try:
+            future = self._get_pool().submit(fn, *args, **kwargs)
+        except BaseException as e:
+            self._slots.release()
+            self._discard_broken_pool(e)
+            raise
+
+        with self._lock:
+            self.in_flight += 1
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError as e:
+            # Queued jobs are dropped; a running job finishes and frees its slot
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise DeadlineExceeded("Playlist generation timed out") from e
+        except BrokenProcessPool as e:
+            self._discard_broken_pool(e)
+            raise
+
+    def reset(self) -> None:
+        """
+        Retire the pool; the next job starts a new one. Process workers are
+        then forked again, from this process as it is now (e.g. with a newly
+        swapped-in model). Jobs already on the old pool still finish there.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+            owned = self._pool_pid == os.getpid()
+        if pool is not None and owned:
+            pool.shutdown(wait=False)
+
+    def _discard_broken_pool(self, error: BaseException) -> None:
+        # A worker process died; the next job starts a fresh pool
+        if isinstance(error, BrokenProcessPool):
+            with self._lock:
+                self._pool = None
+
+    def _get_pool(self) -> Executor:
+        # Created on first use, so web workers forked after setup (gunicorn
+        # --preload) each start their own pool
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                if self.processes:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("fork"),
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="playlist-generator",
+                    )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if not future.cancelled():
+                self.completed += 1
+        self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "processes": self.processes,
+                "queue_depth": self.queue_depth,
+                "timeout": self.timeout,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
@@ -0,0 +1,197 @@
+import sys
+import types
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+from scipy.sparse import issparse
+
+if TYPE_CHECKING:
+    from .playlist_generator import PlaylistGenerator
+
+MemoryReport = dict[str, dict[str, int]]
+
+_UNSIZED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+_SCALARS = frozenset({str, bytes, int, float, bool, type(None)})
+
+
+def _sizeof_items(items, seen: dict[int, Any]) -> int:
+    # Catalogs hold hundreds of thousands of strings and ints; size those
+    # inline rather than through a recursive call each
+    size = 0
+    for item in items:
+        if type(item) in _SCALARS:
+            if id(item) not in seen:
+                seen[id(item)] = item
+                size += sys.getsizeof(item)
+        else:
+            size += sizeof(item, seen)
+    return size
+
+
+def sizeof(obj: Any, seen: Optional[dict[int, Any]] = None) -> int:
+    """
+    Deep size in bytes of containers, strings, numpy arrays and sparse
+    matrices. Objects already in ``seen`` count as zero, so structures that
+    share strings or arrays are not counted twice.
+    """
+    seen = {} if seen is None else seen
+    if id(obj) in seen or isinstance(obj, _UNSIZED):
+        return 0
+    # Holding on to what was counted keeps temporaries, e.g. the arrays
+    # KDTree.get_arrays() returns, from freeing their ids for reuse
+    seen[id(obj)] = obj
+
+    if isinstance(obj, np.ndarray):
+        size = obj.nbytes
+        if obj.dtype == object:
+            size += _sizeof_items(obj.ravel().tolist(), seen)
+        return size
+    if issparse(obj):
+        return sum(
+            sizeof(getattr(obj, name), seen)
+            for name in ("data", "indices", "indptr", "coords")
+            if hasattr(obj, name)
+        )
+    if hasattr(obj, "get_arrays"):
+        # KDTree keeps its arrays out of __dict__
+        return sum(sizeof(array, seen) for array in obj.get_arrays())
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += _sizeof_items(obj.keys(), seen) + _sizeof_items(obj.values(), seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += _sizeof_items(obj, seen)
+    elif hasattr(obj, "__dict__"):
+        size += sizeof(vars(obj), seen)
+    return size
+
+
+def _block_bytes(matrix, blocks: dict[str, tuple[int, int]]) -> dict[str, int]:
+    """Bytes of each column block of a dense or CSR matrix"""
+    if isinstance(matrix, np.ndarray):
+        rows = matrix.shape[0]
+        return {
+            name: rows * (stop - start) * matrix.itemsize
+            for name, (start, stop) in blocks.items()
+        }
+    entry = matrix.data.itemsize + matrix.indices.itemsize
+    sizes = {
+        name: int(np.count_nonzero((matrix.indices >= start) & (matrix.indices < stop)))
+        * entry
+        for name, (start, stop) in blocks.items()
+    }
+    sizes["indptr"] = matrix.indptr.nbytes
+    return sizes
+
+
+def model_memory(generator: "PlaylistGenerator") -> MemoryReport:
+    """
+    Bytes held by each part of a loaded (or freshly trained) model
+
+    Sections cover the track table per column, the scoring matrix (and the
+    raw feature matrix, while it is held) per column block (audio, genre one-hot, TF-IDF text), the
+    vectorizer, the encoders, the lookup indexes and the columnar copies
+    built for serving. Strings and arrays shared between sections are
+    counted once, in the first section that holds them.
+    """
+    seen: dict[int, Any] = {}
+    report: MemoryReport = {}
+
+    df = generator.tracks_df
+    if df is not None:
+        tracks = {"index": int(df.index.memory_usage(deep=True))}
+        for column in df.columns:
+            series = df[column]
+            if series.dtype == object:
+                tracks[str(column)] = sizeof(series.to_numpy(), seen)
+            else:
+                tracks[str(column)] = int(series.memory_usage(index=False, deep=True))
+        report["tracks_df"] = tracks
+
+    scoring = generator.scoring_matrix
+    matrix = generator.feature_matrix
+    shape = scoring.shape if scoring is not None else getattr(matrix, "shape", None)
+    if shape is not None:
+        audio_dims = scoring.audio_dims if scoring is not None else 0
+        genre_dims = (
+            len(generator.genre_encoder.categories_[0])
+            if generator.genre_encoder is not None
+            else 0
+        )
+        blocks = {
+            "audio": (0, audio_dims),
+            "genre": (audio_dims, audio_dims + genre_dims),
+            "text": (audio_dims + genre_dims, shape[1]),
+        }
+        # Only present while training, or when kept for benchmarks
+        if matrix is not None:
+            report["feature_matrix"] = _block_bytes(matrix, blocks)
+
+        if scoring is not None:
+            if scoring.audio is not None:
+                # Quantized: a dense audio block beside the sparse remainder
+                shifted = {
+                    name: (start - audio_dims, stop - audio_dims)
+                    for name, (start, stop) in blocks.items()
+                    if name != "audio"
+                }
+                sizes = {"audio": scoring.audio.nbytes}
+                sizes.update(_block_bytes(scoring.sparse, shifted))
+            else:
+                sizes = _block_bytes(scoring.sparse, blocks)
+            report[f"scoring_matrix ({scoring.precision})"] = sizes
+
+    vectorizer = generator.vectorizer
+    if vectorizer is not None:
+        report["vectorizer"] = {
+            "vocabulary": sizeof(getattr(vectorizer, "vocabulary_", None), seen),
+            # Artifacts from older scikit-learn pickle every term cut by
+            # max_features here
+            "stop_words": sizeof(getattr(vectorizer, "stop_words_", None), seen),
+            "idf": sizeof(getattr(vectorizer, "idf_", None), seen),
+        }
+
+    report["encoders"] = {
+        "scaler": sizeof(generator.scaler, seen),
+        "genre_encoder": sizeof(generator.genre_encoder, seen),
+    }
+
+    indexes = {
+        "audio_tree": sizeof(generator.audio_tree, seen),
+        "audio_block": sizeof(generator._audio_block, seen),
+        "subspace_trees": sizeof(generator._subspace_trees, seen),
+        "catalog_rows": sizeof(generator._catalog_rows, seen),
+    }
+    if generator.catalog_index is not None:
+        indexes["catalog_artists"] = sizeof(generator.catalog_index.artists, seen)
+        indexes["catalog_genres"] = sizeof(generator.catalog_index.genres, seen)
+    report["indexes"] = indexes
+
+    if generator._serving_columns is not None:
+        text, features, artist_codes = generator._serving_columns
+        report["serving_columns"] = {
+            "text": sizeof(text, seen),
+            "features": sizeof(features, seen),
+            "artist_codes": sizeof(artist_codes, seen),
+        }
+
+    return report
+
+
+def memory_total(report: MemoryReport) -> int:
+    return sum(sum(section.values()) for section in report.values())
+
+
+def format_memory_report(report: MemoryReport) -> str:
+    """The report as a table, largest sections and entries first"""
+
+    def mb(size: int) -> str:
+        return f"{size / 2**20:10.2f} MB"
+
+    lines = [f"{'Model memory':<40}{mb(memory_total(report))}"]
+    sections = sorted(report.items(), key=lambda item: -sum(item[1].values()))
+    for section, sizes in sections:
+        lines.append(f"  {section:<38}{mb(sum(sizes.values()))}")
+        for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            lines.append(f"    {name:<36}{mb(size)}")
+    return "\n".join(lines)
@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from .playlist_generator import PlaylistGenerator
+
+MODEL_ROOT = os.path.join(os.path.dirname(__file__), "pretrained")
+MODEL_FILENAME = "playlist_model.joblib"
+CURRENT_POINTER = "CURRENT"
+
+
+def version_path(root: str, version: str) -> str:
+    """Path of the artifact for a model version"""
+    return os.path.join(root, version, MODEL_FILENAME)
+
+
+def list_versions(root: str = MODEL_ROOT) -> list[str]:
+    """Versions with an artifact under root, oldest first"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root) if os.path.isfile(version_path(root, name))
+    )
+
+
+def current_version(root: str = MODEL_ROOT) -> Optional[str]:
+    """Version named by the CURRENT pointer, if there is one"""
+    try:
+        with open(os.path.join(root, CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_model_path(root: str = MODEL_ROOT) -> str:
+    """Artifact the CURRENT pointer names, or the legacy unversioned file"""
+    version = current_version(root)
+    if version is not None:
+        return version_path(root, version)
+    return os.path.join(root, MODEL_FILENAME)
+
+
+def publish(version: str, root: str = MODEL_ROOT) -> None:
+    """
+    Point CURRENT at a version. The pointer is written to a temporary file
+    and renamed into place, so readers see either the old or the new version.
+    """
+    if not os.path.isfile(version_path(root, version)):
+        raise FileNotFoundError(f"No model artifact for version {version}")
+
+    pointer = os.path.join(root, CURRENT_POINTER)
+    tmp = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, pointer)
+
+
+class ModelRegistry:
+    """
+    Holds the active PlaylistGenerator behind a single reference.
+
+    A reload builds and fully loads a new generator off to the side, then
+    swaps the reference. Requests grab the reference once and keep using
+    that generator, so a reload never mixes old and new model state.
+    """
+
+    def __init__(
+        self,
+        root: str = MODEL_ROOT,
+        configure: Optional[Callable[["PlaylistGenerator"], None]] = None,
+        on_swap: Optional[Callable[["PlaylistGenerator"], None]] = None,
+    ) -> None:
+        """
+        Args:
+            root: Directory holding versioned models and the CURRENT pointer
+            configure: Called on each new generator before it goes live
+            on_swap: Called with the new generator after a reload swaps it in
+        """
+        self.root = root
+        self.configure = configure
+        self.on_swap = on_swap
+        self._active: Optional["PlaylistGenerator"] = None
+        # CURRENT as it was when the active generator was built
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.watch_interval = 0.0
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_pid: Optional[int] = None
+        self.reloading = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def active(self) -> Optional["PlaylistGenerator"]:
+        """The live generator, without triggering a load"""
+        return self._active
+
+    def get(self) -> "PlaylistGenerator":
+        """The live generator, loading the current model on first use"""
+        if self._active is None:
+            with self._lock:
+                if self._active is None:
+                    self._active, self._version = self._build()
+        if self.watch_interval > 0 and self._watcher_pid != os.getpid():
+            self._start_watcher()
+        return self._active
+
+    def _build(self) -> tuple["PlaylistGenerator", Optional[str]]:
+        # Imported here so the ML stack is only loaded when a model is needed
+        from .playlist_generator import PlaylistGenerator
+
+        version = current_version(self.root)
+        if version is not None:
+            model_path = version_path(self.root, version)
+        else:
+            model_path = os.path.join(self.root, MODEL_FILENAME)
+        generator = PlaylistGenerator(model_path=model_path)
+        if self.configure is not None:
+            self.configure(generator)
+        generator.load_model()
+        return generator, version
+
+    def reload(self, wait: bool = False) -> bool:
+        """
+        Load the model CURRENT points at and swap it in
+
+        Args:
+            wait: Block until the swap is done instead of loading in a
+                background thread
+
+        Returns:
+            False if a reload is already in progress
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        self.reloading = True
+        if wait:
+            self._reload()
+        else:
+            threading.Thread(
+                target=self._reload, name="model-reload", daemon=True
+            ).start()
+        return True
+
+    def _reload(self) -> None:
+        try:
+            generator, version = self._build()
+            if generator.tracks_df is None:
+                raise RuntimeError(f"Could not load {generator.model_path}")
+            self._active, self._version = generator, version
+            self.last_error = None
+            print(f"Swapped in model version {generator.model_version}")
+            if self.on_swap is not None:
+                self.on_swap(generator)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Model reload failed, keeping the active model: {e}")
+        finally:
+            self.reloading = False
+            self._reload_lock.release()
+
+    def watch(self, interval: float) -> None:
+        """
+        Reload whenever the CURRENT pointer changes, checking every interval
+
+        The polling thread starts with the first get() in each process, so
+        web workers forked after setup (gunicorn --preload) each watch and
+        swap their own copy of the model. An interval of 0 stops polling.
+        """
+        self.watch_interval = interval
+
+    def _start_watcher(self) -> None:
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+
+            def poll() -> None:
+                seen = self._version
+                while self.watch_interval > 0:
+                    time.sleep(self.watch_interval)
+                    version = current_version(self.root)
+                    # A reload from elsewhere (the admin route) may have got there
+                    if version not in (seen, self._version) and self.reload(wait=True):
+                        seen = version
+
+            self._watcher = threading.Thread(
+                target=poll, name="model-watch", daemon=True
+            )
+            self._watcher.start()
+            self._watcher_pid = os.getpid()
+
+    def status(self) -> dict[str, Any]:
+        generator = self._active
+        return {
+            "active_version": generator.model_version if generator else None,
+            "model_path": generator.model_path if generator else None,
+            "loaded_at": generator.loaded_at if generator else None,
+            "load_seconds": generator.load_seconds if generator else None,
+            "current_version": current_version(self.root),
+            "available_versions": list_versions(self.root),
+            "reloading": self.reloading,
+            "last_error": self.last_error,
+        }
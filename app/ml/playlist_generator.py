@@ -1,30 +1,91 @@
 import os
-from typing import Any, Optional
+import time
+from typing import Any, Iterable, Optional
 
 import joblib
 import numpy as np
 import pandas as pd
-from scipy.sparse import csr_matrix, hstack
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from scipy.sparse import csr_matrix, hstack, vstack
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.neighbors import KDTree
+from sklearn.preprocessing import OneHotEncoder, StandardScaler, normalize
+
+from .catalog_index import (
+    GENRE_SEPARATOR,
+    CatalogIndex,
+    catalog_id,
+    normalize_name,
+)
+from .memory import MemoryReport, format_memory_report, memory_total, model_memory
+from .result_cache import CacheBackend, MemoryCache
+from .scoring import ScoringMatrix
+from .taste import TasteProfile
 
 TrackDict = dict[str, Any]
 
+AUDIO_FEATURES = [
+    "danceability",
+    "energy",
+    "loudness",
+    "speechiness",
+    "acousticness",
+    "instrumentalness",
+    "liveness",
+    "valence",
+    "tempo",
+]
+
 
 class PlaylistGenerator:
+    # Per-request noise, relative to the score spread of the candidate pool
+    SAMPLING_JITTER = 0.1
+    # How seed tracks combine into a query for recommend_similar
+    SEED_STRATEGIES = ("centroid", "max")
+    # Share of a personalised ranking that comes from the user's taste profile
+    TASTE_WEIGHT = 0.3
+
     vectorizer: Optional[TfidfVectorizer]
     feature_matrix: Optional[csr_matrix | np.ndarray]
+    scoring_matrix: Optional[ScoringMatrix]
+    scoring_precision: str
+    keep_feature_matrix: bool
     tracks_df: Optional[pd.DataFrame]
     model_path: str
     genre_encoder: Optional[OneHotEncoder]
+    catalog_index: Optional[CatalogIndex]
+    audio_tree: Optional[KDTree]
+    model_version: Optional[str]
+    loaded_at: Optional[float]
+    load_seconds: Optional[float]
+    memory_report: Optional[MemoryReport]
+    result_cache: Optional[CacheBackend]
+    query_cache: CacheBackend
 
     def __init__(self, model_path: Optional[str] = None) -> None:
         self.vectorizer = None
         self.feature_matrix = None
+        self.scoring_matrix = None
+        self.scoring_precision = "float32"
+        # Serving only needs the scoring matrix; set before load_model to
+        # keep the raw matrix too (the precision benchmark builds from it)
+        self.keep_feature_matrix = False
         self.tracks_df = None
         self.scaler = StandardScaler()
         self.genre_encoder = None
+        self.catalog_index = None
+        self.audio_tree = None
+        self._audio_block: Optional[np.ndarray] = None
+        self._audio_features: list[str] = []
+        self._subspace_trees: dict[tuple[int, ...], KDTree] = {}
+        self.model_version = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self.memory_report = None
+        self.result_cache = MemoryCache()
+        self.query_cache = MemoryCache(maxsize=4096, ttl=0)
+        self._serving_columns = None
+        # Catalog IDs in ascending order, and the row each one is on
+        self._catalog_rows: Optional[tuple[np.ndarray, np.ndarray]] = None
         self.model_path = model_path or os.path.join(
             os.path.dirname(__file__), "ml", "playlist_model.joblib"
         )
@@ -77,6 +138,8 @@ class PlaylistGenerator:
                 else:
                     self.tracks_df["genre"] = "Unknown"
 
+                self._assign_catalog_ids()
+
                 print(
                     f"Loaded {len(self.tracks_df)} tracks with {self.tracks_df['artist'].nunique()} unique artists"
                 )
@@ -85,6 +148,70 @@ class PlaylistGenerator:
 
         return False
 
+    def _assign_catalog_ids(self) -> None:
+        """Give every track a deterministic catalog ID (see catalog_id)"""
+        assert self.tracks_df is not None
+        self.tracks_df["catalog_id"] = np.fromiter(
+            (
+                catalog_id(artist, title)
+                for artist, title in zip(
+                    self.tracks_df["artist"], self.tracks_df["title"]
+                )
+            ),
+            dtype=np.int64,
+            count=len(self.tracks_df),
+        )
+
+    def deduplicate_tracks(self) -> int:
+        """
+        Collapse rows that share a catalog ID (same normalised artist and title).
+
+        The source CSVs overlap heavily. Each duplicate group keeps its first
+        row's text fields as a whole (never mixing fields from several rows)
+        and averages the audio features. The group's most
+        common genre becomes 'genre' (one-hot encoded), and every label it
+        carries is joined into 'genres' (indexed and vectorised).
+
+        Returns:
+            Number of rows removed
+        """
+        if self.tracks_df is None or self.tracks_df.empty:
+            return 0
+
+        df = self.tracks_df
+        if "catalog_id" not in df.columns:
+            self._assign_catalog_ids()
+
+        groups = df.groupby("catalog_id", sort=False)
+        deduped = df.drop_duplicates(subset="catalog_id", keep="first").set_index(
+            "catalog_id"
+        )
+
+        audio_columns = [f for f in AUDIO_FEATURES if f in df.columns]
+        if audio_columns:
+            deduped[audio_columns] = groups[audio_columns].mean()
+
+        if "genre" in df.columns:
+            labels = df[["catalog_id", "genre"]].dropna()
+            deduped["genre"] = (
+                labels.value_counts(sort=True)
+                .reset_index()
+                .drop_duplicates("catalog_id")
+                .set_index("catalog_id")["genre"]
+            )
+            deduped["genres"] = (
+                labels.drop_duplicates()
+                .groupby("catalog_id", sort=False)["genre"]
+                .agg(GENRE_SEPARATOR.join)
+            )
+
+        removed = len(df) - len(deduped)
+        self.tracks_df = deduped.reset_index()
+        print(
+            f"Removed {removed} duplicate rows, {len(self.tracks_df)} unique tracks remain"
+        )
+        return removed
+
     def preprocess_features(self):
         """
         Preprocess track features for recommendation
@@ -121,6 +248,8 @@ class PlaylistGenerator:
 
         feature_data = self.tracks_df[available_features].values
         audio_features = self.scaler.fit_transform(feature_data)
+        # Nearest-neighbour index for requests that only set feature targets
+        self.audio_tree = KDTree(audio_features)
 
         # Process genre features if available
         genre_features = None
@@ -177,6 +306,8 @@ class PlaylistGenerator:
                 )  # type: ignore
 
             print(f"Final feature matrix shape: {self.feature_matrix.shape}")  # type: ignore
+
+            self.catalog_index = CatalogIndex(self.tracks_df)
             return True
 
         return False
@@ -186,13 +317,14 @@ class PlaylistGenerator:
         if self.tracks_df is None or self.tracks_df.empty:
             return None
 
-        # Create a text feature by combining title, artist, and genre
+        # Create a text feature by combining title, artist, and every genre label
+        genre_text = self.tracks_df.get("genres", self.tracks_df.get("genre", ""))
         self.tracks_df["features_text"] = (
             self.tracks_df["title"].fillna("")
             + " "
             + self.tracks_df["artist"].fillna("")
             + " "
-            + self.tracks_df.get("genre", "").fillna("")  # type: ignore
+            + genre_text.fillna("").str.replace(GENRE_SEPARATOR, " ")  # type: ignore
         )
 
         # Create TF-IDF features
@@ -200,7 +332,10 @@ class PlaylistGenerator:
         return self.vectorizer.fit_transform(self.tracks_df["features_text"])
 
     def train(
-        self, track_data: Optional[list[dict[str, str]]] = None, save_model: bool = True
+        self,
+        track_data: Optional[list[dict[str, str]]] = None,
+        save_model: bool = True,
+        memory_limit: Optional[int] = None,
     ) -> bool:
         """
         Train the recommendation model on the provided tracks data or loaded data
@@ -208,6 +343,8 @@ class PlaylistGenerator:
         Args:
             track_data: Optional list of dictionaries with track information
             save_model: Whether to save the model after training
+            memory_limit: Fail, without saving, if serving the model would
+                take more than this many bytes
 
         Returns:
             Boolean indicating success
@@ -220,26 +357,57 @@ class PlaylistGenerator:
             print("No data available for training")
             return False
 
+        self.deduplicate_tracks()
+
         success = self.preprocess_features()
         if not success:
             print("Failed to process features")
             return False
 
+        self._build_serving_columns()
+        self._build_audio_index()
+
+        self.memory_report = model_memory(self)
+        print(format_memory_report(self.memory_report))
+        # The raw feature matrix is only kept for saving; serving drops it
+        total = memory_total(
+            {
+                section: sizes
+                for section, sizes in self.memory_report.items()
+                if section != "feature_matrix"
+            }
+        )
+        if memory_limit and total > memory_limit:
+            print(
+                f"Model needs {total / 2**20:.1f} MB, over the "
+                f"{memory_limit / 2**20:.1f} MB memory limit"
+            )
+            return False
+
         if save_model:
             self.save_model()
 
         return True
 
-    def save_model(self) -> None:
-        """Save the model to disk"""
+    def save_model(self, version: Optional[str] = None) -> None:
+        """
+        Save the model to disk
+
+        Args:
+            version: Version label stored in the artifact; defaults to a timestamp
+        """
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
 
+        self.model_version = version or time.strftime("%Y%m%d%H%M%S")
         model_data = {
+            "model_version": self.model_version,
             "tracks_df": self.tracks_df,
             "feature_matrix": self.feature_matrix,
             "vectorizer": self.vectorizer,
             "scaler": self.scaler,
             "genre_encoder": self.genre_encoder,
+            "catalog_index": self.catalog_index,
+            "audio_tree": self.audio_tree,
         }
 
         joblib.dump(model_data, self.model_path)
@@ -252,12 +420,19 @@ class PlaylistGenerator:
             return False
 
         try:
+            started = time.perf_counter()
             model_data: dict[str, Any] = joblib.load(self.model_path)
             self.vectorizer = model_data.get("vectorizer")
             self.feature_matrix = model_data.get("feature_matrix")
             self.tracks_df = model_data.get("tracks_df")
             self.scaler = model_data.get("scaler", StandardScaler())
             self.genre_encoder = model_data.get("genre_encoder")
+            self.catalog_index = model_data.get("catalog_index")
+            self.audio_tree = model_data.get("audio_tree")
+            # Older artifacts carry no version; the file's mtime identifies them
+            self.model_version = model_data.get(
+                "model_version", str(int(os.path.getmtime(self.model_path)))
+            )
 
             # Verify loaded components
             if self.tracks_df is None:
@@ -268,7 +443,26 @@ class PlaylistGenerator:
                 print("Error: feature_matrix not found in model file")
                 return False
 
+            # Models trained before IDs or the index existed get them on load
+            if "catalog_id" not in self.tracks_df.columns:
+                self._assign_catalog_ids()
+
+            if self.catalog_index is None:
+                self.catalog_index = CatalogIndex(self.tracks_df)
+
+            self._build_serving_columns()
+            self._build_audio_index()
+            if not self.keep_feature_matrix:
+                # The normalised copy in scoring_matrix is all serving reads
+                self.feature_matrix = None
+
             # Check data quality
+            duplicates = self.tracks_df["catalog_id"].duplicated().sum()
+            if duplicates:
+                print(
+                    f"WARNING: Model has {duplicates} duplicate tracks; retrain to deduplicate"
+                )
+
             unique_artists = self.tracks_df["artist"].nunique()
             unique_titles = self.tracks_df["title"].nunique()
             print(
@@ -280,50 +474,293 @@ class PlaylistGenerator:
                 print(f"Dataset has {self.tracks_df['genre'].nunique()} unique genres")
                 print(f"Top 5 genres: {genre_counts.head().to_dict()}")
 
+            self.loaded_at = time.time()
+            self.load_seconds = time.perf_counter() - started
+            print(
+                f"Loaded model version {self.model_version} in {self.load_seconds:.2f}s"
+            )
+            self.memory_report = model_memory(self)
+            print(format_memory_report(self.memory_report))
             return True
         except Exception as e:
             print(f"Error loading model: {e}")
             return False
 
+    def _build_serving_columns(self) -> None:
+        """
+        Columnar copies of the fields /generate returns (defaults filled once),
+        integer artist codes for the per-artist cap, the sorted catalog IDs
+        and the row-normalised feature matrix used for cosine scoring
+        """
+        assert self.tracks_df is not None
+        df = self.tracks_df
+
+        text = {
+            "id": df["catalog_id"].astype(str).to_numpy(dtype=object),
+            "title": df["title"].fillna("Unknown Track").to_numpy(dtype=object),
+            "artist": df["artist"].fillna("Unknown Artist").to_numpy(dtype=object),
+            "album": (
+                df["album"].fillna("Unknown Album").to_numpy(dtype=object)
+                if "album" in df.columns
+                else None
+            ),
+            "genre": (
+                df["genre"].fillna("").to_numpy(dtype=object)
+                if "genre" in df.columns
+                else None
+            ),
+        }
+        features = {
+            feature: df[feature].to_numpy(dtype=np.float64)
+            for feature in AUDIO_FEATURES
+            if feature in df.columns
+        }
+        artist_codes, _ = pd.factorize(df["artist"].map(normalize_name))
+        self._serving_columns = (text, features, artist_codes)
+
+        catalog_ids = df["catalog_id"].to_numpy(dtype=np.int64)
+        order = np.argsort(catalog_ids, kind="stable")
+        self._catalog_rows = (catalog_ids[order], order)
+
+        if self.feature_matrix is not None:
+            # The matrix is mostly zeros; older artifacts store it dense
+            if isinstance(self.feature_matrix, np.ndarray):
+                self.feature_matrix = csr_matrix(self.feature_matrix)
+
+            # Normalised once here instead of on every request
+            audio_dims = sum(feature in df.columns for feature in AUDIO_FEATURES)
+            self.scoring_matrix = ScoringMatrix(
+                self.feature_matrix, audio_dims, self.scoring_precision
+            )
+
+    def _build_audio_index(self) -> None:
+        """
+        The scaled audio block the KD-tree was built over; artifacts from
+        before the tree existed get one built here
+        """
+        assert self.tracks_df is not None
+        self._audio_features = [
+            f for f in AUDIO_FEATURES if f in self.tracks_df.columns
+        ]
+        self._subspace_trees = {}
+        if not self._audio_features or not hasattr(self.scaler, "mean_"):
+            self._audio_block = None
+            self.audio_tree = None
+            return
+
+        values = self.tracks_df[self._audio_features]
+        self._audio_block = self.scaler.transform(values.fillna(values.mean()).values)
+        if self.audio_tree is None:
+            self.audio_tree = KDTree(self._audio_block)
+
+    def rows_for_catalog_ids(
+        self, catalog_ids: Iterable[int], keep_order: bool = False
+    ) -> np.ndarray:
+        """
+        Map catalog IDs to row indices with one vectorised binary search
+
+        Args:
+            catalog_ids: Catalog IDs; ones not in this model are skipped
+            keep_order: Return rows in the order of the IDs instead
+
+        Returns:
+            Sorted, unique array of row indices (or, with keep_order, the
+            rows in the order given)
+        """
+        if self.tracks_df is None:
+            return np.empty(0, dtype=np.int64)
+        if self._catalog_rows is None:
+            self._build_serving_columns()
+        sorted_ids, order = self._catalog_rows  # type: ignore
+
+        if isinstance(catalog_ids, np.ndarray):
+            ids = catalog_ids.astype(np.int64, copy=False)
+        else:
+            ids = np.fromiter(map(int, catalog_ids), dtype=np.int64)
+        if not len(sorted_ids) or not len(ids):
+            return np.empty(0, dtype=np.int64)
+
+        positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        found = sorted_ids[positions] == ids
+        rows = order[positions[found]]
+        return rows if keep_order else np.unique(rows)
+
+    def update_taste(
+        self,
+        profile: Optional[TasteProfile],
+        catalog_ids: Iterable[int],
+        decay: float = 1.0,
+        max_components: int = 256,
+    ) -> TasteProfile:
+        """
+        Fold saved tracks into a user's taste profile
+
+        Args:
+            profile: The stored profile; None, or one built with another
+                model, starts a new profile
+            catalog_ids: Catalog IDs of the saved tracks
+            decay: See TasteProfile.add
+            max_components: See TasteProfile.add
+
+        Returns:
+            The updated profile (the one passed in, when it was reusable)
+        """
+        if self.scoring_matrix is None:
+            self._build_serving_columns()
+        matrix: ScoringMatrix = self.scoring_matrix  # type: ignore
+
+        if profile is None or profile.model_version != self.model_version:
+            profile = TasteProfile.empty(self.model_version, matrix.audio_dims)
+
+        rows = self.rows_for_catalog_ids(catalog_ids)
+        if len(rows):
+            profile.add(matrix.rows(rows), decay, max_components)
+        return profile
+
+    def format_tracks(self, indices: np.ndarray) -> list[TrackDict]:
+        """
+        Build API track dictionaries for catalog rows, one column at a time
+
+        Args:
+            indices: Row indices into tracks_df, in playlist order
+
+        Returns:
+            List of JSON-ready track dictionaries (NaN features are omitted)
+        """
+        if self.tracks_df is None:
+            return []
+        if self._serving_columns is None:
+            self._build_serving_columns()
+        text, features, _ = self._serving_columns  # type: ignore
+
+        count = len(indices)
+        fields: dict[str, list] = {
+            "id": text["id"][indices].tolist(),
+            "title": text["title"][indices].tolist(),
+            "artist": text["artist"][indices].tolist(),
+            "album": (
+                text["album"][indices].tolist()
+                if text["album"] is not None
+                else ["Unknown Album"] * count
+            ),
+            "genre": (
+                text["genre"][indices].tolist()
+                if text["genre"] is not None
+                else [""] * count
+            ),
+        }
+
+        missing: dict[str, np.ndarray] = {}
+        for feature, column in features.items():
+            values = column[indices]
+            fields[feature] = values.tolist()
+            nan_rows = np.flatnonzero(np.isnan(values))
+            if len(nan_rows):
+                missing[feature] = nan_rows
+
+        names = list(fields)
+        tracks = [dict(zip(names, row)) for row in zip(*fields.values())]
+
+        for feature, rows in missing.items():
+            for row in rows:
+                del tracks[row][feature]
+
+        return tracks
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Autocomplete artist and genre names from the catalog
+
+        Args:
+            query: Prefix typed by the user
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of suggestion dictionaries, most tracks first
+        """
+        if self.catalog_index is None:
+            return []
+        return self.catalog_index.suggest(query, limit)
+
     def generate_playlist(
-        self, preferences: dict[str, list[str]], num_tracks: int = 10
+        self,
+        preferences: dict[str, Any],
+        num_tracks: int = 10,
+        exclude: Optional[np.ndarray] = None,
     ) -> list[TrackDict]:
         """
         Generate a playlist based on user preferences with improved diversity,
         ensuring no duplicate tracks in recommendations.
 
         Args:
-            preferences: Dict with 'artists' and 'genres' as lists
+            preferences: Dict with 'artists' and 'genres' as lists and an
+                optional 'features' dict of audio feature targets
             num_tracks: Number of tracks to include in the playlist
+            exclude: Sorted, unique row indices that must not be recommended,
+                e.g. from rows_for_catalog_ids
 
         Returns:
             List of track dictionaries
         """
-        # If model loading fails, we cannot proceed
-        if not self.load_model():
-            print("Failed to load model")
+        indices = self.recommend(preferences, num_tracks, exclude)
+        if self.tracks_df is None or len(indices) == 0:
             return []
+        return self.tracks_df.iloc[indices].to_dict("records")
+
+    def recommend(
+        self,
+        preferences: dict[str, Any],
+        num_tracks: int = 10,
+        exclude: Optional[np.ndarray] = None,
+        mmr_lambda: Optional[float] = None,
+        taste: Optional[TasteProfile] = None,
+        taste_weight: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Pick catalog rows for a playlist; see generate_playlist. With
+        mmr_lambda, the pool is re-ranked by maximal marginal relevance
+        (see _mmr_order) before the artist cap. With a taste profile built
+        for this model, the shared (cached) pool for the preferences is
+        re-ranked by its blend with the profile (taste_weight, default
+        TASTE_WEIGHT; see _blend_taste), so personalisation adds no pass over
+        the catalog. A profile on its own is scored against every row.
+
+        Returns:
+            Array of row indices into tracks_df, in playlist order
+        """
+        # Load lazily; the model is immutable once loaded, so don't reload per call
+        if self.tracks_df is None and not self.load_model():
+            print("Failed to load model")
+            return np.empty(0, dtype=np.int64)
 
         # Safety check for required components
-        if self.tracks_df is None or self.feature_matrix is None:
-            print("Missing required components (tracks_df or feature_matrix)")
-            return []
+        if self.tracks_df is None or self.scoring_matrix is None:
+            print("Missing required components (tracks_df or scoring_matrix)")
+            return np.empty(0, dtype=np.int64)
 
         artists: list[str] = preferences.get("artists", [])
         genres: list[str] = preferences.get("genres", [])
+        feature_preferences: dict[str, float] = preferences.get("features") or {}
         query_text: str = " ".join(artists + genres)
+        if exclude is None:
+            exclude = np.empty(0, dtype=np.int64)
+        if taste is not None and (
+            taste.model_version != self.model_version or taste.weight <= 0
+        ):
+            taste = None
 
         # If no preferences, return diversified random tracks
-        if not query_text.strip():
-            print("No preferences provided, returning diverse random tracks")
-            if self.tracks_df.empty:
-                return []
-
-            # Group by artist and title to eliminate exact duplicates
-            grouped = self.tracks_df.drop_duplicates(subset=["artist", "title"])
+        if not query_text.strip() and not feature_preferences and taste is None:
+            available = self.tracks_df
+            if len(exclude):
+                available = available.iloc[
+                    np.delete(np.arange(len(available)), exclude)
+                ]
+            if available.empty:
+                return np.empty(0, dtype=np.int64)
 
             # Group by artist to improve diversity
-            artist_groups = grouped.groupby("artist")
+            artist_groups = available.groupby("artist")
             diverse_tracks = []
 
             # Take up to 2 songs per artist
@@ -333,162 +770,623 @@ class PlaylistGenerator:
 
             if diverse_tracks:
                 combined = pd.concat(diverse_tracks)
-                random_tracks = combined.sample(min(num_tracks, len(combined))).to_dict(
-                    "records"
-                )
+                random_tracks = combined.sample(min(num_tracks, len(combined)))
 
-                return random_tracks
-            return []
+                return self.tracks_df.index.get_indexer(random_tracks.index)
+            return np.empty(0, dtype=np.int64)
 
-        similarity_scores = None
+        if not query_text.strip() and not feature_preferences:
+            # Nothing shared to start from; a batch of one profile
+            return self.recommend_for_tastes(
+                [taste],
+                num_tracks,
+                [exclude],
+                mmr_lambda,  # type: ignore
+            )[0]
 
-        # Use vectorizer if available
-        if self.vectorizer is not None:
-            query_vector = self.vectorizer.transform([query_text])
-            feature_dim = self.feature_matrix.shape[1]  # type: ignore
-            vector_dim = query_vector.shape[1]  # type: ignore
+        # Get appropriate number of tracks
+        actual_num_tracks = min(num_tracks, len(self.tracks_df))
+        if actual_num_tracks == 0:
+            print("No tracks available after filtering")
+            return np.empty(0, dtype=np.int64)
 
-            if feature_dim > vector_dim:
-                from scipy.sparse import csr_matrix, hstack
+        # The catalog is deduplicated, so a 3x pool leaves room for the artist
+        # cap. Exclusions widen it by a power-of-two bucket, so requests with
+        # similar exclusion counts share a cached pool.
+        candidate_pool_size = min(
+            num_tracks * 3 + self._exclusion_bucket(len(exclude)), len(self.tracks_df)
+        )
+        cache_key = self._pool_cache_key(
+            artists, genres, feature_preferences, candidate_pool_size
+        )
 
-                padding_size = feature_dim - vector_dim
-                padding = csr_matrix((1, padding_size))
-                query_vector = hstack([query_vector, padding])
-                print(f"Padded query vector to shape: {query_vector.shape}")
+        pool = self.result_cache.get(cache_key) if self.result_cache else None
+        if pool is None:
+            pool = self._score_candidates(
+                artists, genres, feature_preferences, candidate_pool_size
+            )
+            if self.result_cache is not None:
+                self.result_cache.set(cache_key, pool)
 
-            print(f"Query vector shape: {query_vector.shape}")  # type: ignore
-            print(f"Feature matrix shape: {self.feature_matrix.shape}")  # type: ignore
+        if taste is not None:
+            pool = self._blend_taste(
+                pool, taste, self.TASTE_WEIGHT if taste_weight is None else taste_weight
+            )
 
-            # Calculate similarity scores
-            similarity_scores = cosine_similarity(
-                query_vector, self.feature_matrix
-            ).flatten()
+        return self._pick_from_pool(pool, exclude, actual_num_tracks, mmr_lambda)
+
+    def _blend_taste(
+        self,
+        pool: tuple[np.ndarray, np.ndarray],
+        taste: TasteProfile,
+        taste_weight: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Re-rank a scored pool by ``(1 - taste_weight) * score + taste_weight *
+        similarity to the profile``
+
+        Only the pool's rows are scored against the profile, so the pool
+        itself stays shared between users (and cached).
+        """
+        rows, scores = pool
+        if not len(rows):
+            return pool
+        matrix: ScoringMatrix = self.scoring_matrix  # type: ignore
+        taste_vector = normalize(taste.vector(matrix.shape[1]))
+        similarity = matrix.scores(taste_vector, rows).ravel()
+        blended = (1 - taste_weight) * scores + taste_weight * similarity
+        order = np.argsort(-blended, kind="stable")
+        return rows[order], blended[order].astype(np.float32)
+
+    def recommend_similar(
+        self,
+        seed_rows: np.ndarray,
+        num_tracks: int = 10,
+        exclude: Optional[np.ndarray] = None,
+        strategy: str = "centroid",
+        mmr_lambda: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Pick catalog rows similar to a set of seed tracks ("more like this")
+
+        Args:
+            seed_rows: Row indices of the seed tracks, e.g. a saved playlist
+            num_tracks: Number of tracks wanted
+            exclude: Sorted, unique row indices that must not be recommended;
+                the seeds themselves are always left out
+            strategy: "centroid" scores against the mean seed vector, "max"
+                takes each track's best similarity to any single seed
+            mmr_lambda: Optional MMR trade-off, as in recommend
+
+        Returns:
+            Array of row indices into tracks_df, in playlist order
+        """
+        if strategy not in self.SEED_STRATEGIES:
+            raise ValueError(f"Unknown seed strategy: {strategy}")
+
+        if self.tracks_df is None and not self.load_model():
+            print("Failed to load model")
+            return np.empty(0, dtype=np.int64)
+
+        seed_rows = np.unique(seed_rows)
+        if self.tracks_df is None or len(seed_rows) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        if exclude is None:
+            exclude = seed_rows
         else:
-            # Fallback to alternative approach if vectorizer not available
-            print("Vectorizer not available, using alternative similarity method")
-            # Filter by exact match on artists or genres
-            mask = np.zeros(len(self.tracks_df), dtype=bool)
-
-            for artist in artists:
-                artist_lower = artist.lower()
-                mask |= (
-                    self.tracks_df["artist"]
-                    .str.lower()
-                    .str.contains(artist_lower, na=False)
-                )
+            exclude = np.union1d(exclude, seed_rows)
 
-            for genre in genres:
-                genre_lower = genre.lower()
-                if "genre" in self.tracks_df.columns:
-                    mask |= (
-                        self.tracks_df["genre"]
-                        .str.lower()
-                        .str.contains(genre_lower, na=False)
-                    )
-
-            # Create similarity scores from mask (1.0 for matches, random low scores for others)
-            similarity_scores = np.zeros(len(self.tracks_df))
-            similarity_scores[mask] = 1.0
-            # Add small random values for diversity even among matches
-            similarity_scores += np.random.random(len(similarity_scores)) * 0.1
-
-        feature_preferences = preferences.get("features", {})
-        if feature_preferences and self.tracks_df is not None:
-            feature_score = np.ones(len(self.tracks_df))
-
-            for feature, target_value in feature_preferences.items():  # type: ignore
-                if feature in self.tracks_df.columns:
-                    # Calculate how close each track's feature is to the target value
-                    feature_values = self.tracks_df[feature].fillna(0).values
-                    # Convert to normalized distance (0 = far, 1 = close)
-                    feature_distance = (
-                        1.0 - np.abs(feature_values - float(target_value)) / 1.0  # type: ignore
-                    )
-                    # Clip values to 0-1 range
-                    feature_distance = np.clip(feature_distance, 0, 1)
-                    feature_score *= feature_distance
+        actual_num_tracks = min(num_tracks, len(self.tracks_df))
+        candidate_pool_size = min(
+            num_tracks * 3 + self._exclusion_bucket(len(exclude)), len(self.tracks_df)
+        )
+        cache_key = (
+            self.model_version,
+            strategy,
+            seed_rows.tobytes(),
+            candidate_pool_size,
+        )
 
-            # Combine with previous similarity scores (30% weight to audio features)
-            similarity_scores = (similarity_scores * 0.7) + (feature_score * 0.3)
+        pool = self.result_cache.get(cache_key) if self.result_cache else None
+        if pool is None:
+            pool = self._score_seeds(seed_rows, strategy, candidate_pool_size)
+            if self.result_cache is not None:
+                self.result_cache.set(cache_key, pool)
+
+        return self._pick_from_pool(pool, exclude, actual_num_tracks, mmr_lambda)
+
+    def recommend_for_tastes(
+        self,
+        tastes: list[TasteProfile],
+        num_tracks: int = 30,
+        excludes: Optional[list[np.ndarray]] = None,
+        mmr_lambda: Optional[float] = None,
+    ) -> list[np.ndarray]:
+        """
+        Playlists for many taste profiles from one scoring pass
 
-        # Get appropriate number of tracks
-        actual_num_tracks = min(num_tracks, len(similarity_scores))
-        if actual_num_tracks == 0:
-            print("No tracks available after filtering")
-            return []
+        The profiles are stacked into a query matrix and scored against the
+        catalog in a single sparse product, so a batch costs about as much
+        as one request per catalog pass instead of one pass per user.
+
+        Args:
+            tastes: Profiles built for this model; others get no tracks
+            num_tracks: Tracks per playlist
+            excludes: Per profile, sorted unique rows to leave out
+            mmr_lambda: Optional MMR trade-off, as in recommend
+
+        Returns:
+            Per profile, row indices into tracks_df in playlist order
+        """
+        if self.tracks_df is None and not self.load_model():
+            return [np.empty(0, dtype=np.int64) for _ in tastes]
+        if self.scoring_matrix is None:
+            self._build_serving_columns()
+        matrix: ScoringMatrix = self.scoring_matrix  # type: ignore
+
+        results = [np.empty(0, dtype=np.int64) for _ in tastes]
+        usable = [
+            i
+            for i, taste in enumerate(tastes)
+            if taste.model_version == self.model_version and taste.weight > 0
+        ]
+        if not usable:
+            return results
+
+        queries = normalize(
+            vstack([tastes[i].vector(matrix.shape[1]) for i in usable], format="csr")
+        )
+        scores = matrix.scores(queries)
+
+        num_tracks = min(num_tracks, len(self.tracks_df))
+        for column, i in enumerate(usable):
+            exclude = excludes[i] if excludes else np.empty(0, dtype=np.int64)
+            pool_size = min(
+                num_tracks * 3 + self._exclusion_bucket(len(exclude)),
+                len(self.tracks_df),
+            )
+            user_scores = scores[:, column]
+            top = self._top_k(user_scores, pool_size)
+            pool = (top.astype(np.int32), user_scores[top].astype(np.float32))
+            results[i] = self._pick_from_pool(pool, exclude, num_tracks, mmr_lambda)
+        return results
+
+    def _pick_from_pool(
+        self,
+        pool: tuple[np.ndarray, np.ndarray],
+        exclude: np.ndarray,
+        num_tracks: int,
+        mmr_lambda: Optional[float] = None,
+    ) -> np.ndarray:
+        """Drop excluded rows from a scored pool, then sample and diversify it"""
+        # Cached pools are shared, so exclusions are masked out per request
+        if len(exclude):
+            keep = ~np.isin(pool[0], exclude, assume_unique=True)
+            pool = (pool[0][keep], pool[1][keep])
+
+        # Sampling runs per request, so cached pools still give varied playlists
+        candidate_indices, candidate_scores = self._sample_order(*pool)
+        if mmr_lambda is not None:
+            candidate_indices = self._mmr_order(
+                candidate_indices, candidate_scores, num_tracks, mmr_lambda
+            )
+        return self._select_diverse(candidate_indices, num_tracks)
+
+    def _mmr_order(
+        self,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        mmr_lambda: float,
+    ) -> np.ndarray:
+        """
+        Maximal marginal relevance: repeatedly take the candidate maximising
+        ``lambda * relevance - (1 - lambda) * max similarity to those taken``
+
+        Args:
+            indices: Candidate row indices, best first
+            scores: Relevance of each candidate, aligned with indices
+            k: Number of candidates to re-rank; the rest keep their order
+            mmr_lambda: 1.0 is pure relevance, 0.0 pure novelty
+
+        Returns:
+            The candidates, the first k in MMR order
+        """
+        k = min(k, len(indices))
+        if k <= 1:
+            return indices
+        if self.scoring_matrix is None:
+            self._build_serving_columns()
+
+        # Pairwise cosine similarity within the pool (pool x pool). The pool
+        # only touches a few hundred columns, and a dense BLAS product over
+        # those beats a sparse product whose result is dense anyway.
+        vectors = self.scoring_matrix.rows(indices)  # type: ignore
+        vectors = vectors[:, np.unique(vectors.indices)].toarray()
+        similarity = vectors @ vectors.T
+
+        spread = float(scores.max() - scores.min()) or 1.0
+        relevance = mmr_lambda * (scores - scores.min()) / spread
+        redundancy_weight = 1.0 - mmr_lambda
+
+        order = np.empty(k, dtype=np.int64)
+        taken = np.zeros(len(indices), dtype=bool)
+        # Scaled audio columns can be negative, so similarity can be too;
+        # start from the first pick rather than flooring redundancy at 0
+        max_similarity = None
+        for position in range(k):
+            if max_similarity is None:
+                gain = relevance.copy()
+            else:
+                gain = relevance - redundancy_weight * max_similarity
+            gain[taken] = -np.inf
+            best = int(np.argmax(gain))
+            order[position] = best
+            taken[best] = True
+            if max_similarity is None:
+                max_similarity = similarity[best].copy()
+            else:
+                # Only the newly taken row can raise a candidate's max similarity
+                np.maximum(max_similarity, similarity[best], out=max_similarity)
 
-        # Get a larger pool of candidates for diversity - 3x what we need
-        candidate_pool_size = min(num_tracks * 5, len(similarity_scores))
-        candidate_indices = np.argsort(similarity_scores)[-candidate_pool_size:][::-1]
+        return np.concatenate([indices[order], indices[~taken]])
+
+    def _select_diverse(
+        self, candidate_indices: np.ndarray, num_tracks: int
+    ) -> np.ndarray:
+        """
+        Take candidates in order, allowing at most 3 tracks per artist
+
+        Args:
+            candidate_indices: Row indices, best first
+            num_tracks: Number of tracks wanted
+
+        Returns:
+            Array of selected row indices
+        """
+        if self._serving_columns is None:
+            self._build_serving_columns()
+        artist_codes = self._serving_columns[2]  # type: ignore
 
-        unique_tracks = set()
         artist_count = {}
         selected_indices = []
 
         # Process candidates in order of similarity
         for idx in candidate_indices:
-            artist = str(self.tracks_df.iloc[idx]["artist"]).strip()
-            title = str(self.tracks_df.iloc[idx]["title"]).strip()
-            track_key = f"{artist.lower()}|{title.lower()}"
-
-            # Skip if we've already selected this track
-            if track_key in unique_tracks:
-                continue
+            artist = artist_codes[idx]
 
             # Check artist limit (max 3 songs per artist)
-            if artist.lower() in artist_count and artist_count[artist.lower()] >= 3:
+            if artist_count.get(artist, 0) >= 3:
                 continue
 
-            # This track passes all filters, add it
-            unique_tracks.add(track_key)
-            artist_count[artist.lower()] = artist_count.get(artist.lower(), 0) + 1
+            artist_count[artist] = artist_count.get(artist, 0) + 1
             selected_indices.append(idx)
 
-            if len(selected_indices) >= actual_num_tracks:
+            if len(selected_indices) >= num_tracks:
                 break
 
         # If we still need more tracks, relax the artist limit
-        if len(selected_indices) < actual_num_tracks:
-            print(
-                f"Relaxing artist limits to get more tracks (have {len(selected_indices)}, need {actual_num_tracks})"
-            )
+        if len(selected_indices) < num_tracks:
+            chosen = set(selected_indices)
             for idx in candidate_indices:
-                # Skip indices we've already selected
-                if idx in selected_indices:
+                if idx in chosen:
                     continue
 
-                # Get artist and title
-                artist = str(self.tracks_df.iloc[idx]["artist"]).strip()
-                title = str(self.tracks_df.iloc[idx]["title"]).strip()
-                track_key = f"{artist.lower()}|{title.lower()}"
+                selected_indices.append(idx)
+                if len(selected_indices) >= num_tracks:
+                    break
 
-                # Skip if we've already selected this track
-                if track_key in unique_tracks:
-                    continue
+        return np.array(selected_indices, dtype=np.int64)
+
+    def _pool_cache_key(
+        self,
+        artists: list[str],
+        genres: list[str],
+        feature_preferences: dict[str, float],
+        pool_size: int,
+    ) -> tuple:
+        """Cache key for a candidate pool; equivalent preferences share a key"""
+        features = tuple(
+            sorted(
+                (feature, round(float(target), 2))
+                for feature, target in feature_preferences.items()
+            )
+        )
+        return (
+            self.model_version,
+            tuple(sorted({normalize_name(artist) for artist in artists} - {""})),
+            tuple(sorted({normalize_name(genre) for genre in genres} - {""})),
+            features,
+            pool_size,
+        )
 
-                unique_tracks.add(track_key)
-                selected_indices.append(idx)
+    def _score_candidates(
+        self,
+        artists: list[str],
+        genres: list[str],
+        feature_preferences: dict[str, float],
+        pool_size: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score the catalog against the preferences and keep the best candidates
+
+        Returns:
+            Tuple of (row indices, scores), best first
+        """
+        assert self.tracks_df is not None and self.scoring_matrix is not None
+
+        # Feature targets alone (or with genres) are a nearest-neighbour
+        # query in audio space, restricted to the genres' rows if given
+        if feature_preferences and not artists and self.audio_tree is not None:
+            rows = None
+            if genres and self.catalog_index is not None:
+                rows = self.catalog_index.candidates([], genres)
+            if rows is None or len(rows):
+                pool = self._nearest_by_features(feature_preferences, pool_size, rows)
+                if pool is not None:
+                    return pool
+
+        query_text = " ".join(artists + genres)
+        feature_dim = self.scoring_matrix.shape[1]
+        query_vector = None
+
+        # Start from the posting-list union of the requested artists and
+        # genres. Every row is scored only when the union can't fill the pool
+        # or covers so much of the catalog (over an eighth, measured) that
+        # merging and slicing it costs more than the full product.
+        rows = None
+        if query_text.strip():
+            if self.catalog_index is None:
+                self.catalog_index = CatalogIndex(self.tracks_df)
+            matches = self.catalog_index.candidates_up_to(
+                artists, genres, len(self.tracks_df) // 8
+            )
+            if matches is not None and len(matches) >= pool_size:
+                rows = matches
+        similarity_scores = np.zeros(len(self.tracks_df) if rows is None else len(rows))
+
+        # Use vectorizer if available
+        if query_text.strip() and self.vectorizer is not None:
+            query_vector = self._query_vector(artists + genres)
+            vector_dim = query_vector.shape[1]  # type: ignore
+
+            # TF-IDF is the last block, after the audio and genre columns
+            if feature_dim > vector_dim:
+                padding_size = feature_dim - vector_dim
+                padding = csr_matrix((1, padding_size))
+                query_vector = hstack([padding, query_vector])
+
+        if query_vector is not None:
+            # Calculate similarity scores
+            similarity_scores = self._cosine_scores(query_vector, rows)
+        elif query_text.strip():
+            # Without a vectorizer, 1.0 for posting-list matches; per-request
+            # sampling adds the randomness on top
+            if rows is None:
+                matches = self.catalog_index.candidates(artists, genres)
+                similarity_scores[matches] = 1.0
+            else:
+                similarity_scores[:] = 1.0
+
+        feature_score = self._feature_closeness(feature_preferences, rows)
+        if feature_score is not None:
+            # Combine with previous similarity scores (30% weight to audio features)
+            similarity_scores = (similarity_scores * 0.7) + (feature_score * 0.3)
+
+        top = self._top_k(similarity_scores, pool_size)
+        candidate_indices = top if rows is None else rows[top]
+        return (
+            candidate_indices.astype(np.int32),
+            similarity_scores[top].astype(np.float32),
+        )
+
+    def _query_vector(self, phrases: list[str]) -> csr_matrix:
+        """
+        TF-IDF row for a query, summed from per-phrase components
+
+        TF-IDF without sublinear tf is additive before normalisation, so each
+        artist or genre is vectorised once and cached; scoring normalises the
+        sum. Popular names skip the tokenizer entirely. Phrases are keyed by
+        the vectorizer's own preprocessing, so a cached component is exactly
+        what transforming the phrase would give.
+        """
+        assert self.vectorizer is not None
+
+        preprocess = self.vectorizer.build_preprocessor()
+        components = []
+        for phrase in phrases:
+            key = preprocess(phrase).strip()
+            if not key:
+                continue
+            component = self.query_cache.get(key)
+            if component is None:
+                counts = CountVectorizer.transform(self.vectorizer, [key])
+                component = csr_matrix(counts.multiply(self.vectorizer.idf_))
+                self.query_cache.set(key, component)
+            components.append(component)
+
+        if not components:
+            return csr_matrix((1, len(self.vectorizer.idf_)))
+        return csr_matrix(sum(components))
+
+    def _nearest_by_features(
+        self,
+        feature_preferences: dict[str, float],
+        pool_size: int,
+        rows: Optional[np.ndarray] = None,
+    ) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """
+        Tracks nearest the feature targets in scaled audio space
+
+        Args:
+            feature_preferences: Raw target per audio feature; features left
+                out don't count towards the distance
+            pool_size: Number of candidates wanted
+            rows: Optional row ids the candidates must come from
 
-                if len(selected_indices) >= actual_num_tracks:
+        Returns:
+            Tuple of (row indices, scores), best first, or None if no
+            requested feature is in the model
+        """
+        scaled = self._scaled_targets(feature_preferences)
+        if scaled is None:
+            return None
+
+        dims, query = scaled
+        tree = self._tree_for(tuple(dims))
+        n_rows = len(self._audio_block)
+
+        if rows is None:
+            distances, indices = tree.query(query, k=min(pool_size, n_rows))
+            distances, indices = distances[0], indices[0]
+        else:
+            # Widen the search until enough neighbours fall inside the mask
+            allowed = np.zeros(n_rows, dtype=bool)
+            allowed[rows] = True
+            wanted = min(pool_size, len(rows))
+            k = wanted
+            while True:
+                k = min(k, n_rows)
+                distances, indices = tree.query(query, k=k)
+                keep = allowed[indices[0]]
+                if keep.sum() >= wanted or k == n_rows:
                     break
+                k *= 4
+            distances, indices = distances[0][keep][:wanted], indices[0][keep][:wanted]
+
+        # Nearest first; 1 / (1 + d) keeps scores in (0, 1] like cosine scores
+        return (
+            indices.astype(np.int32),
+            (1.0 / (1.0 + distances)).astype(np.float32),
+        )
 
-        final_indices = list(dict.fromkeys(selected_indices))
-        recommended_tracks = self.tracks_df.iloc[final_indices].to_dict("records")
-        track_keys = set()
-        unique_recommended_tracks = []
+    def _scaled_targets(
+        self, feature_preferences: dict[str, float]
+    ) -> Optional[tuple[list[int], np.ndarray]]:
+        """
+        Audio block columns of the requested features, and the targets
+        scaled like the block (a 1 x len(dims) query); None if no requested
+        feature is in the model
+        """
+        dims = [
+            i for i, f in enumerate(self._audio_features) if f in feature_preferences
+        ]
+        if not dims or self._audio_block is None:
+            return None
 
-        for track in recommended_tracks:
-            artist = str(track.get("artist", "")).strip()
-            title = str(track.get("title", "")).strip()
-            key = f"{artist.lower()}|{title.lower()}"
+        targets = np.array(
+            [float(feature_preferences[self._audio_features[i]]) for i in dims]
+        )
+        query = (targets - self.scaler.mean_[dims]) / self.scaler.scale_[dims]
+        return dims, query[None]
+
+    def _feature_closeness(
+        self,
+        feature_preferences: dict[str, float],
+        rows: Optional[np.ndarray] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Closeness of each row to the feature targets in scaled audio space,
+        scored 1 / (1 + distance) like the KD-tree path
 
-            if key not in track_keys:
-                track_keys.add(key)
-                unique_recommended_tracks.append(track)
+        Args:
+            feature_preferences: Raw target per audio feature
+            rows: Optional row ids to score instead of the whole catalog
 
-        if len(unique_recommended_tracks) != len(recommended_tracks):
-            print(
-                f"WARNING: Removed {len(recommended_tracks) - len(unique_recommended_tracks)} duplicate tracks"
-            )
+        Returns:
+            Scores aligned with rows (or the catalog), or None if no
+            requested feature is in the model
+        """
+        scaled = self._scaled_targets(feature_preferences)
+        if scaled is None:
+            return None
+
+        dims, query = scaled
+        block = self._audio_block[:, dims]  # type: ignore
+        if rows is not None:
+            block = block[rows]
+        distances = np.sqrt(((block - query) ** 2).sum(axis=1))
+        return 1.0 / (1.0 + distances)
+
+    def _tree_for(self, dims: tuple[int, ...]) -> KDTree:
+        """KD-tree over a subset of the audio features, built on first use"""
+        if len(dims) == len(self._audio_features):
+            return self.audio_tree  # type: ignore
+        tree = self._subspace_trees.get(dims)
+        if tree is None:
+            tree = KDTree(self._audio_block[:, dims])  # type: ignore
+            self._subspace_trees[dims] = tree
+        return tree
+
+    def _score_seeds(
+        self, seed_rows: np.ndarray, strategy: str, pool_size: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score the catalog against seed rows of the normalised feature matrix;
+        no text is vectorised
 
-        return unique_recommended_tracks
+        Returns:
+            Tuple of (row indices, scores), best first
+        """
+        if self.scoring_matrix is None:
+            self._build_serving_columns()
+        matrix: ScoringMatrix = self.scoring_matrix  # type: ignore
+        seeds = matrix.rows(seed_rows)
+
+        if strategy == "max":
+            similarity_scores = matrix.scores(seeds).max(axis=1)
+        else:
+            centroid = normalize(csr_matrix(seeds.mean(axis=0)))
+            similarity_scores = matrix.scores(centroid).ravel()
+
+        candidate_indices = self._top_k(similarity_scores, pool_size)
+        return (
+            candidate_indices.astype(np.int32),
+            similarity_scores[candidate_indices].astype(np.float32),
+        )
+
+    def _cosine_scores(
+        self, query_vector, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Cosine similarity of one query row against every catalog row, or
+        only against ``rows``, aligned with them
+        """
+        if self.scoring_matrix is None:
+            self._build_serving_columns()
+        query = normalize(csr_matrix(query_vector))
+        return self.scoring_matrix.scores(query, rows).ravel()  # type: ignore
+
+    @staticmethod
+    def _exclusion_bucket(count: int) -> int:
+        """Smallest power of two >= count (0 for no exclusions)"""
+        return 1 << (count - 1).bit_length() if count > 0 else 0
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first, without a full sort"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if k < len(scores):
+            top = np.argpartition(scores, -k)[-k:]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(scores[top], kind="stable")[::-1]]
+
+    def _sample_order(
+        self, indices: np.ndarray, scores: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reorder a candidate pool with noise scaled to its score spread
+
+        Returns:
+            Tuple of (row indices, noisy scores), best first
+        """
+        if len(scores) == 0:
+            return indices, scores
+        spread = float(scores.max() - scores.min()) or 1.0
+        noisy = scores + np.random.random(len(scores)) * spread * self.SAMPLING_JITTER
+        order = np.argsort(noisy)[::-1]
+        return indices[order], noisy[order]
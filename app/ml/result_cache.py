@@ -0,0 +1,92 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Interface for caching scored candidate pools between requests.
+
+    The in-memory default is per process. A shared backend (e.g. one backed by
+    Redis) can be dropped in by implementing ``get``/``set``/``clear``/``stats``; keys
+    are tuples of primitives and values are pairs of NumPy arrays, so both
+    pickle cleanly.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """The cached value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value under a key"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """Counters for the metrics endpoint"""
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe LRU cache whose entries also expire after a TTL"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0) -> None:
+        """
+        Args:
+            maxsize: Maximum number of entries before the least recently used
+                one is evicted
+            ttl: Seconds an entry stays valid; 0 disables expiry
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,110 @@
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix, hstack
+from sklearn.preprocessing import normalize
+
+PRECISIONS = ("float64", "float32", "quantized")
+
+
+def _compact(matrix: csr_matrix) -> csr_matrix:
+    """CSR with int32 indices and index pointers, whatever scipy picked"""
+    matrix = csr_matrix(matrix)
+    if matrix.nnz < np.iinfo(np.int32).max:
+        matrix.indices = matrix.indices.astype(np.int32, copy=False)
+        matrix.indptr = matrix.indptr.astype(np.int32, copy=False)
+    return matrix
+
+
+class ScoringMatrix:
+    """
+    The row-normalised feature matrix in its serving layout.
+
+    Cosine similarity against unit rows is a plain dot product, so rows are
+    normalised once at load. ``precision`` trades exactness for memory
+    bandwidth on the scoring path:
+
+    - ``float64``: reference layout, a float64 CSR matrix
+    - ``float32``: float32 CSR values with int32 indices
+    - ``quantized``: the dense audio block as float16, stored one row per
+      feature, the sparse genre and text blocks as float32 CSR with int32
+      indices
+    """
+
+    def __init__(
+        self, feature_matrix, audio_dims: int, precision: str = "float32"
+    ) -> None:
+        """
+        Args:
+            feature_matrix: Raw feature matrix, dense or sparse, with the audio
+                features in its first ``audio_dims`` columns
+            audio_dims: Width of the dense audio block
+            precision: One of PRECISIONS
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown scoring precision: {precision}")
+
+        self.precision = precision
+        self.audio_dims = audio_dims
+
+        dtype = np.float64 if precision == "float64" else np.float32
+        normalized = normalize(csr_matrix(feature_matrix, dtype=dtype))
+        self.shape = normalized.shape
+
+        if precision == "quantized" and audio_dims:
+            # Feature-major, so scoring reads one contiguous column at a time
+            self.audio = np.ascontiguousarray(
+                normalized[:, :audio_dims].toarray().astype(np.float16).T
+            )
+            self.sparse = _compact(normalized[:, audio_dims:])
+        else:
+            self.audio = None
+            self.sparse = _compact(normalized)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the matrix blocks"""
+        total = (
+            self.sparse.data.nbytes
+            + self.sparse.indices.nbytes
+            + self.sparse.indptr.nbytes
+        )
+        if self.audio is not None:
+            total += self.audio.nbytes
+        return total
+
+    def scores(
+        self, queries: csr_matrix, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Dot products of every row, or only the given rows, with each (unit)
+        query row
+
+        Args:
+            queries: Query rows in the full feature layout
+            rows: Optional sorted row indices to score
+
+        Returns:
+            Dense array of shape (rows, queries)
+        """
+        queries = csr_matrix(queries, dtype=self.sparse.dtype)
+        sparse = self.sparse if rows is None else self.sparse[rows]
+        if self.audio is None:
+            return (sparse @ queries.T).toarray()
+
+        result = (sparse @ queries[:, self.audio_dims :].T).toarray()
+        # float16 storage, float32 accumulation one feature column at a time,
+        # so the block is never upcast as a whole
+        audio_queries = queries[:, : self.audio_dims].toarray().astype(np.float32)
+        for dim, column in enumerate(self.audio):
+            if rows is not None:
+                column = column[rows]
+            result += column[:, None] * audio_queries[:, dim]
+        return result
+
+    def rows(self, indices: np.ndarray) -> csr_matrix:
+        """Normalised vectors of the given rows, in the full feature layout"""
+        if self.audio is None:
+            return self.sparse[indices]
+        audio = csr_matrix(self.audio[:, indices].T.astype(np.float32))
+        return hstack([audio, self.sparse[indices]], format="csr")
@@ -0,0 +1,123 @@
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class TasteProfile:
+    """
+    A user's taste as a decayed running sum of the normalised feature rows
+    of the tracks they saved.
+
+    The dense audio block is kept whole; the genre and text blocks are kept
+    as their ``max_components`` largest columns. Saving a playlist folds its
+    rows in without revisiting earlier saves, so an update costs
+    O(playlist length), not O(tracks saved).
+
+    Columns depend on the model's vocabulary, so a profile is only valid for
+    the model version it was built with.
+    """
+
+    def __init__(
+        self,
+        model_version: Optional[str],
+        audio: np.ndarray,
+        indices: Optional[np.ndarray] = None,
+        values: Optional[np.ndarray] = None,
+        weight: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            model_version: Model the columns belong to
+            audio: Summed audio block
+            indices: Sorted columns (in the full feature layout) of the kept
+                sparse components
+            values: Summed weights of those columns
+            weight: Decayed number of tracks summed
+        """
+        self.model_version = model_version
+        self.audio = np.asarray(audio, dtype=np.float32)
+        self.indices = (
+            np.empty(0, dtype=np.int32) if indices is None else indices.astype(np.int32)
+        )
+        self.values = (
+            np.empty(0, dtype=np.float32)
+            if values is None
+            else values.astype(np.float32)
+        )
+        self.weight = weight
+
+    @classmethod
+    def empty(cls, model_version: Optional[str], audio_dims: int) -> "TasteProfile":
+        return cls(model_version, np.zeros(audio_dims, dtype=np.float32))
+
+    def add(self, rows: csr_matrix, decay: float, max_components: int) -> None:
+        """
+        Fold newly saved tracks in
+
+        Args:
+            rows: Normalised feature rows of the tracks, e.g. from
+                ScoringMatrix.rows
+            decay: Factor applied to the existing sum first; 1.0 weighs every
+                save equally, lower values favour recent saves
+            max_components: Sparse columns to keep
+        """
+        rows = csr_matrix(rows)
+        audio_dims = len(self.audio)
+        self.audio *= decay
+        self.values *= decay
+        self.weight = self.weight * decay + rows.shape[0]
+
+        columns = rows.indices.astype(np.int64)
+        data = rows.data.astype(np.float32)
+        is_audio = columns < audio_dims
+        self.audio += np.bincount(
+            columns[is_audio], weights=data[is_audio], minlength=audio_dims
+        ).astype(np.float32)
+
+        # Merge the playlist's sparse columns into the kept components
+        columns = np.concatenate([self.indices, columns[~is_audio]])
+        data = np.concatenate([self.values, data[~is_audio]])
+        merged, inverse = np.unique(columns, return_inverse=True)
+        summed = np.bincount(inverse, weights=data).astype(np.float32)
+
+        if len(merged) > max_components:
+            keep = np.sort(np.argpartition(summed, -max_components)[-max_components:])
+            merged, summed = merged[keep], summed[keep]
+        self.indices = merged.astype(np.int32)
+        self.values = summed
+
+    def vector(self, width: int) -> csr_matrix:
+        """The profile as one row in the full feature layout"""
+        audio_columns = np.flatnonzero(self.audio)
+        columns = np.concatenate([audio_columns, self.indices])
+        data = np.concatenate([self.audio[audio_columns], self.values])
+        pointers = np.array([0, len(columns)])
+        return csr_matrix((data, columns, pointers), shape=(1, width))
+
+    def to_columns(self) -> dict:
+        """Compact binary fields for storage"""
+        return {
+            "model_version": self.model_version,
+            "weight": float(self.weight),
+            "audio": self.audio.astype(np.float32).tobytes(),
+            "component_indices": self.indices.astype(np.int32).tobytes(),
+            "component_values": self.values.astype(np.float32).tobytes(),
+        }
+
+    @classmethod
+    def from_columns(
+        cls,
+        model_version: Optional[str],
+        weight: float,
+        audio: bytes,
+        component_indices: bytes,
+        component_values: bytes,
+    ) -> "TasteProfile":
+        return cls(
+            model_version,
+            np.frombuffer(audio, dtype=np.float32).copy(),
+            np.frombuffer(component_indices, dtype=np.int32),
+            np.frombuffer(component_values, dtype=np.float32),
+            weight,
+        )
@@ -1,27 +1,58 @@
 import os
+import sys
+import time
+from typing import Optional
 
-from playlist_generator import PlaylistGenerator
+if __name__ == "__main__":
+    # Run as a script the repo root isn't on sys.path; `flask model train`
+    # needs no bootstrap
+    sys.path.insert(
+        0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )
+
+from app.ml.model_store import MODEL_ROOT, publish, version_path
+from app.ml.playlist_generator import PlaylistGenerator
+
+
+def train_playlist_model(
+    activate: bool = True,
+    memory_limit: Optional[int] = None,
+    scoring_precision: str = "float32",
+) -> bool:
+    """
+    Train the playlist recommendation model using existing CSV files
 
+    The model is saved to its own version directory under pretrained/; with
+    activate, the CURRENT pointer is switched to it once it is on disk. With
+    memory_limit (bytes), a model that would need more memory to serve at
+    scoring_precision is not saved.
 
-def train_playlist_model():
-    """Train the playlist recommendation model using existing CSV files"""
+    Returns:
+        Whether a model was saved
+    """
     csv_files = [
         os.path.join(os.path.dirname(__file__), "../data", "spotify-dataset.csv"),
         os.path.join(os.path.dirname(__file__), "../data", "combined-dataset.csv"),
     ]
 
-    generator = PlaylistGenerator(model_path="app/ml/pretrained/playlist_model.joblib")
+    version = time.strftime("%Y%m%d-%H%M%S")
+    generator = PlaylistGenerator(model_path=version_path(MODEL_ROOT, version))
+    generator.scoring_precision = scoring_precision
 
     print("Loading data...")
     success = generator.load_data(csv_files)
     if not success:
         print("Failed to load data")
-        return
+        return False
 
     print("Training model...")
-    success = generator.train(save_model=True)
+    success = generator.train(save_model=False, memory_limit=memory_limit)
 
     if success:
+        generator.save_model(version=version)
+        if activate:
+            publish(version)
+            print(f"Activated model version {version}")
         print("Model trained successfully!")
 
         if generator.tracks_df is not None:
@@ -38,7 +69,9 @@ def train_playlist_model():
             print("No tracks data available")
     else:
         print("Training failed.")
+    return success
 
 
 if __name__ == "__main__":
-    train_playlist_model()
+    if not train_playlist_model():
+        sys.exit(1)
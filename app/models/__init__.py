@@ -1,5 +1,8 @@
-from .db import SCHEMA, db, environment
+from .daily_mix import DailyMix
+from .db import SCHEMA, db, environment, init_engine
 from .playlist import Playlist
+from .playlist_export import PlaylistExport
 from .playlist_track import PlaylistTrack
 from .track import Track
 from .user import User
+from .user_taste import UserTaste
@@ -0,0 +1,23 @@
+from sqlalchemy import ForeignKey
+
+from .db import SCHEMA, UUIDColumnType, add_prefix_for_prod, db, environment
+
+
+class DailyMix(db.Model):
+    """A precomputed playlist for a user, served until it expires"""
+
+    __tablename__ = "daily_mixes"
+
+    if environment == "prod":
+        __table_args__ = {"schema": SCHEMA}
+
+    user_id = db.Column(
+        UUIDColumnType, ForeignKey(add_prefix_for_prod("users.id")), primary_key=True
+    )
+    model_version = db.Column(db.String(64))
+    # Catalog IDs in playlist order, packed as int64
+    catalog_ids = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    user = db.relationship("User", back_populates="daily_mix")
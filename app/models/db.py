@@ -1,7 +1,9 @@
 import os
 
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import Uuid as GenericUUID
+from sqlalchemy import event
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 environment = os.getenv("FLASK_ENV")
@@ -12,7 +14,7 @@ db = SQLAlchemy()
 
 # Determine the UUID column type based on the DBMS
 db_uri = os.environ.get("DATABASE_URL", "")
-if db_uri.startswith("postgresql"):
+if db_uri.startswith(("postgresql", "postgres://")):
     UUIDColumnType = PG_UUID(as_uuid=True)
 else:
     UUIDColumnType = GenericUUID(as_uuid=True)
@@ -23,3 +25,42 @@ def add_prefix_for_prod(attr):
         return f"{SCHEMA}.{attr}"
     else:
         return attr
+
+
+def init_engine(app: Flask) -> None:
+    """Apply per-connection SQLite pragmas and log the pool configuration"""
+    with app.app_context():
+        engine = db.engine
+
+        if engine.dialect.name == "sqlite":
+            wal = app.config["SQLITE_WAL"]
+            mmap_size = app.config["SQLITE_MMAP_SIZE"]
+
+            @event.listens_for(engine, "connect")
+            def set_sqlite_pragmas(dbapi_connection, _):
+                cursor = dbapi_connection.cursor()
+                if wal:
+                    # WAL lets readers run alongside the writer; NORMAL only
+                    # syncs at checkpoints, which WAL keeps consistent
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                    cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+                cursor.close()
+
+        options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+        pool = engine.pool
+        summary = [
+            f"{engine.dialect.name} engine",
+            f"pool={type(pool).__name__}",
+        ]
+        if hasattr(pool, "size"):
+            summary.append(f"size={pool.size()}")
+        for option in ("max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"):
+            if option in options:
+                summary.append(f"{option}={options[option]}")
+        summary.append(f"statement_cache={options.get('query_cache_size', 500)}")
+        if engine.dialect.name == "sqlite":
+            summary.append(
+                f"wal={app.config['SQLITE_WAL']} mmap_size={app.config['SQLITE_MMAP_SIZE']}"
+            )
+        app.logger.info("Database: " + " ".join(summary))
@@ -22,6 +22,9 @@ class Playlist(db.Model):
     tracks = db.relationship(
         "PlaylistTrack", back_populates="playlist", cascade="all, delete-orphan"
     )
+    exports = db.relationship(
+        "PlaylistExport", back_populates="playlist", cascade="all, delete-orphan"
+    )
 
     def to_dict(self):
         return {
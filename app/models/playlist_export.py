@@ -0,0 +1,49 @@
+import uuid
+
+from sqlalchemy import ForeignKey
+
+from .db import SCHEMA, UUIDColumnType, add_prefix_for_prod, db, environment
+
+
+class PlaylistExport(db.Model):
+    """Progress of a playlist's export to a streaming service"""
+
+    __tablename__ = "playlist_exports"
+
+    __table_args__: tuple = (db.UniqueConstraint("playlist_id", "provider"),)
+    if environment == "prod":
+        __table_args__ += ({"schema": SCHEMA},)
+
+    id = db.Column(UUIDColumnType, primary_key=True, default=uuid.uuid4)
+    playlist_id = db.Column(
+        UUIDColumnType, ForeignKey(add_prefix_for_prod("playlists.id")), nullable=False
+    )
+    provider = db.Column(db.String(20), nullable=False)
+    remote_id = db.Column(db.String(100))
+    # Per-track match results, aligned with the playlist's positions
+    matches = db.Column(db.JSON, nullable=False, default=list)
+    added = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    error = db.Column(db.String(500))
+    updated_at = db.Column(
+        db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
+    )
+
+    playlist = db.relationship("Playlist", back_populates="exports")
+
+    def to_dict(self):
+        matched = sum(1 for match in self.matches if match)
+        searched = sum(1 for match in self.matches if match is not None)
+        return {
+            "playlist_id": self.playlist_id,
+            "provider": self.provider,
+            "remote_id": self.remote_id,
+            "status": self.status,
+            "error": self.error,
+            "tracks": len(self.matches),
+            "searched": searched,
+            "matched": matched,
+            "unmatched": searched - matched,
+            "added": self.added,
+            "updated_at": self.updated_at,
+        }
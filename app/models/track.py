@@ -10,6 +10,8 @@ class Track(db.Model):
         __table_args__ = {"schema": SCHEMA}
 
     id = db.Column(UUIDColumnType, primary_key=True, default=uuid.uuid4)
+    # Stable ID of the track in the recommendation catalog (see app.ml.catalog_index)
+    catalog_id = db.Column(db.BigInteger, unique=True, index=True)
     title = db.Column(db.String(100), nullable=False)
     artist = db.Column(db.String(100), nullable=False)
     genre = db.Column(db.String(50))
@@ -19,6 +21,7 @@ class Track(db.Model):
     def to_dict(self):
         return {
             "id": self.id,
+            "catalog_id": str(self.catalog_id) if self.catalog_id is not None else None,
             "title": self.title,
             "artist": self.artist,
             "genre": self.genre,
@@ -20,6 +20,12 @@ class User(db.Model, UserMixin):
     playlists = db.relationship(
         "Playlist", back_populates="user", cascade="all, delete-orphan"
     )
+    taste = db.relationship(
+        "UserTaste", back_populates="user", uselist=False, cascade="all, delete-orphan"
+    )
+    daily_mix = db.relationship(
+        "DailyMix", back_populates="user", uselist=False, cascade="all, delete-orphan"
+    )
 
     @property
     def password(self) -> str:
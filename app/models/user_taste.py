@@ -0,0 +1,28 @@
+from sqlalchemy import ForeignKey
+
+from .db import SCHEMA, UUIDColumnType, add_prefix_for_prod, db, environment
+
+
+class UserTaste(db.Model):
+    """A user's taste profile (see app.ml.taste), stored as packed arrays"""
+
+    __tablename__ = "user_tastes"
+
+    if environment == "prod":
+        __table_args__ = {"schema": SCHEMA}
+
+    user_id = db.Column(
+        UUIDColumnType, ForeignKey(add_prefix_for_prod("users.id")), primary_key=True
+    )
+    # Model the columns belong to; NULL marks a profile to rebuild
+    model_version = db.Column(db.String(64))
+    weight = db.Column(db.Float, nullable=False, default=0.0)
+    # float32 audio block, int32 component columns, float32 component weights
+    audio = db.Column(db.LargeBinary, nullable=False, default=b"")
+    component_indices = db.Column(db.LargeBinary, nullable=False, default=b"")
+    component_values = db.Column(db.LargeBinary, nullable=False, default=b"")
+    updated_at = db.Column(
+        db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
+    )
+
+    user = db.relationship("User", back_populates="taste")
@@ -0,0 +1,194 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from flask import Flask, Response, g, request
+
+PROFILE_SUFFIX = ".folded"
+
+# The profile following the current request, if it was sampled
+_active: ContextVar[Optional["StackSampler"]] = ContextVar("profile", default=None)
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of a set of threads at a fixed interval.
+
+    Stacks are aggregated as collapsed stacks ("root;...;leaf count"), the
+    input format of flamegraph.pl, speedscope and similar tools. Sampling
+    runs on its own thread, so the profiled code is not traced.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._threads: set[int] = set()
+        self._labels: dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_thread(self, ident: int) -> None:
+        self._threads = self._threads | {ident}
+
+    def remove_thread(self, ident: int) -> None:
+        self._threads = self._threads - {ident}
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in sys.path:
+                if prefix and filename.startswith(prefix + os.sep):
+                    filename = filename[len(prefix) + 1 :]
+                    break
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            label = label.replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in self._threads:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[";".join(reversed(stack))] += 1
+                    self.samples += 1
+
+
+def follow(fn: Callable) -> Callable:
+    """
+    Have the current request's profile sample ``fn`` on whichever thread
+    runs it, e.g. a GenerationExecutor worker. Unprofiled requests get
+    ``fn`` back unchanged.
+    """
+    sampler = _active.get()
+    if sampler is None:
+        return fn
+
+    @wraps(fn)
+    def followed(*args, **kwargs):
+        ident = threading.get_ident()
+        sampler.add_thread(ident)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.remove_thread(ident)
+
+    return followed
+
+
+def list_profiles(directory: str) -> list[dict[str, Any]]:
+    """Saved profiles, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(PROFILE_SUFFIX):
+            stat = entry.stat()
+            profiles.append(
+                {"name": entry.name, "bytes": stat.st_size, "created": stat.st_mtime}
+            )
+    profiles.sort(key=lambda profile: profile["created"], reverse=True)
+    return profiles
+
+
+def init_profiler(app: Flask) -> None:
+    """
+    Profile a sample of requests to PROFILE_ENDPOINTS: a PROFILE_SAMPLE_RATE
+    fraction of them, plus any sent with "X-Profile: 1" and a valid
+    X-Admin-Token. With neither configured no hooks are installed, so
+    requests pay nothing.
+    """
+    # Importing app.routes loads the route modules, which import this module
+    from .routes.guards import is_admin_request
+
+    config = app.config
+    sample_rate = config["PROFILE_SAMPLE_RATE"]
+    if sample_rate <= 0 and not config.get("ADMIN_TOKEN"):
+        return
+
+    endpoints = set(config["PROFILE_ENDPOINTS"])
+    directory = config["PROFILE_DIR"] or os.path.join(app.instance_path, "profiles")
+    config["PROFILE_DIR"] = directory
+
+    @app.before_request
+    def start_profile() -> None:
+        if request.endpoint not in endpoints:
+            return
+        requested = request.headers.get("X-Profile") == "1" and is_admin_request()
+        if not requested and random.random() >= sample_rate:
+            return
+
+        sampler = StackSampler(config["PROFILE_INTERVAL"])
+        sampler.add_thread(threading.get_ident())
+        g.profile = (sampler, _active.set(sampler), time.perf_counter())
+        sampler.start()
+
+    @app.after_request
+    def finish_profile(response: Response) -> Response:
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+
+        sampler, token, started = profile
+        _active.reset(token)
+        stacks = sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        name = (
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+            f"{request.endpoint}-{elapsed_ms:.0f}ms{PROFILE_SUFFIX}"
+        )
+        try:
+            save_profile(directory, name, stacks, config["PROFILE_KEEP"])
+            response.headers["X-Profile-Name"] = name
+        except OSError as e:
+            app.logger.error(f"Could not save profile {name}: {e}")
+        return response
+
+    @app.teardown_request
+    def abandon_profile(_error) -> None:
+        # A view that raised skips after_request; don't leave the sampler running
+        profile = g.pop("profile", None)
+        if profile is not None:
+            _active.reset(profile[1])
+            profile[0].stop()
+
+
+def save_profile(directory: str, name: str, stacks: Counter, keep: int) -> None:
+    """Write collapsed stacks and prune all but the newest ``keep`` profiles"""
+    os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f".{name}.tmp")
+    with open(tmp, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    os.replace(tmp, os.path.join(directory, name))
+
+    for profile in list_profiles(directory)[keep:]:
+        try:
+            os.remove(os.path.join(directory, profile["name"]))
+        except FileNotFoundError:
+            pass
@@ -1,2 +1,5 @@
+from .admin import admin_bp
 from .auth import auth_bp
+from .export import export_bp
+from .playlist import init_app as init_playlist_model
 from .playlist import playlist_bp
@@ -0,0 +1,60 @@
+import os
+
+from flask import Blueprint, abort, current_app, request, send_from_directory
+
+from app.profiler import PROFILE_SUFFIX, list_profiles
+
+from .guards import admin_required
+from .playlist import registry
+
+admin_bp = Blueprint("admin", __name__)
+
+
+@admin_bp.route("/model", methods=["GET"])
+@admin_required
+def model_status():
+    """
+    Report the active model version and the versions available on disk
+    """
+    return registry.status()
+
+
+@admin_bp.route("/model/reload", methods=["POST"])
+@admin_required
+def reload_model():
+    """
+    Load the model the CURRENT pointer names and swap it in. Requests in
+    flight finish on the old model. Pass ?wait=1 to block until the swap.
+
+    Only the worker process serving this request swaps; the others pick the
+    new version up on their next MODEL_WATCH_INTERVAL poll.
+    """
+    wait = request.args.get("wait", "").lower() in ("1", "true")
+    if not registry.reload(wait=wait):
+        return {"error": "A reload is already in progress"}, 409
+
+    status = registry.status()
+    if wait and status["last_error"]:
+        return status, 500
+    return status, 200 if wait else 202
+
+
+@admin_bp.route("/profiles", methods=["GET"])
+@admin_required
+def get_profiles():
+    """
+    List saved request profiles, newest first. Each is a collapsed-stack
+    file for flame graph tools.
+    """
+    directory = current_app.config.get("PROFILE_DIR")
+    return {"profiles": list_profiles(directory) if directory else []}
+
+
+@admin_bp.route("/profiles/<name>", methods=["GET"])
+@admin_required
+def download_profile(name: str):
+    """Download one saved profile"""
+    directory = current_app.config.get("PROFILE_DIR")
+    if not directory or not name.endswith(PROFILE_SUFFIX) or os.sep in name:
+        abort(404)
+    return send_from_directory(directory, name, mimetype="text/plain")
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from flask import Blueprint, Flask, current_app, jsonify, request
+from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload
+
+from app.export import (
+    PROVIDERS,
+    ExportError,
+    ExportState,
+    ProviderClient,
+    export_playlist,
+)
+from app.models import Playlist, PlaylistExport, PlaylistTrack, db
+
+export_bp = Blueprint("export", __name__)
+
+export_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+export_concurrency = 8
+# Provider name -> API root; None uses the provider's public API
+provider_urls: dict[str, Optional[str]] = {}
+
+# (playlist ID, provider) pairs being exported by this process
+active_exports: set[tuple[str, str]] = set()
+active_lock = threading.Lock()
+
+
+@export_bp.record_once
+def configure_exports(state):
+    """Apply the app's export pool and provider settings."""
+    global export_pool, export_concurrency
+
+    config = state.app.config
+    export_pool = ThreadPoolExecutor(
+        max_workers=config["EXPORT_WORKERS"], thread_name_prefix="export"
+    )
+    export_concurrency = config["EXPORT_CONCURRENCY"]
+    provider_urls.update(
+        spotify=config.get("SPOTIFY_API_URL"), youtube=config.get("YOUTUBE_API_URL")
+    )
+
+
+@export_bp.route("/<uuid:playlist_id>/export/<provider>", methods=["POST"])
+@login_required
+def start_export(playlist_id: uuid.UUID, provider: str):
+    """
+    Export a saved playlist to Spotify or YouTube Music in the background.
+
+    The body carries the user's OAuth access token for the provider; it is
+    used for this export only and never stored. Re-posting after a failure
+    resumes where the last attempt stopped; pass "restart": true to export a
+    fresh copy of a finished playlist.
+    """
+    if provider not in PROVIDERS:
+        return jsonify({"error": f"Unknown provider: {provider}"}), 404
+
+    playlist = db.session.get(Playlist, playlist_id)
+    if playlist is None or playlist.user_id != current_user.id:
+        return jsonify({"error": "Playlist not found"}), 404
+
+    data = request.get_json(silent=True) or {}
+    token = data.get("access_token")
+    if not token:
+        return jsonify({"error": "access_token is required"}), 400
+
+    key = (str(playlist_id), provider)
+    with active_lock:
+        if key in active_exports:
+            return jsonify({"error": "This export is already running"}), 409
+        active_exports.add(key)
+
+    try:
+        export = db.session.execute(
+            db.select(PlaylistExport).filter_by(
+                playlist_id=playlist_id, provider=provider
+            )
+        ).scalar_one_or_none()
+        if export is None:
+            export = PlaylistExport(
+                id=uuid.uuid4(), playlist_id=playlist_id, provider=provider
+            )
+            db.session.add(export)
+        elif export.status == "done" and not data.get("restart"):
+            with active_lock:
+                active_exports.discard(key)
+            return jsonify(export.to_dict())
+        elif data.get("restart"):
+            export.matches = []
+            export.added = 0
+
+        export.status = "queued"
+        export.error = None
+        db.session.commit()
+
+        # One query for the entries and their tracks
+        entries = db.session.execute(
+            db.select(PlaylistTrack)
+            .options(joinedload(PlaylistTrack.track))
+            .filter_by(playlist_id=playlist_id)
+            .order_by(PlaylistTrack.position)
+        ).scalars()
+        tracks = [entry.track.to_dict() for entry in entries]
+        export_pool.submit(
+            run_export,
+            current_app._get_current_object(),  # type: ignore
+            export.id,
+            provider,
+            token,
+            playlist.name,
+            tracks,
+        )
+    except Exception as e:
+        with active_lock:
+            active_exports.discard(key)
+        db.session.rollback()
+        current_app.logger.error(f"Error starting export: {str(e)}")
+        return jsonify({"error": f"Failed to start export: {str(e)}"}), 500
+
+    return jsonify(export.to_dict()), 202
+
+
+@export_bp.route("/<uuid:playlist_id>/export/<provider>", methods=["GET"])
+@login_required
+def export_status(playlist_id: uuid.UUID, provider: str):
+    """Report an export's progress."""
+    export = db.session.execute(
+        db.select(PlaylistExport)
+        .join(Playlist)
+        .filter(
+            PlaylistExport.playlist_id == playlist_id,
+            PlaylistExport.provider == provider,
+            Playlist.user_id == current_user.id,
+        )
+    ).scalar_one_or_none()
+    if export is None:
+        return jsonify({"error": "Export not found"}), 404
+    return jsonify(export.to_dict())
+
+
+def run_export(
+    app: Flask,
+    export_id: uuid.UUID,
+    provider_name: str,
+    token: str,
+    title: str,
+    tracks: list[dict],
+) -> None:
+    """Run one export to completion or failure, checkpointing as it goes."""
+    with app.app_context():
+        export = db.session.get(PlaylistExport, export_id)
+        assert export is not None
+        state = ExportState(export.remote_id, list(export.matches), export.added)
+
+        def checkpoint(state: ExportState) -> None:
+            export.remote_id = state.remote_id
+            export.matches = list(state.matches)
+            export.added = state.added
+            export.status = state.status
+            export.error = state.error
+            db.session.commit()
+
+        provider = PROVIDERS[provider_name](provider_urls.get(provider_name))
+
+        async def export_tracks() -> None:
+            async with ProviderClient(
+                provider.base_url, token, concurrency=export_concurrency
+            ) as client:
+                await export_playlist(
+                    provider, client, title, tracks, state, checkpoint
+                )
+                app.logger.info(
+                    f"Exported playlist {export.playlist_id} to {provider_name}: "
+                    f"{state.added}/{len(tracks)} tracks, {client.stats()}"
+                )
+
+        try:
+            asyncio.run(export_tracks())
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Export to {provider_name} failed: {str(e)}")
+            state.status = "failed"
+            state.error = (
+                str(e)[:500] if isinstance(e, ExportError) else "Export failed"
+            )
+            checkpoint(state)
+        finally:
+            with active_lock:
+                active_exports.discard((str(export.playlist_id), provider_name))
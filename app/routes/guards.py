@@ -0,0 +1,26 @@
+import hmac
+from functools import wraps
+
+from flask import abort, current_app, request
+
+
+def is_admin_request() -> bool:
+    """Whether the request carries the configured ADMIN_TOKEN"""
+    token = current_app.config.get("ADMIN_TOKEN")
+    return bool(token) and hmac.compare_digest(
+        request.headers.get("X-Admin-Token", ""), token
+    )
+
+
+def admin_required(view):
+    """Require the configured ADMIN_TOKEN in the X-Admin-Token header"""
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not current_app.config.get("ADMIN_TOKEN"):
+            abort(404)
+        if not is_admin_request():
+            abort(403)
+        return view(*args, **kwargs)
+
+    return wrapped
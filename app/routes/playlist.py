@@ -1,25 +1,150 @@
 import os
 import uuid
+from array import array
+from typing import TYPE_CHECKING, Iterable, Optional
 
-import pandas as pd
 from flask import Blueprint, current_app, jsonify, request
 from flask_login import current_user, login_required
+from sqlalchemy import insert
 
-from app.ml.playlist_generator import PlaylistGenerator
-from app.models import Playlist, PlaylistTrack, Track, db
+from app.daily_mix import MixScheduler, utcnow
+from app.ml.executor import DeadlineExceeded, ExecutorSaturated, GenerationExecutor
+from app.ml.model_store import ModelRegistry
+from app.ml.result_cache import CacheBackend, MemoryCache
+from app.models import DailyMix, Playlist, PlaylistTrack, Track, UserTaste, db
+from app.profiler import follow
+from app.save_journal import SaveRecord, SaveWorker
+from app.traffic_capture import TrafficRecorder
+
+from .guards import admin_required
+from .responses import json_response
+
+if TYPE_CHECKING:
+    from app.ml.playlist_generator import PlaylistGenerator
+    from app.ml.taste import TasteProfile
 
 playlist_bp = Blueprint("playlist", __name__)
 
-model_path = os.path.join(
-    os.path.dirname(__file__), "../ml/pretrained/playlist_model.joblib"
-)
-generator = PlaylistGenerator(model_path=model_path)
+result_cache: Optional[CacheBackend] = MemoryCache()
+executor = GenerationExecutor()
+scoring_precision = "float32"
+query_cache_size = 4096
+# Write-behind persistence for /save, when SAVE_WRITE_BEHIND is on
+save_queue: Optional[SaveWorker] = None
+# Personalisation: query share from the taste profile (0 = off), decay per
+# saved playlist, sparse components kept per profile
+taste_weight = 0.3
+taste_decay = 0.9
+taste_components = 256
+# Precomputes daily mixes off-peak, when DAILY_MIX_SCHEDULE is on
+mix_scheduler: Optional[MixScheduler] = None
+# Sampled /generate payloads for offline replay, when TRAFFIC_CAPTURE_RATE > 0
+traffic_recorder: Optional[TrafficRecorder] = None
+
+# Catalog ID -> Track primary key, shared across save requests
+track_id_cache = MemoryCache(maxsize=100_000, ttl=0)
+
+# User ID -> sorted array of the catalog IDs in their saved playlists
+owned_tracks_cache = MemoryCache(maxsize=10_000, ttl=3600)
+
+
+def configure_new_generator(generator: "PlaylistGenerator") -> None:
+    generator.result_cache = result_cache
+    generator.scoring_precision = scoring_precision
+    # Components depend on the model's vocabulary, so each model gets its own
+    generator.query_cache = MemoryCache(maxsize=query_cache_size, ttl=0)
+
+
+def refork_workers(generator: "PlaylistGenerator") -> None:
+    # Process workers hold the model they were forked with; fork new ones
+    if executor.processes:
+        executor.reset()
+
+
+# The ML stack (pandas, scipy, sklearn) is imported on first use, so CLI
+# commands and workers that never generate a playlist don't pay for it.
+# Reloads swap the registry's single reference to a fully loaded generator.
+registry = ModelRegistry(configure=configure_new_generator, on_swap=refork_workers)
+
+
+@playlist_bp.record_once
+def configure_generator(state):
+    """Apply the app's cache and worker pool settings to the shared generator."""
+    global executor, result_cache, scoring_precision, query_cache_size, save_queue
+    global taste_weight, taste_decay, taste_components, mix_scheduler
+    global traffic_recorder
+
+    config = state.app.config
+    scoring_precision = config["SCORING_PRECISION"]
+    query_cache_size = config["QUERY_CACHE_SIZE"]
+    taste_weight = config["TASTE_WEIGHT"]
+    taste_decay = config["TASTE_DECAY"]
+    taste_components = config["TASTE_COMPONENTS"]
+    if config.get("GENERATE_CACHE_SIZE", 0) > 0:
+        result_cache = MemoryCache(
+            maxsize=config["GENERATE_CACHE_SIZE"], ttl=config["GENERATE_CACHE_TTL"]
+        )
+    else:
+        result_cache = None
+
+    executor = GenerationExecutor(
+        workers=config["GENERATE_WORKERS"],
+        queue_depth=config["GENERATE_QUEUE_DEPTH"],
+        timeout=config["GENERATE_TIMEOUT"],
+        processes=config["GENERATE_PROCESSES"],
+    )
+
+    if config.get("MODEL_WATCH_INTERVAL", 0) > 0:
+        registry.watch(config["MODEL_WATCH_INTERVAL"])
+
+    if config.get("TRAFFIC_CAPTURE_RATE", 0) > 0:
+        traffic_recorder = TrafficRecorder(
+            config["TRAFFIC_CAPTURE_DIR"]
+            or os.path.join(state.app.instance_path, "traffic"),
+            sample_rate=config["TRAFFIC_CAPTURE_RATE"],
+            max_bytes=config["TRAFFIC_CAPTURE_MAX_BYTES"],
+            backups=config["TRAFFIC_CAPTURE_BACKUPS"],
+        )
+
+    if config.get("DAILY_MIX_SCHEDULE"):
+        mix_scheduler = MixScheduler(
+            state.app, hour=config["DAILY_MIX_HOUR"], **daily_mix_options(config)
+        )
+        mix_scheduler.start()
+
+    if config.get("SAVE_WRITE_BEHIND"):
+        # Started on first use, so forked workers each get their own thread
+        save_queue = SaveWorker(
+            state.app,
+            config["SAVE_JOURNAL_DIR"]
+            or os.path.join(state.app.instance_path, "save-journal"),
+            persist=persist_saves,
+            batch_size=config["SAVE_BATCH_SIZE"],
+            interval=config["SAVE_FLUSH_INTERVAL"],
+        )
+
+
+def daily_mix_options(config) -> dict:
+    """refresh_daily_mixes arguments from the app config."""
+    return {
+        "num_tracks": config["DAILY_MIX_TRACKS"],
+        "active_days": config["DAILY_MIX_ACTIVE_DAYS"],
+        "refresh_after": config["DAILY_MIX_REFRESH_AFTER"],
+        "ttl": config["DAILY_MIX_TTL"],
+        "batch_size": config["DAILY_MIX_BATCH_SIZE"],
+    }
+
+
+def get_generator() -> "PlaylistGenerator":
+    """The live recommendation engine; grab it once per request."""
+    return registry.get()
 
 
 def init_app(app):
+    """Load the model eagerly, e.g. in a gunicorn master before forking."""
     with app.app_context():
         try:
-            if not generator.load_model():
+            if get_generator().tracks_df is None:
                 app.logger.warning(
                     "Failed to load recommendation model. Some features may be unavailable."
                 )
@@ -33,6 +158,7 @@ def init_app(app):
 def get_audio_features():
     """Get available audio features and their ranges."""
     try:
+        generator = get_generator()
         if generator.tracks_df is None:
             if not generator.load_model():
                 return jsonify({"error": "Recommendation model not available"}), 500
@@ -66,10 +192,29 @@ def get_audio_features():
         return jsonify({"error": "Failed to fetch audio features"}), 500
 
 
+@playlist_bp.route("/suggest", methods=["GET"])
+def suggest():
+    """Autocomplete artist and genre names from the catalog."""
+    try:
+        generator = get_generator()
+        if generator.tracks_df is None:
+            if not generator.load_model():
+                return jsonify({"error": "Recommendation model not available"}), 500
+
+        query = request.args.get("q", "")
+        limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+
+        return jsonify({"suggestions": generator.suggest(query, limit)})
+    except Exception as e:
+        current_app.logger.error(f"Error fetching suggestions: {str(e)}")
+        return jsonify({"error": "Failed to fetch suggestions"}), 500
+
+
 @playlist_bp.route("/generate", methods=["POST"])
 def generate_playlist():
     """Generate a playlist based on preferences with improved debugging."""
     try:
+        generator = get_generator()
         if generator.tracks_df is None:
             if not generator.load_model():
                 return jsonify({"error": "Recommendation model not available"}), 500
@@ -92,72 +237,51 @@ def generate_playlist():
         track_count = data.get("trackCount", 20)
         feature_preferences = data.get("features", {})
 
-        # Validate inputs
-        if not genres and not artists and not feature_preferences:
+        # Leave out tracks the user already saved and, on regenerate, the
+        # previous results the client sends back
+        exclude_ids = {parse_catalog_id(value) for value in data.get("exclude", [])}
+        exclude_ids.discard(None)
+        taste = None
+        if current_user.is_authenticated:
+            exclude_ids.update(owned_catalog_ids(current_user.id))
+            if taste_weight > 0 and data.get("personalize", True):
+                taste = load_taste(current_user.id, generator)
+
+        # Validate inputs; a taste profile is enough on its own
+        if not genres and not artists and not feature_preferences and taste is None:
             return jsonify(
                 {
                     "error": "At least one genre, artist, or audio feature preference is required"
                 }
             ), 400
 
-        preferences = {"genres": genres, "artists": artists}
+        preferences = {
+            "genres": genres,
+            "artists": artists,
+            "features": feature_preferences,
+        }
 
-        # Log model state
-        if generator.tracks_df is not None:
-            current_app.logger.info(f"Model has {len(generator.tracks_df)} tracks")
-            if "genre" in generator.tracks_df.columns:
-                genres_in_model = (
-                    generator.tracks_df["genre"].dropna().unique()[:10]
-                )  # Show first 10
-                current_app.logger.info(f"Sample genres in model: {genres_in_model}")
+        current_app.logger.info(f"Model has {len(generator.tracks_df)} tracks")
+        mmr_lambda = parse_mmr_lambda(data)
+        if traffic_recorder is not None:
+            traffic_recorder.record(preferences, track_count, mmr_lambda)
 
         # Generate recommendations
-        current_app.logger.info("Calling generate_playlist method...")
-        recommended_tracks = generator.generate_playlist(
-            preferences=preferences, num_tracks=track_count
-        )
-        current_app.logger.info(
-            f"Received {len(recommended_tracks)} recommended tracks"
-        )
-
-        formatted_tracks = []
-        for track in recommended_tracks:
-            # Get artist and title, handling potential missing values
-            artist_name = track.get("artist", None)
-            if pd.isna(artist_name):
-                artist_name = "Unknown Artist"
-
-            title_name = track.get("title", None)
-            if pd.isna(title_name):
-                title_name = "Unknown Track"
-
-            # Create a formatted track object
-            formatted_track = {
-                "id": track.get(
-                    "id", str(uuid.uuid4())
-                ),  # Generate an ID if none exists
-                "title": title_name,
-                "artist": artist_name,
-                "album": track.get("album", "Unknown Album")
-                if not pd.isna(track.get("album", None))
-                else "Unknown Album",
-            }
+        current_app.logger.info("Calling recommend method...")
+        try:
+            formatted_tracks = run_job(
+                generate_tracks,
+                generator,
+                preferences=preferences,
+                num_tracks=track_count,
+                exclude_ids=list(exclude_ids),
+                mmr_lambda=mmr_lambda,
+                taste=taste,
+            )
+        except (ExecutorSaturated, DeadlineExceeded) as e:
+            return busy_response(e)
 
-            for feature in [
-                "danceability",
-                "energy",
-                "loudness",
-                "speechiness",
-                "acousticness",
-                "instrumentalness",
-                "liveness",
-                "valence",
-                "tempo",
-            ]:
-                if feature in track and not pd.isna(track[feature]):
-                    formatted_track[feature] = float(track[feature])
-
-            formatted_tracks.append(formatted_track)
+        current_app.logger.info(f"Received {len(formatted_tracks)} recommended tracks")
 
         if formatted_tracks:
             sample_tracks = formatted_tracks[:3]
@@ -175,7 +299,7 @@ def generate_playlist():
             "tracks": formatted_tracks,
         }
 
-        return jsonify(playlist)
+        return json_response(playlist)
     except Exception as e:
         current_app.logger.error(f"Error generating playlist: {str(e)}")
         import traceback
@@ -184,6 +308,346 @@ def generate_playlist():
         return jsonify({"error": f"Failed to generate playlist: {str(e)}"}), 500
 
 
+@playlist_bp.route("/extend", methods=["POST"])
+@playlist_bp.route("/<uuid:playlist_id>/extend", methods=["POST"])
+def extend_playlist(playlist_id: Optional[uuid.UUID] = None):
+    """
+    Recommend tracks like a saved playlist, or like the catalog IDs posted
+    as "seeds" when no playlist is given.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        track_count = data.get("trackCount", 20)
+        strategy = data.get("strategy", "centroid")
+
+        if playlist_id is not None:
+            if not current_user.is_authenticated:
+                return jsonify({"error": "Unauthorized"}), 401
+            playlist = db.session.get(Playlist, playlist_id)
+            if playlist is None or playlist.user_id != current_user.id:
+                return jsonify({"error": "Playlist not found"}), 404
+            seed_ids = [
+                catalog_id
+                for (catalog_id,) in db.session.query(Track.catalog_id)
+                .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+                .filter(
+                    PlaylistTrack.playlist_id == playlist_id,
+                    Track.catalog_id.isnot(None),
+                )
+                .all()
+            ]
+        else:
+            seed_ids = [parse_catalog_id(value) for value in data.get("seeds", [])]
+            seed_ids = [catalog_id for catalog_id in seed_ids if catalog_id is not None]
+
+        if not seed_ids:
+            return jsonify({"error": "At least one seed track is required"}), 400
+
+        from app.ml.playlist_generator import PlaylistGenerator
+
+        if strategy not in PlaylistGenerator.SEED_STRATEGIES:
+            return jsonify({"error": f"Unknown strategy: {strategy}"}), 400
+
+        exclude_ids = {parse_catalog_id(value) for value in data.get("exclude", [])}
+        exclude_ids.discard(None)
+        if current_user.is_authenticated:
+            exclude_ids.update(owned_catalog_ids(current_user.id))
+
+        try:
+            formatted_tracks = run_job(
+                extend_tracks,
+                get_generator(),
+                seed_ids=seed_ids,
+                num_tracks=track_count,
+                strategy=strategy,
+                exclude_ids=list(exclude_ids),
+                mmr_lambda=parse_mmr_lambda(data),
+            )
+        except (ExecutorSaturated, DeadlineExceeded) as e:
+            return busy_response(e)
+
+        return json_response(
+            {
+                "playlist_id": str(playlist_id) if playlist_id else None,
+                "strategy": strategy,
+                "seed_count": len(seed_ids),
+                "tracks": formatted_tracks,
+            }
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error extending playlist: {str(e)}")
+        return jsonify({"error": f"Failed to extend playlist: {str(e)}"}), 500
+
+
+def busy_response(error: Exception):
+    """503 for requests the generation pool turned away or gave up on."""
+    current_app.logger.warning(f"Rejected playlist generation: {str(error)}")
+    response = jsonify({"error": f"{str(error)}, please retry shortly"})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(current_app.config["GENERATE_RETRY_AFTER"])
+    return response
+
+
+def model_memory_stats() -> Optional[dict]:
+    """Bytes held by each part of the active model, as reported at load"""
+    generator = registry.active
+    if generator is None or generator.memory_report is None:
+        return None
+
+    from app.ml.memory import memory_total
+
+    return {
+        "total_bytes": memory_total(generator.memory_report),
+        "breakdown": generator.memory_report,
+    }
+
+
+@playlist_bp.route("/metrics", methods=["GET"])
+@admin_required
+def get_metrics():
+    """Report generator cache statistics."""
+    return jsonify(
+        {
+            "model_version": (
+                registry.active.model_version if registry.active else None
+            ),
+            "result_cache": result_cache.stats() if result_cache is not None else None,
+            "query_cache": (
+                registry.active.query_cache.stats() if registry.active else None
+            ),
+            "owned_tracks_cache": owned_tracks_cache.stats(),
+            "executor": executor.stats(),
+            "scoring_precision": scoring_precision,
+            "model_memory": model_memory_stats(),
+            "save_queue": save_queue.stats() if save_queue is not None else None,
+            "daily_mix": mix_scheduler.stats() if mix_scheduler is not None else None,
+            "traffic_capture": (
+                traffic_recorder.stats() if traffic_recorder is not None else None
+            ),
+        }
+    )
+
+
+@playlist_bp.route("/daily-mix", methods=["GET"])
+@login_required
+def get_daily_mix():
+    """
+    Serve the user's precomputed daily mix: one primary-key read and a
+    column gather, with no scoring on the request path.
+    """
+    mix = db.session.get(DailyMix, current_user.id)
+    if mix is None or mix.expires_at <= utcnow():
+        return jsonify({"error": "No daily mix available"}), 404
+
+    generator = get_generator()
+    if generator.tracks_df is None and not generator.load_model():
+        return jsonify({"error": "Recommendation model not available"}), 500
+
+    import numpy as np
+
+    catalog_ids = np.frombuffer(mix.catalog_ids, dtype="<i8")
+    rows = generator.rows_for_catalog_ids(catalog_ids, keep_order=True)
+    return json_response(
+        {
+            "playlist_name": "Daily Mix",
+            "generated_at": mix.created_at.isoformat(),
+            "expires_at": mix.expires_at.isoformat(),
+            "tracks": generator.format_tracks(rows),
+        }
+    )
+
+
+def run_job(fn, generator: "PlaylistGenerator", **kwargs):
+    """
+    Run a generation job on the executor against the request's generator, so
+    a hot swap mid-request can't change the model under it. Process workers
+    can't share the object; they get its version and use the model they were
+    forked with, since a swap re-forks the pool (see refork_workers).
+    """
+    if executor.processes:
+        return executor.run(fn, generator.model_version, **kwargs)
+    return executor.run(follow(fn), generator, **kwargs)
+
+
+def job_generator(generator) -> "PlaylistGenerator":
+    """The generator a job runs against, given what run_job passed it."""
+    if not isinstance(generator, str):
+        return generator
+    # In a worker process: the model it was forked with. Only a job that
+    # raced a swap sees a version other than the request's, and its pool is
+    # already being retired.
+    local = registry.active
+    assert local is not None
+    return local
+
+
+def generate_tracks(
+    generator,
+    preferences: dict,
+    num_tracks: int,
+    exclude_ids: Optional[list[int]] = None,
+    mmr_lambda: Optional[float] = None,
+    taste: Optional["TasteProfile"] = None,
+) -> list[dict]:
+    """Recommend and format tracks; runs on the executor's workers."""
+    generator = job_generator(generator)
+    exclude = generator.rows_for_catalog_ids(exclude_ids) if exclude_ids else None
+    indices = generator.recommend(
+        preferences=preferences,
+        num_tracks=num_tracks,
+        exclude=exclude,
+        mmr_lambda=mmr_lambda,
+        taste=taste,
+        taste_weight=taste_weight,
+    )
+    return generator.format_tracks(indices)
+
+
+def extend_tracks(
+    generator,
+    seed_ids: list[int],
+    num_tracks: int,
+    strategy: str,
+    exclude_ids: Optional[list[int]] = None,
+    mmr_lambda: Optional[float] = None,
+) -> list[dict]:
+    """Recommend and format tracks like the seeds; runs on the executor."""
+    generator = job_generator(generator)
+    seed_rows = generator.rows_for_catalog_ids(seed_ids)
+    exclude = generator.rows_for_catalog_ids(exclude_ids) if exclude_ids else None
+    indices = generator.recommend_similar(
+        seed_rows,
+        num_tracks=num_tracks,
+        exclude=exclude,
+        strategy=strategy,
+        mmr_lambda=mmr_lambda,
+    )
+    return generator.format_tracks(indices)
+
+
+def owned_catalog_ids(user_id) -> array:
+    """Catalog IDs of every track in the user's saved playlists (cached)."""
+    owned = owned_tracks_cache.get(user_id)
+    if owned is None:
+        rows = (
+            db.session.query(Track.catalog_id)
+            .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+            .join(Playlist, Playlist.id == PlaylistTrack.playlist_id)
+            .filter(Playlist.user_id == user_id, Track.catalog_id.isnot(None))
+            .distinct()
+            .all()
+        )
+        owned = array("q", sorted(catalog_id for (catalog_id,) in rows))
+        owned_tracks_cache.set(user_id, owned)
+    return owned
+
+
+def remember_owned_tracks(user_id, tracks: list[dict]) -> None:
+    """Fold a newly saved playlist into the user's cached owned tracks."""
+    owned = owned_tracks_cache.get(user_id)
+    if owned is None:
+        return
+    saved = {parse_catalog_id(track.get("id")) for track in tracks} - {None}
+    owned_tracks_cache.set(user_id, array("q", sorted(saved.union(owned))))
+
+
+def load_taste(
+    user_id, generator: "PlaylistGenerator", rebuild: bool = False
+) -> Optional["TasteProfile"]:
+    """
+    The user's taste profile for the active model. A missing or stale one
+    (saves made before it existed, or a different model) is None unless
+    ``rebuild`` is set; /generate never rebuilds, the next save, the daily
+    mix job or ``flask taste rebuild`` do.
+    """
+    from app.ml.taste import TasteProfile
+
+    row = db.session.get(UserTaste, user_id)
+    if row is not None and row.model_version == generator.model_version:
+        return TasteProfile.from_columns(
+            row.model_version,
+            row.weight,
+            row.audio,
+            row.component_indices,
+            row.component_values,
+        )
+    if not rebuild:
+        return None
+
+    profile = rebuild_taste(user_id, generator, row=row)
+    db.session.commit()
+    return profile
+
+
+def rebuild_taste(
+    user_id,
+    generator: "PlaylistGenerator",
+    catalog_ids: Iterable[int] = (),
+    row: Optional[UserTaste] = None,
+) -> Optional["TasteProfile"]:
+    """
+    Build the user's taste profile from every track they have saved, plus
+    ``catalog_ids`` (e.g. a playlist being saved); the caller commits.
+    Costs a scan of the user's saved tracks, so it runs once per user and
+    model, never per request.
+    """
+    saved = set(owned_catalog_ids(user_id)).union(catalog_ids)
+    if not saved:
+        return None
+    profile = generator.update_taste(None, saved, max_components=taste_components)
+
+    if row is None:
+        row = UserTaste(user_id=user_id)
+        db.session.add(row)
+    for field, value in profile.to_columns().items():
+        setattr(row, field, value)
+    return profile
+
+
+def update_taste(user_id, tracks: list[dict]) -> None:
+    """
+    Fold a saved playlist into the user's taste profile; the caller commits.
+    Costs one row lookup and O(playlist length) work, whatever the user has
+    saved before. A missing profile, or one built for another model, is
+    rebuilt here instead (see rebuild_taste). With personalisation off
+    (TASTE_WEIGHT 0) saves don't touch profiles at all.
+    """
+    if taste_weight <= 0:
+        return
+
+    from app.ml.taste import TasteProfile
+
+    generator = registry.active
+    row = db.session.get(UserTaste, user_id, with_for_update=True)
+    if row is None:
+        row = UserTaste(user_id=user_id)
+        db.session.add(row)
+
+    if generator is None or generator.tracks_df is None:
+        # No model to build against: rebuilt by the next save or
+        # flask taste rebuild
+        row.model_version = None
+        return
+
+    catalog_ids = {parse_catalog_id(track.get("id")) for track in tracks} - {None}
+    if row.model_version != generator.model_version:
+        rebuild_taste(user_id, generator, catalog_ids, row=row)
+        return
+
+    profile = TasteProfile.from_columns(
+        row.model_version,
+        row.weight,
+        row.audio,
+        row.component_indices,
+        row.component_values,
+    )
+    profile = generator.update_taste(
+        profile, catalog_ids, taste_decay, taste_components
+    )
+    for field, value in profile.to_columns().items():
+        setattr(row, field, value)
+
+
 @playlist_bp.route("/save", methods=["POST"])
 @login_required
 def save_playlist():
@@ -200,43 +664,30 @@ def save_playlist():
         if not playlist_name or not tracks:
             return jsonify({"error": "Playlist name and tracks are required"}), 400
 
+        if save_queue is not None:
+            return queue_save(playlist_name, tracks)
+
         # Create new playlist
         new_playlist = Playlist(
             id=uuid.uuid4(), name=playlist_name, user_id=current_user.id
         )
-
         db.session.add(new_playlist)
-        db.session.flush()  # Flush to get the playlist ID
 
         # Add tracks to the database
-        for index, track_data in enumerate(tracks):
-            # Check if track already exists
-            existing_track = Track.query.filter_by(
-                title=track_data["title"], artist=track_data["artist"]
-            ).first()
-
-            if existing_track:
-                track = existing_track
-            else:
-                # Create new track
-                track = Track(
-                    id=uuid.uuid4(),
-                    title=track_data["title"],
-                    artist=track_data["artist"],
-                    genre=track_data.get("genre", ""),
-                )
-                db.session.add(track)
-                db.session.flush()  # Flush to get the track ID
-
+        track_ids = resolve_track_ids(tracks)
+        for index, track_id in enumerate(track_ids):
             playlist_track = PlaylistTrack(
                 id=uuid.uuid4(),
                 playlist_id=new_playlist.id,
-                track_id=track.id,
+                track_id=track_id,
                 position=index,
             )
             db.session.add(playlist_track)
 
+        update_taste(current_user.id, tracks)
         db.session.commit()
+        remember_track_ids(tracks, track_ids)
+        remember_owned_tracks(current_user.id, tracks)
 
         return jsonify(
             {
@@ -252,6 +703,250 @@ def save_playlist():
         return jsonify({"error": f"Failed to save playlist: {str(e)}"}), 500
 
 
+# The track fields resolve_track_ids needs
+JOURNAL_TRACK_FIELDS = ("id", "title", "artist", "genre")
+
+
+def queue_save(playlist_name: str, tracks: list[dict]):
+    """Reserve the playlist ID and journal the save; the worker persists it."""
+    playlist_id = uuid.uuid4()
+    save_queue.submit(  # type: ignore
+        {
+            "playlist_id": str(playlist_id),
+            "user_id": str(current_user.id),
+            "name": playlist_name,
+            "tracks": [
+                {field: track.get(field) for field in JOURNAL_TRACK_FIELDS}
+                for track in tracks
+            ],
+        }
+    )
+    remember_owned_tracks(current_user.id, tracks)
+
+    return jsonify(
+        {
+            "success": True,
+            "message": "Playlist accepted for saving",
+            "playlist_id": str(playlist_id),
+            "status": "pending",
+        }
+    ), 202
+
+
+def persist_saves(records: list[SaveRecord]) -> None:
+    """
+    Write journalled saves in one transaction with bulk inserts. Saves
+    whose playlist already exists (a replay after a crash) are skipped.
+    """
+    playlist_ids = [uuid.UUID(record["playlist_id"]) for record in records]
+    existing = {
+        playlist_id
+        for (playlist_id,) in db.session.query(Playlist.id).filter(
+            Playlist.id.in_(playlist_ids)
+        )
+    }
+    records = [
+        record
+        for record, playlist_id in zip(records, playlist_ids)
+        if playlist_id not in existing
+    ]
+    if not records:
+        return
+
+    try:
+        all_tracks = [track for record in records for track in record["tracks"]]
+        track_ids = resolve_track_ids(all_tracks)
+        db.session.flush()
+
+        playlist_rows = []
+        playlist_track_rows = []
+        position = 0
+        for record in records:
+            playlist_id = uuid.UUID(record["playlist_id"])
+            playlist_rows.append(
+                {
+                    "id": playlist_id,
+                    "name": record["name"],
+                    "user_id": uuid.UUID(record["user_id"]),
+                }
+            )
+            for index in range(len(record["tracks"])):
+                playlist_track_rows.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "playlist_id": playlist_id,
+                        "track_id": track_ids[position],
+                        "position": index,
+                    }
+                )
+                position += 1
+
+        db.session.execute(insert(Playlist), playlist_rows)
+        db.session.execute(insert(PlaylistTrack), playlist_track_rows)
+        for record in records:
+            update_taste(uuid.UUID(record["user_id"]), record["tracks"])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    remember_track_ids(all_tracks, track_ids)
+
+
+@playlist_bp.route("/<uuid:playlist_id>/status", methods=["GET"])
+@login_required
+def save_status(playlist_id: uuid.UUID):
+    """Report whether one of the user's saved playlists has reached the database."""
+    state = (
+        save_queue.state(str(playlist_id), str(current_user.id))
+        if save_queue is not None
+        else None
+    )
+    if state is None:
+        playlist = db.session.get(Playlist, playlist_id)
+        if playlist is not None and playlist.user_id == current_user.id:
+            state = "saved"
+
+    if state is None:
+        # Also what another process's still-pending save looks like
+        return jsonify({"playlist_id": str(playlist_id), "state": "unknown"}), 404
+    return jsonify({"playlist_id": str(playlist_id), "state": state})
+
+
+def parse_mmr_lambda(data: dict) -> Optional[float]:
+    """MMR trade-off from the payload (0..1), else the configured default."""
+    default = current_app.config["GENERATE_MMR_LAMBDA"]
+    try:
+        value = data.get("mmrLambda", default)
+        return None if value is None else min(max(float(value), 0.0), 1.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_catalog_id(value) -> int | None:
+    """Catalog IDs travel as decimal strings; legacy payloads carry UUIDs."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_track_ids(tracks: list[dict]) -> list[uuid.UUID]:
+    """
+    Map payload tracks to Track primary keys, adding tracks we haven't seen.
+
+    Known catalog IDs come from an in-process cache or a single IN query.
+    Tracks saved before catalog IDs existed are matched by name in one more
+    query, and new catalog tracks are inserted in one statement that skips
+    IDs a concurrent save inserted first; a few queries per save, whatever
+    its length.
+    """
+    catalog_ids = [parse_catalog_id(track.get("id")) for track in tracks]
+
+    resolved: dict[int, uuid.UUID] = {}
+    uncached = set()
+    for catalog_id in set(catalog_ids) - {None}:
+        track_id = track_id_cache.get(catalog_id)
+        if track_id is not None:
+            resolved[catalog_id] = track_id
+        else:
+            uncached.add(catalog_id)
+
+    if uncached:
+        resolved.update(select_track_ids(uncached))
+
+    # Tracks saved before catalog IDs existed are matched by name once
+    unresolved = [
+        track_data
+        for catalog_id, track_data in zip(catalog_ids, tracks)
+        if catalog_id not in resolved
+    ]
+    legacy: dict[tuple[str, str], Track] = {}
+    if unresolved:
+        rows = Track.query.filter(
+            Track.catalog_id.is_(None),
+            Track.title.in_({track_data["title"] for track_data in unresolved}),
+            Track.artist.in_({track_data["artist"] for track_data in unresolved}),
+        )
+        for track in rows:
+            legacy.setdefault((track.title, track.artist), track)
+
+    new_rows: dict[int, dict] = {}
+    by_name: dict[tuple[str, str], uuid.UUID] = {}
+    for catalog_id, track_data in zip(catalog_ids, tracks):
+        if catalog_id in resolved or catalog_id in new_rows:
+            continue
+        name = (track_data["title"], track_data["artist"])
+        track = legacy.get(name)
+        if track is not None:
+            if catalog_id is not None and track.catalog_id is None:
+                track.catalog_id = catalog_id
+                resolved[catalog_id] = track.id
+            by_name[name] = track.id
+        elif catalog_id is not None:
+            new_rows[catalog_id] = {
+                "id": uuid.uuid4(),
+                "catalog_id": catalog_id,
+                "title": track_data["title"],
+                "artist": track_data["artist"],
+                "genre": track_data.get("genre", ""),
+            }
+        elif name not in by_name:
+            track = Track(
+                id=uuid.uuid4(),
+                title=track_data["title"],
+                artist=track_data["artist"],
+                genre=track_data.get("genre", ""),
+            )
+            db.session.add(track)
+            by_name[name] = track.id
+
+    if new_rows:
+        insert_catalog_tracks(list(new_rows.values()))
+        # Rows another save inserted first resolve to that save's track
+        resolved.update(select_track_ids(new_rows))
+
+    return [
+        resolved[catalog_id]
+        if catalog_id in resolved
+        else by_name[(track_data["title"], track_data["artist"])]
+        for catalog_id, track_data in zip(catalog_ids, tracks)
+    ]
+
+
+def select_track_ids(catalog_ids) -> dict[int, uuid.UUID]:
+    """Track primary keys for catalog IDs, in one IN query."""
+    rows = db.session.query(Track.catalog_id, Track.id).filter(
+        Track.catalog_id.in_(list(catalog_ids))
+    )
+    return {catalog_id: track_id for catalog_id, track_id in rows}
+
+
+def insert_catalog_tracks(rows: list[dict]) -> None:
+    """
+    Insert catalog tracks in one statement. Catalog IDs that already exist,
+    e.g. from a concurrent save of the same track, are skipped instead of
+    failing the save on the unique index.
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as insert_ignoring
+    else:
+        from sqlalchemy.dialects.sqlite import insert as insert_ignoring
+
+    statement = insert_ignoring(Track).on_conflict_do_nothing(
+        index_elements=[Track.catalog_id]
+    )
+    db.session.execute(statement, rows)
+
+
+def remember_track_ids(tracks: list[dict], track_ids: list[uuid.UUID]) -> None:
+    """Cache committed catalog ID -> Track ID pairs; tracks are never deleted."""
+    for track_data, track_id in zip(tracks, track_ids):
+        catalog_id = parse_catalog_id(track_data.get("id"))
+        if catalog_id is not None:
+            track_id_cache.set(catalog_id, track_id)
+
+
 def get_feature_description(feature):
     """Get a user-friendly description for an audio feature."""
     descriptions = {
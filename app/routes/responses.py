@@ -0,0 +1,13 @@
+from typing import Any
+
+import orjson
+from flask import Response
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """
+    Serialise a payload of plain Python types with orjson
+
+    Unlike jsonify, nothing is sorted or pretty-printed.
+    """
+    return Response(orjson.dumps(payload), status=status, mimetype="application/json")
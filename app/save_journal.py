@@ -0,0 +1,328 @@
+import fcntl
+import glob
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from flask import Flask
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+JOURNAL_PATTERN = "saves-*.jsonl"
+
+# Errors that say the database is unreachable, not that a record is bad
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+SaveRecord = dict[str, Any]
+
+
+def write_atomic(path: str, content: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SaveJournal:
+    """
+    Append-only JSON-lines journal of accepted saves.
+
+    Each record is fsynced before the request that produced it returns. The
+    byte offset up to which records have reached the database is kept in a
+    sidecar file, so a restart only replays what may not have been persisted.
+    Replaying a record that was persisted is harmless: saves are keyed by the
+    playlist ID reserved when they were accepted.
+
+    The journal holds an exclusive lock on its file for as long as it is
+    open, so a journal that can be locked belongs to a process that died.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Journal file; created if missing
+
+        Raises:
+            BlockingIOError: Another live process owns the journal
+        """
+        self.path = path
+        self.offset_path = f"{path}.offset"
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._file.close()
+            raise
+
+        self._trim_torn_tail()
+        self.offset = self._read_offset()
+
+    def _trim_torn_tail(self) -> None:
+        # A crash mid-append leaves a partial line that was never acknowledged
+        self._file.seek(0)
+        data = self._file.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            self._file.truncate(end)
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path) as f:
+                offset = int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        # The journal was truncated after the offset was last written
+        return offset if offset <= self.size() else 0
+
+    def size(self) -> int:
+        return os.fstat(self._file.fileno()).st_size
+
+    def pending_bytes(self) -> int:
+        return self.size() - self.offset
+
+    def append(self, record: SaveRecord) -> None:
+        """Durably add a record"""
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def read(self, limit: int, start: Optional[int] = None) -> tuple[list, int]:
+        """
+        Records not yet persisted
+
+        Args:
+            limit: Maximum number of records
+            start: Offset to read from; defaults to the persisted offset
+
+        Returns:
+            Tuple of (records, offset just past the last one returned)
+        """
+        end = self.offset if start is None else start
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(end)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                records.append(json.loads(line))
+                end += len(line)
+                if len(records) >= limit:
+                    break
+        return records, end
+
+    def advance(self, offset: int) -> None:
+        """Mark every record before offset as persisted"""
+        with self._lock:
+            if offset >= self.size():
+                # Fully drained: start over instead of growing forever
+                self._file.truncate(0)
+                offset = 0
+            write_atomic(self.offset_path, str(offset))
+            self.offset = offset
+
+    def close(self, remove: bool = False) -> None:
+        if remove:
+            for path in (self.path, self.offset_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._file.close()
+
+
+class SaveWorker:
+    """
+    Write-behind persistence for saved playlists.
+
+    Requests append to this process's journal and return; a background
+    thread drains it in batches through ``persist``. Journals left behind by
+    processes that died are claimed and drained first.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        directory: str,
+        persist: Callable[[list[SaveRecord]], None],
+        batch_size: int = 100,
+        interval: float = 0.5,
+        rejected_limit: int = 1000,
+    ) -> None:
+        """
+        Args:
+            app: Application whose context the worker runs in
+            directory: Where journals live; shared by every process
+            persist: Writes a batch of records in one transaction, skipping
+                records already in the database
+            batch_size: Maximum records per transaction
+            interval: Seconds between drains when the queue is not full
+            rejected_limit: How many rejected playlist IDs to remember
+        """
+        self.app = app
+        self.directory = directory
+        self.persist = persist
+        self.batch_size = batch_size
+        self.interval = interval
+        self.rejected_limit = rejected_limit
+
+        self.journal: Optional[SaveJournal] = None
+        self._orphans: list[SaveJournal] = []
+        self._start_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._wake = threading.Event()
+        # Playlist ID -> owning user ID (and, once rejected, the error)
+        self._pending: dict[str, Optional[str]] = {}
+        self._rejected: OrderedDict[str, tuple[Optional[str], str]] = OrderedDict()
+
+        self.persisted = 0
+        self.batches = 0
+        self.replayed = 0
+        self.last_error: Optional[str] = None
+        self.last_flush: Optional[float] = None
+
+    def start(self) -> None:
+        """Open this process's journal and start draining; idempotent"""
+        if self.journal is not None:
+            return
+        with self._start_lock:
+            if self.journal is not None:
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"saves-{socket.gethostname()}-{os.getpid()}.jsonl"
+            own_path = os.path.join(self.directory, name)
+
+            for path in sorted(
+                glob.glob(os.path.join(self.directory, JOURNAL_PATTERN))
+            ):
+                if path == own_path:
+                    continue
+                try:
+                    orphan = SaveJournal(path)
+                except BlockingIOError:
+                    continue
+                self._orphans.append(orphan)
+                records, _ = orphan.read(limit=2**31)
+                self._track_pending(records)
+
+            # A reused PID picks up its predecessor's journal as its own
+            journal = SaveJournal(own_path)
+            self._track_pending(journal.read(limit=2**31)[0])
+            self.journal = journal
+
+            threading.Thread(target=self._run, name="save-journal", daemon=True).start()
+
+    def submit(self, record: SaveRecord) -> None:
+        """Durably accept a save; it reaches the database on a later batch"""
+        self.start()
+        assert self.journal is not None
+        self.journal.append(record)
+        self._track_pending([record])
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def state(self, playlist_id: str, user_id: Optional[str] = None) -> Optional[str]:
+        """
+        'pending' or 'rejected' for saves this process knows about; with a
+        user ID, only for that user's saves
+        """
+        with self._state_lock:
+            if playlist_id in self._pending:
+                owner, state = self._pending[playlist_id], "pending"
+            elif playlist_id in self._rejected:
+                owner, state = self._rejected[playlist_id][0], "rejected"
+            else:
+                return None
+        return state if user_id is None or owner == user_id else None
+
+    def stats(self) -> dict[str, Any]:
+        journals = ([self.journal] if self.journal else []) + self._orphans
+        return {
+            "started": self.journal is not None,
+            "pending": len(self._pending),
+            "pending_bytes": sum(journal.pending_bytes() for journal in journals),
+            "orphaned_journals": len(self._orphans),
+            "persisted": self.persisted,
+            "replayed": self.replayed,
+            "batches": self.batches,
+            "rejected": len(self._rejected),
+            "last_flush": self.last_flush,
+            "last_error": self.last_error,
+        }
+
+    def _track_pending(self, records: list[SaveRecord]) -> None:
+        with self._state_lock:
+            for record in records:
+                self._pending[record["playlist_id"]] = record.get("user_id")
+
+    def _settle(self, records: list[SaveRecord], error: Optional[str] = None) -> None:
+        """Records are done: persisted, or rejected with an error"""
+        with self._state_lock:
+            for record in records:
+                self._pending.pop(record["playlist_id"], None)
+                if error is not None:
+                    self._rejected[record["playlist_id"]] = (
+                        record.get("user_id"),
+                        error,
+                    )
+            while len(self._rejected) > self.rejected_limit:
+                self._rejected.popitem(last=False)
+
+    def _run(self) -> None:
+        backoff = self.interval
+        while True:
+            self._wake.wait(backoff)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    for orphan in list(self._orphans):
+                        self.replayed += self._drain(orphan)
+                        self._orphans.remove(orphan)
+                        orphan.close(remove=True)
+                    self._drain(self.journal)  # type: ignore
+                backoff = self.interval
+            except TRANSIENT_ERRORS as e:
+                # Database unavailable: keep everything queued and retry later
+                self.last_error = str(e)
+                backoff = min(backoff * 2, 30.0)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Save journal worker error: {e}")
+
+    def _drain(self, journal: SaveJournal) -> int:
+        drained = 0
+        while True:
+            records, end = journal.read(self.batch_size)
+            if not records:
+                return drained
+
+            persisted = len(records)
+            try:
+                self.persist(records)
+            except TRANSIENT_ERRORS:
+                raise
+            except Exception:
+                # Isolate the bad records so the rest of the batch goes through
+                for record in records:
+                    try:
+                        self.persist([record])
+                    except TRANSIENT_ERRORS:
+                        raise
+                    except Exception as e:
+                        self.last_error = f"Rejected {record['playlist_id']}: {e}"
+                        print(f"Save journal: {self.last_error}")
+                        self._settle([record], error=str(e))
+                        persisted -= 1
+
+            self._settle(records)
+            journal.advance(end)
+            drained += len(records)
+            self.persisted += persisted
+            self.batches += 1
+            self.last_flush = time.time()
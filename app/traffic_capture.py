@@ -0,0 +1,117 @@
+import glob
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Iterator, Optional
+
+CAPTURE_PATTERN = "generate-*.jsonl*"
+
+
+class TrafficRecorder:
+    """
+    Sampled capture of /generate payloads for offline replay
+    (benchmarks/replay.py).
+
+    Only the preference payload is written, never who sent it. Each process
+    writes its own file in the capture directory, rotated at ``max_bytes``
+    with ``backups`` old files kept, so capture disk use is bounded.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float,
+        max_bytes: int = 10 * 2**20,
+        backups: int = 5,
+    ) -> None:
+        """
+        Args:
+            directory: Where capture files go
+            sample_rate: Fraction of requests recorded (0..1)
+            max_bytes: Size at which a file is rotated
+            backups: Rotated files kept per process
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._logger: Optional[logging.Logger] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def _open(self) -> logging.Logger:
+        # Opened on first use, so processes forked after setup each get a file
+        with self._lock:
+            if self._logger is None or self._pid != os.getpid():
+                os.makedirs(self.directory, exist_ok=True)
+                name = f"generate-{socket.gethostname()}-{os.getpid()}.jsonl"
+                handler = RotatingFileHandler(
+                    os.path.join(self.directory, name),
+                    maxBytes=self.max_bytes,
+                    backupCount=self.backups,
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger(f"{__name__}.{os.getpid()}")
+                logger.handlers = [handler]
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                self._logger = logger
+                self._pid = os.getpid()
+            return self._logger
+
+    def record(
+        self,
+        preferences: dict[str, Any],
+        track_count: Any,
+        mmr_lambda: Optional[float] = None,
+    ) -> bool:
+        """Write the request with probability sample_rate; True if written"""
+        if random.random() >= self.sample_rate:
+            return False
+        entry = {
+            "ts": round(time.time(), 3),
+            "artists": preferences.get("artists") or [],
+            "genres": preferences.get("genres") or [],
+            "features": preferences.get("features") or {},
+            "trackCount": track_count,
+        }
+        if mmr_lambda is not None:
+            entry["mmrLambda"] = mmr_lambda
+        self._open().info(json.dumps(entry, separators=(",", ":")))
+        self.recorded += 1
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {"sample_rate": self.sample_rate, "recorded": self.recorded}
+
+
+def read_capture(paths: list[str]) -> Iterator[dict[str, Any]]:
+    """
+    Captured requests from capture files or directories, oldest first.
+    Lines cut short by a crash or a rotation mid-write are skipped.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, CAPTURE_PATTERN)))
+        else:
+            files.append(path)
+
+    entries = []
+    for path in files:
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict):
+                    entries.append(entry)
+    entries.sort(key=lambda entry: entry.get("ts", 0))
+    return iter(entries)
@@ -0,0 +1,93 @@
+"""
+Export a synthetic playlist to the local mock providers at several
+concurrency levels and report wall time, requests and throttling.
+
+Concurrency 1 is the sequential baseline: one search or add at a time. The
+mock's rate limit applies per provider, so higher concurrency runs into 429s
+and the client's Retry-After handling.
+
+    python benchmarks/export.py [--tracks 200] [--concurrency 1 4 8 16]
+        [--rate 100] [--burst 20] [--latency 0.03]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+
+async def run_export(provider, server, tracks: list[dict], concurrency: int) -> dict:
+    from app.export import ExportState, ProviderClient, export_playlist
+
+    state = ExportState()
+    checkpoints = 0
+
+    def checkpoint(_state) -> None:
+        nonlocal checkpoints
+        checkpoints += 1
+
+    started = time.perf_counter()
+    async with ProviderClient(
+        provider.base_url, "benchmark", concurrency=concurrency
+    ) as client:
+        await export_playlist(provider, client, "Benchmark", tracks, state, checkpoint)
+        stats = client.stats()
+    elapsed = time.perf_counter() - started
+
+    if server.count(state.remote_id) != len(state.matched):
+        sys.exit(f"{provider.name}: remote playlist has the wrong number of items")
+    return {"seconds": elapsed, "checkpoints": checkpoints, **stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--providers", nargs="+", default=["spotify", "youtube"])
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.03)
+    args = parser.parse_args()
+
+    from app.export import PROVIDERS
+    from app.export.mock_server import MockProviderServer
+
+    server = MockProviderServer(
+        rate=args.rate, burst=args.burst, latency=args.latency
+    ).start()
+    roots = {"spotify": "/spotify/v1", "youtube": "/youtube/v3"}
+    tracks = [
+        {"title": f"Track {i}", "artist": f"Artist {i % 37}"}
+        for i in range(args.tracks)
+    ]
+
+    print(
+        f"{args.tracks} tracks, mock limit {args.rate:g} req/s "
+        f"(burst {args.burst}), {args.latency * 1000:g} ms latency"
+    )
+    print(
+        f"{'provider':<9} {'conc':>5} {'seconds':>8} {'tracks/s':>9} "
+        f"{'requests':>9} {'429s':>6}"
+    )
+    try:
+        for name in args.providers:
+            provider = PROVIDERS[name](server.url + roots[name])
+            for concurrency in args.concurrency:
+                result = asyncio.run(run_export(provider, server, tracks, concurrency))
+                print(
+                    f"{name:<9} {concurrency:>5} {result['seconds']:8.2f} "
+                    f"{args.tracks / result['seconds']:9.1f} "
+                    f"{result['requests']:>9} {result['throttled']:>6}"
+                )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Replay captured /generate traffic (see TRAFFIC_CAPTURE_RATE) against one or
+more model builds and compare them.
+
+Each --model is an artifact path or a version name, optionally suffixed with
+@precision (float64, float32, quantized); the default is the CURRENT model.
+The first variant is the baseline for result overlap, unless --baseline
+names a JSON file written by an earlier run's --output (e.g. from another
+checkout of the code).
+
+Every request reseeds the sampler with its position in the capture, so
+identical builds return identical playlists and overlap measures real
+differences. The result cache is off unless --cache is given.
+
+With --workers N the requests are split across N processes, each loading
+its own model; RSS is then the largest worker's. In process, variants load
+one after another and RSS includes whatever the allocator kept from the
+previous one, so compare memory with --workers.
+
+    python benchmarks/replay.py instance/traffic/ [--model SPEC ...]
+        [--workers 4] [--limit 1000] [--output run.json] [--baseline old.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+# The generator each pool worker loads once
+_worker_generator = None
+
+
+def rss_mb() -> float:
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def parse_variant(spec: str) -> tuple[str, str, str]:
+    """(label, artifact path, precision) for a --model spec"""
+    from app.ml.model_store import MODEL_ROOT, resolve_model_path, version_path
+
+    model, _, precision = spec.partition("@")
+    if not model or model == "CURRENT":
+        path = resolve_model_path()
+    elif os.path.isfile(model):
+        path = model
+    else:
+        path = version_path(MODEL_ROOT, model)
+    if not os.path.isfile(path):
+        sys.exit(f"No model artifact for {spec}")
+    return spec, path, precision or "float32"
+
+
+def load_generator(path: str, precision: str, cache: bool):
+    from app.ml.playlist_generator import PlaylistGenerator
+
+    generator = PlaylistGenerator(model_path=path)
+    generator.scoring_precision = precision
+    if not cache:
+        generator.result_cache = None
+    if not generator.load_model():
+        raise RuntimeError(f"Could not load {path}")
+    return generator
+
+
+def run_request(generator, index: int, request: dict, seed: int) -> tuple:
+    """Serve one captured request; returns (seconds, catalog IDs)"""
+    import numpy as np
+
+    preferences = {
+        "artists": request.get("artists") or [],
+        "genres": request.get("genres") or [],
+        "features": request.get("features") or {},
+    }
+    np.random.seed((seed + index) % 2**32)
+    started = time.perf_counter()
+    indices = generator.recommend(
+        preferences,
+        num_tracks=int(request.get("trackCount") or 20),
+        mmr_lambda=request.get("mmrLambda"),
+    )
+    tracks = generator.format_tracks(indices)
+    elapsed = time.perf_counter() - started
+    return elapsed, [track["id"] for track in tracks]
+
+
+def _init_worker(path: str, precision: str, cache: bool) -> None:
+    global _worker_generator
+    # One BLAS thread per worker, so the pool doesn't oversubscribe cores
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(1)
+    _worker_generator = load_generator(path, precision, cache)
+
+
+def _run_chunk(chunk: list[tuple[int, dict]], seed: int, warmup: int) -> tuple:
+    for index, request in chunk[:warmup]:
+        run_request(_worker_generator, index, request, seed)
+    results = [
+        (index, *run_request(_worker_generator, index, request, seed))
+        for index, request in chunk
+    ]
+    return results, rss_mb()
+
+
+def replay_variant(
+    spec: str, requests: list[dict], workers: int, cache: bool, seed: int, warmup: int
+) -> dict:
+    label, path, precision = parse_variant(spec)
+    indexed = list(enumerate(requests))
+
+    if workers <= 1:
+        before = rss_mb()
+        generator = load_generator(path, precision, cache)
+        load_rss = rss_mb() - before
+        for index, request in indexed[:warmup]:
+            run_request(generator, index, request, seed)
+        started = time.perf_counter()
+        results = [
+            (index, *run_request(generator, index, request, seed))
+            for index, request in indexed
+        ]
+        wall = time.perf_counter() - started
+        memory = {"rss_mb": rss_mb(), "load_rss_mb": load_rss}
+        del generator
+        gc.collect()
+    else:
+        # One contiguous slice per worker; each worker loads its own model
+        size = -(-len(indexed) // workers)
+        chunks = [indexed[i : i + size] for i in range(0, len(indexed), size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(path, precision, cache),
+        ) as pool:
+            # Let every worker finish loading before the clock starts
+            list(pool.map(_run_chunk, [[]] * workers, [seed] * workers, [0] * workers))
+            started = time.perf_counter()
+            outputs = list(
+                pool.map(
+                    _run_chunk,
+                    chunks,
+                    [seed] * len(chunks),
+                    [warmup] * len(chunks),
+                )
+            )
+            wall = time.perf_counter() - started
+        results = [result for chunk, _ in outputs for result in chunk]
+        worker_rss = [rss for _, rss in outputs]
+        memory = {"rss_mb": max(worker_rss), "total_rss_mb": sum(worker_rss)}
+
+    results.sort()
+    latencies = sorted(latency for _, latency, _ in results)
+    return {
+        "label": label,
+        "path": path,
+        "precision": precision,
+        "workers": workers,
+        "requests": len(results),
+        "seconds": wall,
+        "throughput": len(results) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        **memory,
+        "ids": [ids for _, _, ids in results],
+    }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+
+def overlap(ids: list[list[str]], baseline: list[list[str]]) -> tuple[float, float]:
+    """Mean and minimum share of the baseline's tracks each playlist kept"""
+    shares = [
+        len(set(a) & set(b)) / len(b) if b else float(not a)
+        for a, b in zip(ids, baseline)
+    ]
+    if not shares:
+        return 1.0, 1.0
+    return statistics.mean(shares), min(shares)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("capture", nargs="+", help="Capture files or directories")
+    parser.add_argument(
+        "--model",
+        action="append",
+        dest="models",
+        help="Artifact path or version, optionally @precision (repeatable)",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size")
+    parser.add_argument("--limit", type=int, help="Replay the first N requests")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache")
+    parser.add_argument("--output", help="Write metrics and playlists as JSON")
+    parser.add_argument("--baseline", help="Earlier --output to compare against")
+    args = parser.parse_args()
+
+    from app.traffic_capture import read_capture
+
+    requests = list(read_capture(args.capture))[: args.limit]
+    if not requests:
+        sys.exit("No captured requests found")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["variants"][0]
+        baseline["ids"] = baseline["ids"][: len(requests)]
+
+    print(f"Replaying {len(requests)} requests, {args.workers} worker(s)")
+    print(
+        f"{'variant':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+        f"{'req/s':>8} {'RSS MB':>8} {'overlap':>8} {'min':>6}"
+    )
+    variants = []
+    for spec in args.models or ["CURRENT"]:
+        result = replay_variant(
+            spec, requests, args.workers, args.cache, args.seed, args.warmup
+        )
+        reference = baseline or (variants[0] if variants else result)
+        mean_overlap, min_overlap = overlap(result["ids"], reference["ids"])
+        result["overlap"] = mean_overlap
+        result["min_overlap"] = min_overlap
+        variants.append(result)
+        print(
+            f"{result['label'][:28]:<28} {result['p50_ms']:8.2f} "
+            f"{result['p95_ms']:8.2f} {result['p99_ms']:8.2f} "
+            f"{result['max_ms']:8.1f} {result['throughput']:8.1f} "
+            f"{result['rss_mb']:8.0f} {mean_overlap:8.3f} {min_overlap:6.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"requests": len(requests), "variants": variants}, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Compare scoring precisions against float64 scoring: top-k overlap,
+single-query throughput and memory.
+
+Text queries (artist + genre, as /generate builds them) and seed queries
+(catalog rows, as /extend builds them) are scored with every precision.
+RSS is measured in a fresh interpreter per precision, so each figure is one
+loaded model plus its scoring matrix.
+
+    python benchmarks/scoring.py [--queries 200] [--k 60] [--model PATH]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+
+def rss_mb() -> float:
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_generator(model_path: str, precision: str):
+    from app.ml.playlist_generator import PlaylistGenerator
+
+    generator = PlaylistGenerator(model_path=model_path)
+    generator.scoring_precision = precision
+    # Each precision is built from the raw matrix below
+    generator.keep_feature_matrix = True
+    if not generator.load_model():
+        sys.exit(f"Could not load {model_path}")
+    return generator
+
+
+def measure_memory(model_path: str, precision: str) -> dict:
+    """Load the model with one precision in a fresh interpreter"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--model",
+            model_path,
+            "--memory-probe",
+            precision,
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def build_queries(generator, count: int, seed: int):
+    """Half text queries, half seed-row queries, in the full feature layout"""
+    import numpy as np
+    from scipy.sparse import csr_matrix, hstack, vstack
+    from sklearn.preprocessing import normalize
+
+    rng = np.random.default_rng(seed)
+    df = generator.tracks_df
+    width = generator.feature_matrix.shape[1]
+
+    queries = []
+    for row in rng.choice(len(df), count // 2, replace=False):
+        text = f"{df['artist'].iat[row]} {df['genre'].iat[row]}"
+        vector = generator.vectorizer.transform([text])
+        padding = csr_matrix((1, width - vector.shape[1]))
+        queries.append(hstack([padding, vector], format="csr"))
+
+    seeds = rng.choice(len(df), count - count // 2, replace=False)
+    queries.append(csr_matrix(generator.feature_matrix[seeds]))
+    return normalize(vstack(queries, format="csr"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=60, help="Candidate pool size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", help="Model artifact (default: CURRENT)")
+    parser.add_argument("--memory-probe", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from app.ml.model_store import resolve_model_path
+
+    model_path = args.model or resolve_model_path()
+
+    if args.memory_probe:
+        before = rss_mb()
+        generator = load_generator(model_path, args.memory_probe)
+        print(
+            json.dumps(
+                {
+                    "rss_mb": rss_mb(),
+                    "load_rss_mb": rss_mb() - before,
+                    "matrix_mb": generator.scoring_matrix.nbytes / 2**20,
+                }
+            )
+        )
+        return
+
+    import numpy as np
+
+    from app.ml.playlist_generator import PlaylistGenerator
+    from app.ml.scoring import PRECISIONS, ScoringMatrix
+
+    generator = load_generator(model_path, "float64")
+    queries = build_queries(generator, args.queries, args.seed)
+    audio_dims = generator.scoring_matrix.audio_dims
+
+    reference = None
+    print(
+        f"{args.queries} queries, top-{args.k}, {generator.feature_matrix.shape[0]} rows"
+    )
+    print(
+        f"{'precision':<10} {'overlap':>8} {'min':>6} {'q/s':>8} {'matrix MB':>10} {'RSS MB':>8}"
+    )
+    for precision in PRECISIONS:
+        matrix = ScoringMatrix(generator.feature_matrix, audio_dims, precision)
+
+        tops = []
+        started = time.perf_counter()
+        for i in range(queries.shape[0]):
+            scores = matrix.scores(queries[i]).ravel()
+            tops.append(PlaylistGenerator._top_k(scores, args.k))
+        elapsed = time.perf_counter() - started
+
+        if reference is None:
+            reference = tops
+        overlaps = [
+            len(np.intersect1d(top, ref)) / len(ref)
+            for top, ref in zip(tops, reference)
+        ]
+        memory = measure_memory(model_path, precision)
+        print(
+            f"{precision:<10} {statistics.mean(overlaps):8.4f} {min(overlaps):6.2f} "
+            f"{queries.shape[0] / elapsed:8.0f} {memory['matrix_mb']:10.1f} "
+            f"{memory['rss_mb']:8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
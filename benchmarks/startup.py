@@ -0,0 +1,67 @@
+"""
+Measure how long `import app` takes and which heavy modules it drags in.
+
+Each sample runs in a fresh interpreter so nothing is cached between runs.
+
+    python benchmarks/startup.py [--runs 10] [--preload]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "sklearn", "joblib"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def sample(env: dict[str, str]) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--preload", action="store_true", help="Set PRELOAD_MODEL=1 for the runs"
+    )
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env.setdefault("SECRET_KEY", "benchmark")
+    env["PRELOAD_MODEL"] = "1" if args.preload else ""
+
+    samples = [sample(env) for _ in range(args.runs)]
+    times = sorted(s["seconds"] * 1000 for s in samples)
+
+    print(f"import app x{args.runs} (PRELOAD_MODEL={env['PRELOAD_MODEL'] or '0'})")
+    print(f"  median {statistics.median(times):8.1f} ms")
+    print(f"  min    {times[0]:8.1f} ms")
+    print(f"  max    {times[-1]:8.1f} ms")
+    print(f"  heavy modules loaded: {', '.join(samples[-1]['heavy']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
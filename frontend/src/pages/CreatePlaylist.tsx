@@ -98,6 +98,11 @@ export default function CreatePlaylist() {
       return;
     }
 
+    await generatePlaylist();
+  };
+
+  // Tracks in `exclude` (catalog IDs) are left out of the new playlist
+  const generatePlaylist = async (exclude: string[] = []) => {
     try {
       setIsGenerating(true);
       setError('');
@@ -113,6 +118,7 @@ export default function CreatePlaylist() {
           artists: artists,
           features: featurePreferences,
           trackCount: 50,
+          exclude,
         }),
       });
 
@@ -288,6 +294,16 @@ export default function CreatePlaylist() {
               Create Another
             </button>
 
+            <button
+              className='neu-button'
+              disabled={isGenerating}
+              onClick={() =>
+                generatePlaylist(generatedPlaylist.tracks.map((track: any) => track.id))
+              }
+            >
+              {isGenerating ? 'Regenerating...' : 'Regenerate'}
+            </button>
+
             <button className='neu-button' onClick={savePlaylist}>
               Save Playlist
             </button>
@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app reads its configuration at import
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "test")
+
+GENRES = ["rock", "pop", "jazz", "classical"]
+
+
+def make_tracks(count: int = 300, seed: int = 0) -> list[dict]:
+    """Synthetic catalog rows with every audio feature filled in"""
+    from app.ml.playlist_generator import AUDIO_FEATURES
+
+    rng = random.Random(seed)
+    return [
+        {
+            "artist": f"Artist {i % 25}",
+            "title": f"Song {i}",
+            "genre": GENRES[i % len(GENRES)],
+            **{feature: rng.random() for feature in AUDIO_FEATURES},
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="session")
+def model_root(tmp_path_factory):
+    """A model root holding one trained version, v1, not yet published"""
+    from app.ml.model_store import version_path
+    from app.ml.playlist_generator import PlaylistGenerator
+
+    root = str(tmp_path_factory.mktemp("pretrained"))
+    generator = PlaylistGenerator(model_path=version_path(root, "v1"))
+    assert generator.train(make_tracks(), save_model=False)
+    generator.save_model(version="v1")
+    return root
+
+
+@pytest.fixture
+def generator(model_root):
+    from app.ml.model_store import version_path
+    from app.ml.playlist_generator import PlaylistGenerator
+
+    generator = PlaylistGenerator(model_path=version_path(model_root, "v1"))
+    assert generator.load_model()
+    return generator
+
+
+@pytest.fixture
+def app():
+    from app import app
+    from app.models import db
+
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
@@ -0,0 +1,114 @@
+import gzip
+import os
+
+import pytest
+from flask import Flask
+
+from app.assets import IMMUTABLE_CACHE_CONTROL, compress_directory, init_app
+
+SCRIPT = b"console.log('hello');\n" * 100
+
+
+@pytest.fixture
+def static(tmp_path):
+    """A build directory shaped like Vite's output"""
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-abc123.js").write_bytes(SCRIPT)
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><div id=root></div>")
+    return tmp_path
+
+
+@pytest.fixture
+def client(static):
+    app = Flask(__name__, static_folder=str(static))
+    index_page = init_app(app)
+    app.add_url_rule("/", "index", index_page.response)
+    return app.test_client()
+
+
+def test_assets_without_variants_are_sent_as_is(client):
+    response = client.get("/assets/index-abc123.js", headers={"Accept-Encoding": "br"})
+
+    assert response.data == SCRIPT
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+@pytest.mark.parametrize(
+    "accept, encoding, suffix",
+    [
+        ("gzip, br", "br", ".br"),
+        ("gzip", "gzip", ".gz"),
+        ("br;q=0, gzip", "gzip", ".gz"),
+        ("identity", None, ""),
+    ],
+)
+def test_precompressed_variant_is_negotiated(client, static, accept, encoding, suffix):
+    script = static / "assets" / "index-abc123.js"
+    (static / "assets" / "index-abc123.js.gz").write_bytes(b"gzip bytes")
+    (static / "assets" / "index-abc123.js.br").write_bytes(b"brotli bytes")
+
+    response = client.get(
+        "/assets/index-abc123.js", headers={"Accept-Encoding": accept}
+    )
+    expected = (static / "assets" / f"index-abc123.js{suffix}").read_bytes()
+
+    assert response.data == expected
+    assert response.headers.get("Content-Encoding") == encoding
+    # The variant keeps the original file's type
+    assert response.mimetype == "text/javascript"
+    assert response.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    assert script.read_bytes() == SCRIPT
+
+
+def test_missing_asset_is_not_found(client):
+    assert client.get("/assets/missing.js").status_code == 404
+
+
+def test_index_etag_revalidates(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).startswith(b"<!doctype html>")
+    assert response.headers["Cache-Control"] == "no-cache"
+    etag = response.headers["ETag"]
+
+    again = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+
+    # The plain body has its own tag, so a cached gzip body never matches it
+    plain = client.get(
+        "/", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert plain.status_code == 200
+    assert plain.headers["ETag"] != etag
+
+
+def test_index_is_reread_when_the_build_replaces_it(client, static):
+    etag = client.get("/").headers["ETag"]
+
+    index = static / "index.html"
+    index.write_bytes(b"<!doctype html><script src=/assets/new.js></script>")
+    stat = os.stat(index)
+    os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert b"new.js" in response.data
+
+
+def test_compress_skips_small_and_binary_files(static):
+    (static / "assets" / "logo.png").write_bytes(b"\x89PNG" * 1000)
+    (static / "assets" / "tiny.css").write_bytes(b"body{}")
+
+    written = compress_directory(str(static))
+
+    script = static / "assets" / "index-abc123.js"
+    assert gzip.decompress((static / "assets" / "index-abc123.js.gz").read_bytes()) == (
+        script.read_bytes()
+    )
+    assert written == len(list(static.rglob("*.gz"))) + len(list(static.rglob("*.br")))
+    assert not (static / "assets" / "logo.png.gz").exists()
+    assert not (static / "assets" / "tiny.css.gz").exists()
+    # index.html is below the size threshold
+    assert not (static / "index.html.gz").exists()
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from app.ml.catalog_index import CatalogIndex, TermIndex, normalize_name
+
+
+@pytest.fixture
+def catalog():
+    """Rows 0-5; row 4 has two artists and row 5 merged two genre labels"""
+    return CatalogIndex(
+        pd.DataFrame(
+            {
+                "artist": [
+                    "The Beatles",
+                    "the  beatles",
+                    "Beach House",
+                    "Bee Gees",
+                    "Bee Gees; The Beatles",
+                    "Miles Davis",
+                ],
+                "genre": ["rock", "rock", "dream pop", "disco", "pop", "jazz|bebop"],
+            }
+        )
+    )
+
+
+def test_postings_are_grouped_by_normalised_term(catalog):
+    artists = catalog.artists
+
+    assert artists.keys == sorted(artists.keys)
+    assert artists.exact("THE BEATLES").tolist() == [0, 1, 4]
+    assert artists.exact("bee gees").tolist() == [3, 4]
+    assert artists.exact("beatles").size == 0
+    # The most common spelling labels the term
+    assert artists.labels[artists.keys.index("the beatles")] == "The Beatles"
+    assert dict(zip(artists.keys, artists.counts()))["the beatles"] == 3
+
+
+def test_merged_genre_labels_are_indexed_separately(catalog):
+    assert catalog.genres.exact("bebop").tolist() == [5]
+    assert catalog.genres.exact("jazz").tolist() == [5]
+
+
+def test_prefix_range_covers_exactly_the_matching_terms(catalog):
+    artists = catalog.artists
+    low, high = artists.prefix_range("Be")
+
+    assert artists.keys[low:high] == ["beach house", "bee gees"]
+    assert artists.prefix_range("zz")[0] == artists.prefix_range("zz")[1]
+    low, high = artists.prefix_range("")
+    assert (low, high) == (0, len(artists))
+
+
+def test_substring_matches_use_the_trigram_map(catalog):
+    assert catalog.artists.containing("beat").tolist() == [0, 1, 4]
+    # Too short for trigrams; falls back to scanning the vocabulary
+    assert catalog.genres.containing("op").tolist() == [2, 4, 5]
+    # Shares trigrams with "the beatles" without being a substring of it
+    assert catalog.artists.containing("beatlest").size == 0
+
+
+def test_candidates_union_artists_and_genres(catalog):
+    assert catalog.candidates(["gees"], ["jazz"]).tolist() == [3, 4, 5]
+    assert catalog.candidates([], []).size == 0
+    assert catalog.candidates_up_to(["beatles"], [], max_rows=2) is None
+    assert catalog.candidates_up_to(["beatles"], [], max_rows=3).tolist() == [0, 1, 4]
+
+
+def test_blank_terms_are_not_indexed():
+    terms = pd.Series(["", "rock", ""]).map(normalize_name)
+    index = TermIndex(terms)
+
+    assert index.keys == ["rock"]
+    assert index.exact("rock").tolist() == [1]
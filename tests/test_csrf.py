@@ -0,0 +1,70 @@
+import time
+
+import app as app_module
+
+
+def issued_cookie(response) -> bool:
+    return any(
+        header.startswith("csrf_token=")
+        for header in response.headers.getlist("Set-Cookie")
+    )
+
+
+def test_cookie_is_issued_once(app):
+    client = app.test_client()
+
+    assert issued_cookie(client.get("/api/auth/"))
+    assert not issued_cookie(client.get("/api/auth/"))
+
+
+def test_cookie_is_reissued_near_expiry(app, monkeypatch):
+    client = app.test_client()
+    client.get("/api/auth/")
+
+    limit = app.config.get("WTF_CSRF_TIME_LIMIT") or 3600
+    monkeypatch.setitem(app.config, "WTF_CSRF_TIME_LIMIT", limit)
+    later = time.time() + limit - app.config["CSRF_REFRESH_MARGIN"] + 1
+    monkeypatch.setattr(app_module.time, "time", lambda: later)
+
+    assert issued_cookie(client.get("/api/auth/"))
+
+
+def test_malformed_cookie_is_replaced(app):
+    client = app.test_client()
+    client.get("/api/auth/")
+    client.set_cookie("csrf_token", "garbage")
+
+    assert issued_cookie(client.get("/api/auth/"))
+
+
+def test_cookie_without_session_token_is_replaced(app):
+    client = app.test_client()
+    client.get("/api/auth/")
+    token = client.get_cookie("csrf_token").value
+
+    fresh = app.test_client()
+    fresh.set_cookie("csrf_token", token)
+    assert issued_cookie(fresh.get("/api/auth/"))
+
+
+def test_static_assets_never_set_the_cookie(app):
+    client = app.test_client()
+    response = client.get("/assets/does-not-exist.js")
+
+    assert not issued_cookie(response)
+
+
+def test_stale_cookie_with_a_new_session_is_replaced(app):
+    old = app.test_client()
+    old.get("/api/auth/")
+    stale = old.get_cookie("csrf_token").value
+
+    # A new session gets its own raw token; the old cookie wasn't derived from it
+    client = app.test_client()
+    client.get("/api/auth/")
+    client.set_cookie("csrf_token", stale)
+    response = client.get("/api/auth/")
+
+    assert issued_cookie(response)
+    assert client.get_cookie("csrf_token").value != stale
+    assert not issued_cookie(client.get("/api/auth/"))
@@ -0,0 +1,102 @@
+import fcntl
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app import daily_mix
+from app.daily_mix import MixScheduler
+
+
+@pytest.fixture
+def scheduler(app, tmp_path, monkeypatch):
+    """A scheduler whose lock lives in tmp_path and whose job is recorded"""
+    calls = []
+
+    def refresh(**options):
+        calls.append(options)
+        return {"refreshed": len(calls)}
+
+    monkeypatch.setattr(daily_mix, "refresh_daily_mixes", refresh)
+    scheduler = MixScheduler(app, hour=4, num_tracks=5)
+    scheduler.lock_path = str(tmp_path / "locks" / daily_mix.LOCK_NAME)
+    scheduler.calls = calls
+    return scheduler
+
+
+def test_next_run_is_the_coming_hour(scheduler):
+    assert scheduler.seconds_until_next_run(datetime(2024, 1, 1, 3, 30)) == 1800
+    # On the hour counts as already run
+    assert scheduler.seconds_until_next_run(datetime(2024, 1, 1, 4)) == 86400
+    assert scheduler.seconds_until_next_run(datetime(2024, 1, 1, 23)) == 5 * 3600
+
+
+def test_run_once_passes_its_options(scheduler):
+    assert scheduler.run_once() == {"refreshed": 1}
+    assert scheduler.calls == [{"num_tracks": 5}]
+
+    stats = scheduler.stats()
+    assert stats["last_result"] == {"refreshed": 1}
+    assert stats["last_run"] is not None and stats["last_error"] is None
+
+
+def test_run_once_skips_while_another_process_holds_the_lock(scheduler):
+    scheduler.run_once()
+    # flock locks belong to the open file, so a second open stands in for
+    # another process
+    with open(scheduler.lock_path, "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        assert scheduler.run_once() is None
+    assert len(scheduler.calls) == 1
+
+    assert scheduler.run_once() == {"refreshed": 2}
+
+
+@pytest.fixture
+def jazz_fan(app, generator, monkeypatch):
+    """A user who saved a playlist of ten jazz tracks, and the model live"""
+    from app.models import Playlist, PlaylistTrack, Track, User, db
+    from app.routes import playlist as routes
+
+    monkeypatch.setattr(routes.registry, "_active", generator)
+    jazz = generator.tracks_df[generator.tracks_df["genre"] == "jazz"].head(10)
+    with app.app_context():
+        user = User(username="mix", email="mix@example.com", password="pw")
+        playlist = Playlist(name="Jazz", user=user)
+        for position, track in enumerate(jazz.itertuples()):
+            row = Track(catalog_id=int(track.catalog_id), title=track.title, artist="A")
+            playlist.tracks.append(PlaylistTrack(track=row, position=position))
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    return user_id, set(jazz["catalog_id"].tolist())
+
+
+def test_refresh_stores_a_mix_without_saved_tracks(app, generator, jazz_fan):
+    from app.models import DailyMix, db
+
+    user_id, saved = jazz_fan
+    with app.app_context():
+        result = daily_mix.refresh_daily_mixes(num_tracks=8)
+        assert (result["users"], result["refreshed"]) == (1, 1)
+
+        mix = db.session.get(DailyMix, user_id)
+        catalog_ids = np.frombuffer(mix.catalog_ids, dtype="<i8").tolist()
+        assert len(catalog_ids) == 8
+        assert not saved & set(catalog_ids)
+        assert mix.model_version == generator.model_version
+
+        # Fresh mixes are left alone unless forced
+        assert daily_mix.refresh_daily_mixes(num_tracks=8)["users"] == 0
+        assert daily_mix.refresh_daily_mixes(num_tracks=8, force=True)["users"] == 1
+        db.session.refresh(mix)
+        catalog_ids = np.frombuffer(mix.catalog_ids, dtype="<i8").tolist()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+    response = client.get("/api/playlists/daily-mix")
+    assert response.status_code == 200
+    assert [t["id"] for t in response.get_json()["tracks"]] == [
+        str(catalog_id) for catalog_id in catalog_ids
+    ]
@@ -0,0 +1,82 @@
+import logging
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from app.config import database_uri, engine_options
+from app.models import db, init_engine
+
+
+@pytest.mark.parametrize(
+    "uri, expected",
+    [
+        ("postgres://u:p@host/db", "postgresql://u:p@host/db"),
+        ("postgresql://u:p@host/postgres://", "postgresql://u:p@host/postgres://"),
+        ("postgresql+psycopg://host/db", "postgresql+psycopg://host/db"),
+        ("sqlite:///app.db", "sqlite:///app.db"),
+        (None, None),
+    ],
+)
+def test_heroku_scheme_is_rewritten(uri, expected):
+    assert database_uri(uri) == expected
+
+
+def test_sqlite_only_sizes_the_statement_cache(monkeypatch):
+    monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "64")
+
+    assert engine_options("sqlite:///app.db") == {"query_cache_size": 64}
+    assert engine_options(None) == {"query_cache_size": 64}
+
+
+def test_server_databases_get_a_tuned_pool(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "off")
+
+    options = engine_options("postgresql+psycopg2://host/db")
+    assert options["pool_size"] == 12
+    assert options["pool_pre_ping"] is False
+    assert (options["max_overflow"], options["pool_recycle"]) == (10, 1800)
+    # Only psycopg 3 takes a prepare threshold
+    assert "connect_args" not in options
+    psycopg = engine_options("postgresql+psycopg://host/db")
+    assert psycopg["connect_args"] == {"prepare_threshold": 5}
+
+
+def make_app(tmp_path, **config) -> Flask:
+    app = Flask(__name__)
+    app.config.update(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'engine.db'}",
+            "SQLALCHEMY_ENGINE_OPTIONS": engine_options("sqlite://"),
+            "SQLITE_WAL": True,
+            "SQLITE_MMAP_SIZE": 1024 * 1024,
+            **config,
+        }
+    )
+    db.init_app(app)
+    init_engine(app)
+    return app
+
+
+def pragma(app: Flask, name: str):
+    with app.app_context():
+        return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_sqlite_connections_get_the_pragmas(tmp_path, caplog):
+    with caplog.at_level(logging.INFO):
+        app = make_app(tmp_path)
+
+    assert pragma(app, "journal_mode") == "wal"
+    # NORMAL
+    assert pragma(app, "synchronous") == 1
+    assert pragma(app, "mmap_size") == 1024 * 1024
+    assert "statement_cache=500 wal=True" in caplog.text
+
+
+def test_wal_can_be_turned_off(tmp_path):
+    app = make_app(tmp_path, SQLITE_WAL=False, SQLITE_MMAP_SIZE=0)
+
+    assert pragma(app, "journal_mode") == "delete"
+    assert pragma(app, "mmap_size") == 0
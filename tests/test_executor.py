@@ -0,0 +1,127 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from app.ml.executor import DeadlineExceeded, ExecutorSaturated, GenerationExecutor
+
+
+def test_jobs_beyond_workers_and_queue_are_refused():
+    executor = GenerationExecutor(workers=1, queue_depth=0, timeout=5)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    results = []
+    caller = threading.Thread(target=lambda: results.append(executor.run(block)))
+    caller.start()
+    assert started.wait(5)
+
+    with pytest.raises(ExecutorSaturated):
+        executor.run(lambda: None)
+
+    release.set()
+    caller.join(5)
+    assert results == ["done"]
+    # Slots are released by a done callback, just after the result is set
+    deadline = time.monotonic() + 5
+    while executor.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = executor.stats()
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (1, 1, 0)
+    # The slot is free again
+    assert executor._slots.acquire(timeout=5)
+    executor._slots.release()
+    assert executor.run(lambda: 42) == 42
+
+
+def test_slow_jobs_miss_their_deadline():
+    executor = GenerationExecutor(workers=1, queue_depth=0)
+
+    with pytest.raises(DeadlineExceeded):
+        executor.run(time.sleep, 0.5, timeout=0.05)
+    assert executor.stats()["timed_out"] == 1
+
+
+MODEL = "old"
+
+
+def forked_model() -> str:
+    return MODEL
+
+
+def test_reset_reforks_process_workers(monkeypatch):
+    executor = GenerationExecutor(workers=1, queue_depth=0, processes=True)
+    assert executor.run(forked_model) == "old"
+
+    monkeypatch.setattr(sys.modules[__name__], "MODEL", "new")
+    # Workers keep the state they were forked with until the pool is reset
+    assert executor.run(forked_model) == "old"
+    executor.reset()
+    assert executor.run(forked_model) == "new"
+    executor.reset()
+
+
+def test_swapping_the_model_resets_process_pools(generator, monkeypatch):
+    from app.routes import playlist as routes
+
+    resets = []
+    monkeypatch.setattr(routes.executor, "processes", True)
+    monkeypatch.setattr(routes.executor, "reset", lambda: resets.append(True))
+    routes.registry.on_swap(generator)
+
+    assert resets == [True]
+
+
+def test_jobs_run_against_the_requests_generator(generator, monkeypatch):
+    from app.routes import playlist as routes
+
+    # A hot swap lands between the request's checks and the job running
+    monkeypatch.setattr(routes.registry, "_active", object())
+    used = routes.run_job(lambda job: routes.job_generator(job), generator)
+
+    assert used is generator
+
+
+@pytest.fixture
+def client(app, generator, monkeypatch):
+    from app.routes import playlist as routes
+
+    monkeypatch.setattr(routes.registry, "_active", generator)
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    return app.test_client()
+
+
+def test_saturated_pool_answers_503(app, client, monkeypatch):
+    from app.routes import playlist as routes
+
+    def refuse(*args, **kwargs):
+        raise ExecutorSaturated("Playlist generation queue is full")
+
+    monkeypatch.setattr(routes.executor, "run", refuse)
+    response = client.post("/api/playlists/generate", json={"genres": ["rock"]})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(app.config["GENERATE_RETRY_AFTER"])
+
+
+def test_generate_runs_on_the_pool(client):
+    response = client.post(
+        "/api/playlists/generate", json={"genres": ["rock"], "trackCount": 5}
+    )
+
+    assert response.status_code == 200
+    assert len(response.get_json()["tracks"]) == 5
+
+
+def test_metrics_require_the_admin_token(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/playlists/metrics").status_code == 403
+
+    response = client.get("/api/playlists/metrics", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.get_json()["executor"]["in_flight"] == 0
@@ -0,0 +1,105 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from app.export import (
+    ExportState,
+    ProviderClient,
+    YouTubeMusicProvider,
+    export_playlist,
+)
+from app.export.mock_server import MockProviderServer
+
+TOKEN = "good-token"
+
+
+def make_tracks(count: int) -> list[dict]:
+    return [{"title": f"Song {i}", "artist": f"Artist {i % 7}"} for i in range(count)]
+
+
+@pytest.fixture
+def server():
+    server = MockProviderServer(rate=0, tokens={TOKEN}).start()
+    yield server
+    server.stop()
+
+
+def test_failed_calls_are_retried(server, monkeypatch):
+    monkeypatch.setattr(random, "random", random.Random(0).random)
+    server.error_rate = 0.3
+    provider = YouTubeMusicProvider(server.url + "/youtube/v3")
+    tracks = make_tracks(20)
+    state = ExportState()
+
+    async def export() -> dict:
+        async with ProviderClient(provider.base_url, TOKEN, backoff=0.001) as client:
+            await export_playlist(
+                provider, client, "Mix", tracks, state, lambda s: None
+            )
+            return client.stats()
+
+    stats = asyncio.run(export())
+    assert stats["retries"] > 0
+    assert state.status == "done"
+    assert server.count(state.remote_id) == len(tracks)
+
+
+@pytest.fixture
+def export_client(app, server, monkeypatch):
+    """A logged-in client owning one saved playlist, exporting to the mock"""
+    from app.models import Playlist, PlaylistTrack, Track, User, db
+    from app.routes import export as routes
+
+    monkeypatch.setitem(routes.provider_urls, "spotify", server.url + "/spotify/v1")
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    with app.app_context():
+        user = User(username="export", email="export@example.com", password="pw")
+        playlist = Playlist(name="Road trip", user=user)
+        for position, track in enumerate(make_tracks(12)):
+            playlist.tracks.append(
+                PlaylistTrack(track=Track(**track), position=position)
+            )
+        db.session.add(user)
+        db.session.commit()
+        user_id, playlist_id = user.id, playlist.id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+    client.url = f"/api/playlists/{playlist_id}/export/spotify"
+    return client
+
+
+def wait_for_export(client, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        export = client.get(client.url).get_json()
+        if export["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return export
+        time.sleep(0.02)
+
+
+def test_export_runs_to_completion(export_client, server):
+    response = export_client.post(export_client.url, json={"access_token": TOKEN})
+    assert response.status_code == 202
+
+    export = wait_for_export(export_client)
+    assert export["status"] == "done"
+    assert (export["matched"], export["added"]) == (12, 12)
+    assert server.count(export["remote_id"]) == 12
+
+
+def test_rejected_token_fails_the_export(export_client, server):
+    response = export_client.post(export_client.url, json={"access_token": "expired"})
+    assert response.status_code == 202
+
+    export = wait_for_export(export_client)
+    assert export["status"] == "failed"
+    assert "401" in export["error"]
+    assert export["remote_id"] is None
+
+    # Re-posting with a working token picks the export back up
+    export_client.post(export_client.url, json={"access_token": TOKEN})
+    assert wait_for_export(export_client)["status"] == "done"
@@ -0,0 +1,132 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.ml.model_store import (
+    MODEL_FILENAME,
+    ModelRegistry,
+    current_version,
+    list_versions,
+    publish,
+    resolve_model_path,
+    version_path,
+)
+
+
+@pytest.fixture
+def root(model_root, tmp_path):
+    """A writable copy of the trained model root, with v1 and v2"""
+    root = str(tmp_path / "pretrained")
+    shutil.copytree(model_root, root)
+    shutil.copytree(os.path.join(root, "v1"), os.path.join(root, "v2"))
+    return root
+
+
+def test_versions_and_pointer(root):
+    assert list_versions(root) == ["v1", "v2"]
+    assert current_version(root) is None
+    # Without a pointer the legacy unversioned artifact is used
+    assert resolve_model_path(root) == os.path.join(root, MODEL_FILENAME)
+
+    publish("v2", root)
+    assert current_version(root) == "v2"
+    assert resolve_model_path(root) == version_path(root, "v2")
+    assert not [name for name in os.listdir(root) if name.endswith(".tmp")]
+
+
+def test_publish_refuses_missing_versions(root):
+    publish("v1", root)
+    with pytest.raises(FileNotFoundError):
+        publish("v3", root)
+    assert current_version(root) == "v1"
+
+
+def test_reload_swaps_in_the_published_model(root):
+    publish("v1", root)
+    registry = ModelRegistry(root)
+    old = registry.get()
+    assert old.model_path == version_path(root, "v1")
+
+    publish("v2", root)
+    assert registry.reload(wait=True)
+
+    new = registry.active
+    assert new is not old
+    assert new.model_path == version_path(root, "v2")
+    # Requests still holding the old generator can keep using it
+    assert old.tracks_df is not None
+    assert registry.status()["last_error"] is None
+
+
+def test_failed_reload_keeps_the_active_model(root):
+    publish("v1", root)
+    registry = ModelRegistry(root)
+    active = registry.get()
+
+    with open(os.path.join(root, "CURRENT"), "w") as f:
+        f.write("missing\n")
+    assert registry.reload(wait=True)
+
+    assert registry.active is active
+    assert registry.status()["last_error"]
+
+
+def test_configure_runs_before_the_model_goes_live(root):
+    publish("v1", root)
+    seen = []
+    registry = ModelRegistry(
+        root, configure=lambda generator: seen.append(generator.tracks_df)
+    )
+    registry.get()
+    # Called before load_model, so settings like the scoring precision apply
+    assert seen == [None]
+
+
+def test_training_script_imports_from_any_directory(tmp_path):
+    script = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "app", "ml", "train_model.py"
+    )
+    result = subprocess.run(
+        [sys.executable, script], cwd=tmp_path, capture_output=True, text=True
+    )
+    # Training itself needs the CSV datasets; the imports must not fail first
+    assert "ModuleNotFoundError" not in result.stderr
+    assert "Loading data..." in result.stdout
+
+
+def wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_each_process_starts_its_own_watcher(root, monkeypatch):
+    publish("v1", root)
+    swapped = []
+    registry = ModelRegistry(root, on_swap=swapped.append)
+    registry.watch(0.02)
+    assert registry._watcher is None
+
+    registry.get()
+    first = registry._watcher
+    assert first is not None and first.is_alive()
+    registry.get()
+    assert registry._watcher is first
+
+    # A forked worker inherits the registry but not the master's thread
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    registry.get()
+    assert registry._watcher is not first
+
+    publish("v2", root)
+    assert wait_for(lambda: registry.status()["current_version"] == "v2" and swapped)
+    assert registry.active.model_path == version_path(root, "v2")
+    assert swapped == [registry.active]
+    registry.watch(0)
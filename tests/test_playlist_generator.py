@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+
+FEATURES = {"energy": 0.8, "danceability": 0.3, "valence": 0.6}
+
+
+def brute_force(generator, preferences: dict, k: int, rows=None):
+    """Nearest rows to the targets over the scaled audio block"""
+    dims = [i for i, f in enumerate(generator._audio_features) if f in preferences]
+    targets = np.zeros((1, len(generator._audio_features)))
+    for i in dims:
+        targets[0, i] = preferences[generator._audio_features[i]]
+    query = generator.scaler.transform(targets)[0, dims]
+
+    candidates = np.arange(len(generator._audio_block)) if rows is None else rows
+    distances = np.linalg.norm(
+        generator._audio_block[candidates][:, dims] - query, axis=1
+    )
+    order = np.argsort(distances, kind="stable")[:k]
+    return candidates[order], distances[order]
+
+
+@pytest.mark.parametrize(
+    "preferences",
+    [FEATURES, {"tempo": 120.0}, dict.fromkeys(["energy", "loudness", "tempo"], 0.5)],
+)
+def test_tree_matches_brute_force_neighbours(generator, preferences):
+    rows, scores = generator._nearest_by_features(preferences, 25)
+    expected_rows, distances = brute_force(generator, preferences, 25)
+
+    np.testing.assert_allclose(scores, 1.0 / (1.0 + distances), rtol=1e-5)
+    assert set(rows.tolist()) == set(expected_rows.tolist())
+
+
+def test_tree_search_within_a_subset_matches_brute_force(generator):
+    subset = np.arange(0, len(generator._audio_block), 3)
+    rows, scores = generator._nearest_by_features(FEATURES, 25, subset)
+    expected_rows, distances = brute_force(generator, FEATURES, 25, subset)
+
+    assert set(rows.tolist()) <= set(subset.tolist())
+    np.testing.assert_allclose(scores, 1.0 / (1.0 + distances), rtol=1e-5)
+    assert set(rows.tolist()) == set(expected_rows.tolist())
+
+
+def test_feature_closeness_is_measured_in_scaled_space(generator):
+    closeness = generator._feature_closeness(FEATURES)
+    _, distances = brute_force(generator, FEATURES, len(closeness))
+
+    np.testing.assert_allclose(np.sort(closeness)[::-1], 1.0 / (1.0 + distances))
+    # The same ranking the KD-tree serves when features are the only input
+    rows, _ = generator._nearest_by_features(FEATURES, 10)
+    assert set(np.argsort(-closeness)[:10].tolist()) == set(rows.tolist())
+
+
+def test_unknown_features_score_nothing(generator):
+    assert generator._feature_closeness({"not_a_feature": 1.0}) is None
+    assert generator._nearest_by_features({"not_a_feature": 1.0}, 10) is None
+
+
+@pytest.mark.parametrize(
+    "phrases",
+    [
+        ["Artist 12", "jazz"],
+        ["Straße", "STRASSE Rock", "  rock  "],
+        ["Café Tacvba", "cafe"],
+    ],
+)
+def test_memoised_phrase_vectors_sum_to_the_direct_transform(generator, phrases):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+
+    texts = generator.tracks_df["features_text"].tolist()
+    generator.vectorizer = TfidfVectorizer(stop_words="english").fit(
+        texts + ["Straße strasse café cafe tacvba"]
+    )
+    # Warm the cache, then answer from it
+    generator._query_vector(phrases)
+    summed = generator._query_vector(phrases)
+    direct = generator.vectorizer.transform([" ".join(phrases)])
+
+    np.testing.assert_allclose(normalize(summed).toarray(), direct.toarray())
+    assert summed.nnz > 0
+
+
+def test_rows_for_catalog_ids(generator):
+    catalog_ids = generator.tracks_df["catalog_id"].to_numpy()
+    wanted = [catalog_ids[7], catalog_ids[2], -1, catalog_ids[7], str(catalog_ids[40])]
+
+    assert generator.rows_for_catalog_ids(wanted).tolist() == [2, 7, 40]
+    in_order = generator.rows_for_catalog_ids(wanted, keep_order=True)
+    assert in_order.tolist() == [7, 2, 7, 40]
+    assert generator.rows_for_catalog_ids(np.array([catalog_ids.max() + 1])).size == 0
+    assert generator.rows_for_catalog_ids([]).size == 0
+
+
+def test_duplicates_keep_their_first_row_whole():
+    import pandas as pd
+
+    from app.ml.playlist_generator import PlaylistGenerator
+
+    generator = PlaylistGenerator()
+    generator.tracks_df = pd.DataFrame(
+        {
+            "artist": ["Band", "band ", "Other"],
+            "title": ["Song", "song", "Song"],
+            "album": [None, "Second Album", "Third Album"],
+            "genre": ["rock", "rock", "jazz"],
+            "energy": [0.2, 0.4, 0.9],
+        }
+    )
+
+    assert generator.deduplicate_tracks() == 1
+    df = generator.tracks_df.set_index("artist")
+    assert df.index.tolist() == ["Band", "Other"]
+    # The first row had no album; the duplicate's album isn't borrowed
+    assert pd.isna(df.loc["Band", "album"])
+    assert df.loc["Band", "energy"] == pytest.approx(0.3)
+
+
+def mmr_gains(vectors: np.ndarray, scores: np.ndarray, taken: list, mmr_lambda):
+    """Each candidate's MMR gain given the rows already taken, by definition"""
+    relevance = (scores - scores.min()) / ((scores.max() - scores.min()) or 1.0)
+    redundancy = (vectors @ vectors[taken].T).max(axis=1) if taken else 0.0
+    gains = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+    gains[taken] = -np.inf
+    return gains
+
+
+@pytest.fixture
+def pool(generator):
+    indices, scores = generator._score_candidates([], ["rock", "jazz"], {}, 40)
+    return indices, scores
+
+
+@pytest.mark.parametrize("mmr_lambda", [0.0, 0.3, 0.7])
+def test_each_mmr_pick_has_the_highest_gain(generator, pool, mmr_lambda):
+    indices, scores = pool
+    vectors = generator.scoring_matrix.rows(indices).toarray().astype(np.float64)
+    position = {row: i for i, row in enumerate(indices.tolist())}
+
+    order = generator._mmr_order(indices, scores, 10, mmr_lambda)
+    taken: list[int] = []
+    for row in order[:10].tolist():
+        gains = mmr_gains(vectors, scores.astype(np.float64), taken, mmr_lambda)
+        # Ties may break either way at float32 precision
+        assert gains[position[row]] == pytest.approx(gains.max(), abs=1e-5)
+        taken.append(position[row])
+
+
+def test_mmr_with_lambda_one_keeps_relevance_order(generator, pool):
+    indices, scores = pool
+    order = generator._mmr_order(indices, scores, 10, 1.0)
+
+    assert order.tolist() == indices.tolist()
+
+
+def test_mmr_reorders_only_the_first_k(generator, pool):
+    indices, scores = pool
+    order = generator._mmr_order(indices, scores, 5, 0.0)
+
+    assert sorted(order.tolist()) == sorted(indices.tolist())
+    rest = [i for i in indices.tolist() if i not in order[:5].tolist()]
+    assert order[5:].tolist() == rest
+
+
+def test_mmr_spreads_the_playlist_across_genres(generator, pool):
+    indices, scores = pool
+    genres = generator.tracks_df["genre"].to_numpy()
+
+    diverse = generator._mmr_order(indices, scores, 10, 0.0)[:10]
+    assert set(genres[diverse]) == {"rock", "jazz"}
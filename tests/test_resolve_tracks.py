@@ -0,0 +1,111 @@
+import uuid
+
+import pytest
+
+from app.ml.result_cache import MemoryCache
+
+
+def payload(catalog_id, title: str, artist: str = "Artist") -> dict:
+    return {"id": str(catalog_id), "title": title, "artist": artist, "genre": "rock"}
+
+
+@pytest.fixture
+def session(app, monkeypatch):
+    from app.models import db
+    from app.routes import playlist as routes
+
+    # Cached IDs would outlive the tables dropped after each test
+    monkeypatch.setattr(routes, "track_id_cache", MemoryCache(ttl=0))
+    with app.app_context():
+        yield db.session
+
+
+def tracks_named(session, title: str) -> list:
+    from app.models import Track
+
+    return session.query(Track).filter_by(title=title).all()
+
+
+def test_new_catalog_track_is_inserted(session):
+    from app.routes.playlist import resolve_track_ids
+
+    [track_id] = resolve_track_ids([payload(101, "New")])
+    session.commit()
+
+    [track] = tracks_named(session, "New")
+    assert (track.id, track.catalog_id, track.genre) == (track_id, 101, "rock")
+
+
+def test_existing_catalog_id_is_reused(session):
+    from app.models import Track
+    from app.routes.playlist import resolve_track_ids
+
+    existing = Track(catalog_id=102, title="Known", artist="Artist")
+    session.add(existing)
+    session.commit()
+
+    assert resolve_track_ids([payload(102, "Known")]) == [existing.id]
+    session.commit()
+    assert len(tracks_named(session, "Known")) == 1
+
+
+def test_legacy_name_only_row_is_matched_and_backfilled(session):
+    from app.models import Track
+    from app.routes.playlist import resolve_track_ids
+
+    legacy = Track(title="Legacy", artist="Artist")
+    session.add(legacy)
+    session.commit()
+
+    assert resolve_track_ids([payload(103, "Legacy")]) == [legacy.id]
+    session.commit()
+    [track] = tracks_named(session, "Legacy")
+    assert track.catalog_id == 103
+
+
+def test_legacy_payloads_without_catalog_ids_share_one_row(session):
+    from app.routes.playlist import resolve_track_ids
+
+    legacy_id = str(uuid.uuid4())
+    track_ids = resolve_track_ids(
+        [payload(legacy_id, "Old"), payload(legacy_id, "Old")]
+    )
+    session.commit()
+
+    [track] = tracks_named(session, "Old")
+    assert track_ids == [track.id, track.id]
+    assert track.catalog_id is None
+
+
+def test_duplicate_ids_in_one_request_insert_one_row(session):
+    from app.routes.playlist import resolve_track_ids
+
+    track_ids = resolve_track_ids(
+        [payload(104, "Twice"), payload(105, "Once"), payload(104, "Twice")]
+    )
+    session.commit()
+
+    [twice] = tracks_named(session, "Twice")
+    assert track_ids[0] == track_ids[2] == twice.id
+    assert track_ids[1] == tracks_named(session, "Once")[0].id
+
+
+def test_insert_skips_catalog_ids_that_already_exist(session):
+    from app.models import Track
+    from app.routes.playlist import insert_catalog_tracks, select_track_ids
+
+    first = Track(catalog_id=106, title="First", artist="Artist")
+    session.add(first)
+    session.commit()
+
+    insert_catalog_tracks(
+        [
+            {"id": uuid.uuid4(), "catalog_id": 106, "title": "Second", "artist": "A"},
+            {"id": uuid.uuid4(), "catalog_id": 107, "title": "Third", "artist": "A"},
+        ]
+    )
+    session.commit()
+
+    assert select_track_ids([106])[106] == first.id
+    assert not tracks_named(session, "Second")
+    assert len(tracks_named(session, "Third")) == 1
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.ml import result_cache
+from app.ml.result_cache import CacheBackend, MemoryCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = MemoryCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = MemoryCache(ttl=10)
+    cache.set("a", 1)
+
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_ttl_never_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = MemoryCache(ttl=0)
+    cache.set("a", 1)
+
+    now[0] += 10**9
+    assert cache.get("a") == 1
+
+
+def test_stats_count_hits_and_misses():
+    cache = MemoryCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == 2 / 3
+
+
+def test_repeated_preferences_reuse_the_scored_pool(generator):
+    preferences = {"genres": ["rock"], "artists": [], "features": {}}
+    generator.recommend(preferences, 10)
+    generator.recommend(preferences, 10)
+
+    stats = generator.result_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_cached_pool_still_honours_exclusions(generator):
+    preferences = {"genres": ["jazz"], "artists": [], "features": {}}
+    first = generator.recommend(preferences, 10)
+    second = generator.recommend(preferences, 10, exclude=np.sort(first))
+
+    assert not set(first) & set(second)
+
+
+def test_backends_must_implement_the_interface():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,125 @@
+import os
+import time
+
+import pytest
+
+from app.save_journal import SaveJournal, SaveWorker
+
+
+def record(playlist_id: str) -> dict:
+    return {"playlist_id": playlist_id, "tracks": [{"id": "1"}]}
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_read_returns_unpersisted_records_in_order(tmp_path):
+    journal = SaveJournal(str(tmp_path / "saves-a.jsonl"))
+    for playlist_id in "abc":
+        journal.append(record(playlist_id))
+
+    records, end = journal.read(limit=2)
+    assert [r["playlist_id"] for r in records] == ["a", "b"]
+
+    journal.advance(end)
+    records, _ = journal.read(limit=10)
+    assert [r["playlist_id"] for r in records] == ["c"]
+    journal.close()
+
+
+def test_offset_survives_reopen(tmp_path):
+    path = str(tmp_path / "saves-a.jsonl")
+    journal = SaveJournal(path)
+    journal.append(record("a"))
+    journal.append(record("b"))
+    _, end = journal.read(limit=1)
+    journal.advance(end)
+    journal.close()
+
+    reopened = SaveJournal(path)
+    records, _ = reopened.read(limit=10)
+    assert [r["playlist_id"] for r in records] == ["b"]
+    reopened.close()
+
+
+def test_fully_drained_journal_is_truncated(tmp_path):
+    journal = SaveJournal(str(tmp_path / "saves-a.jsonl"))
+    journal.append(record("a"))
+    _, end = journal.read(limit=10)
+    journal.advance(end)
+
+    assert journal.size() == 0
+    assert journal.pending_bytes() == 0
+    journal.close()
+
+
+def test_torn_tail_is_dropped_on_open(tmp_path):
+    path = str(tmp_path / "saves-a.jsonl")
+    journal = SaveJournal(path)
+    journal.append(record("a"))
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b'{"playlist_id": "b", "tra')
+
+    reopened = SaveJournal(path)
+    records, _ = reopened.read(limit=10)
+    assert [r["playlist_id"] for r in records] == ["a"]
+    assert reopened.size() == os.path.getsize(path)
+    reopened.close()
+
+
+def test_open_journal_is_locked(tmp_path):
+    path = str(tmp_path / "saves-a.jsonl")
+    journal = SaveJournal(path)
+    with pytest.raises(BlockingIOError):
+        SaveJournal(path)
+    journal.close()
+
+
+def test_worker_replays_orphaned_journals(app, tmp_path):
+    orphan = SaveJournal(str(tmp_path / "saves-dead-1.jsonl"))
+    orphan.append(record("left-behind"))
+    orphan.close()
+
+    persisted = []
+    worker = SaveWorker(app, str(tmp_path), persisted.extend, interval=0.02)
+    worker.start()
+    worker.submit(record("new"))
+
+    assert wait_for(lambda: len(persisted) == 2)
+    assert {r["playlist_id"] for r in persisted} == {"left-behind", "new"}
+    assert wait_for(lambda: worker.stats()["orphaned_journals"] == 0)
+    assert worker.replayed == 1
+    assert not os.path.exists(tmp_path / "saves-dead-1.jsonl")
+
+
+def test_worker_rejects_bad_records_without_losing_the_batch(app, tmp_path):
+    persisted = []
+
+    def persist(records):
+        if any(r["playlist_id"] == "bad" for r in records):
+            raise ValueError("unknown user")
+        persisted.extend(records)
+
+    worker = SaveWorker(app, str(tmp_path), persist, interval=0.02)
+    for playlist_id in ("good", "bad", "also-good"):
+        worker.submit(record(playlist_id))
+
+    assert wait_for(lambda: worker.state("bad") == "rejected")
+    assert [r["playlist_id"] for r in persisted] == ["good", "also-good"]
+    assert worker.state("good") is None
+
+
+def test_save_state_is_only_reported_to_its_owner(app, tmp_path):
+    worker = SaveWorker(app, str(tmp_path), lambda records: None, interval=60)
+    worker.submit({**record("mine"), "user_id": "owner"})
+
+    assert worker.state("mine", "owner") == "pending"
+    assert worker.state("mine", "someone-else") is None
+    assert worker.state("mine") == "pending"
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, hstack
+from scipy.sparse import random as sparse_random
+from sklearn.preprocessing import normalize
+
+from app.ml.scoring import ScoringMatrix
+
+AUDIO_DIMS = 9
+
+
+@pytest.fixture(scope="module")
+def features():
+    """Dense audio columns beside sparse genre/text columns"""
+    rng = np.random.default_rng(0)
+    audio = csr_matrix(rng.random((2000, AUDIO_DIMS)))
+    text = sparse_random(2000, 500, density=0.01, random_state=1, format="csr")
+    return hstack([audio, text], format="csr")
+
+
+def queries(features, count: int = 20) -> csr_matrix:
+    return normalize(features[np.arange(count) * 37])
+
+
+@pytest.mark.parametrize("precision", ["float32", "quantized"])
+def test_top_k_matches_float64(features, precision):
+    exact = ScoringMatrix(features, AUDIO_DIMS, "float64").scores(queries(features))
+    approx = ScoringMatrix(features, AUDIO_DIMS, precision).scores(queries(features))
+
+    k = 50
+    overlaps = [
+        len(set(np.argsort(-exact[:, i])[:k]) & set(np.argsort(-approx[:, i])[:k])) / k
+        for i in range(exact.shape[1])
+    ]
+    assert np.mean(overlaps) >= 0.97
+    assert np.abs(exact - approx).max() < 1e-2
+
+
+@pytest.mark.parametrize("precision", ["float64", "float32", "quantized"])
+def test_scoring_a_subset_of_rows(features, precision):
+    matrix = ScoringMatrix(features, AUDIO_DIMS, precision)
+    rows = np.array([3, 10, 11, 500, 1999])
+
+    subset = matrix.scores(queries(features, 3), rows)
+    np.testing.assert_allclose(subset, matrix.scores(queries(features, 3))[rows])
+
+
+@pytest.mark.parametrize("precision", ["float64", "float32", "quantized"])
+def test_rows_are_unit_vectors_in_the_full_layout(features, precision):
+    matrix = ScoringMatrix(features, AUDIO_DIMS, precision)
+    rows = matrix.rows(np.array([0, 7, 42]))
+
+    assert rows.shape == (3, features.shape[1])
+    np.testing.assert_allclose(
+        np.sqrt(rows.multiply(rows).sum(axis=1)).A1, 1.0, atol=1e-3
+    )
+
+
+def test_quantized_keeps_audio_as_float16(features):
+    matrix = ScoringMatrix(features, AUDIO_DIMS, "quantized")
+
+    assert matrix.audio.dtype == np.float16
+    assert matrix.audio.shape == (AUDIO_DIMS, features.shape[0])
+    assert matrix.sparse.shape == (features.shape[0], features.shape[1] - AUDIO_DIMS)
+    assert matrix.nbytes < ScoringMatrix(features, AUDIO_DIMS, "float32").nbytes
+
+
+def test_unknown_precision_is_rejected(features):
+    with pytest.raises(ValueError):
+        ScoringMatrix(features, AUDIO_DIMS, "int8")
+
+
+def test_loaded_model_keeps_only_the_scoring_matrix(generator):
+    assert generator.feature_matrix is None
+    assert generator.scoring_matrix is not None
+    assert not any(
+        section.startswith("feature_matrix") for section in generator.memory_report
+    )
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from app.ml.catalog_index import CatalogIndex
+
+
+@pytest.fixture
+def catalog():
+    """Artists with 3, 2, 1 and 1 tracks, and a few genres"""
+    return CatalogIndex(
+        pd.DataFrame(
+            {
+                "artist": [
+                    "The Beatles",
+                    "the  beatles",
+                    "Beach House",
+                    "Bee Gees",
+                    "Bee Gees; The Beatles",
+                    "Miles Davis",
+                ],
+                "genre": ["rock", "rock", "dream pop", "disco", "pop", "jazz|bebop"],
+            }
+        )
+    )
+
+
+def test_misspelt_terms_are_found_by_trigram_similarity(catalog):
+    assert catalog.artists.top_similar("the beatels", 5)[0] == ("The Beatles", 3)
+    assert catalog.artists.top_similar("miles davies", 5)[0] == ("Miles Davis", 1)
+    assert catalog.artists.top_similar("xyzzy", 5) == []
+
+
+def test_suggestions_rank_prefix_hits_by_track_count(catalog):
+    suggestions = catalog.suggest("b", 10)
+
+    assert [(s["name"], s["type"]) for s in suggestions][:3] == [
+        ("Bee Gees", "artist"),
+        ("Beach House", "artist"),
+        ("bebop", "genre"),
+    ]
+    assert [s["track_count"] for s in suggestions][:3] == [2, 1, 1]
+
+
+def test_suggestions_fill_with_typo_matches(catalog):
+    suggestions = catalog.suggest("Mils Davis", 5)
+
+    assert suggestions[0] == {"name": "Miles Davis", "type": "artist", "track_count": 1}
+
+
+def test_suggestions_respect_the_limit(catalog):
+    assert len(catalog.suggest("b", 2)) == 2
+    assert catalog.suggest("   ", 10) == []
+
+
+@pytest.fixture
+def client(app, generator, monkeypatch):
+    from app.routes import playlist as routes
+
+    monkeypatch.setattr(routes.registry, "_active", generator)
+    return app.test_client()
+
+
+def suggest(client, query: str, **params) -> list[dict]:
+    response = client.get("/api/playlists/suggest", query_string={"q": query, **params})
+    assert response.status_code == 200
+    return response.get_json()["suggestions"]
+
+
+def test_suggest_endpoint_prefix_hits(client):
+    suggestions = suggest(client, "Artist 1")
+
+    names = [s["name"] for s in suggestions]
+    assert "Artist 1" in names
+    assert all(name.startswith("Artist 1") for name in names)
+    counts = [s["track_count"] for s in suggestions]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_suggest_endpoint_typo_hits(client):
+    suggestions = suggest(client, "clasical")
+
+    assert suggestions[0]["name"] == "classical"
+    assert suggestions[0]["type"] == "genre"
+
+
+def test_suggest_endpoint_empty_query_and_limit(client):
+    assert suggest(client, "") == []
+    assert len(suggest(client, "Artist", limit=3)) == 3
@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+from app.ml.taste import TasteProfile
+
+
+def rows(*dense_rows) -> csr_matrix:
+    return csr_matrix(np.array(dense_rows, dtype=np.float32))
+
+
+def test_add_sums_audio_and_sparse_columns():
+    profile = TasteProfile.empty("v1", audio_dims=2)
+    profile.add(rows([1, 0, 0, 2, 0], [0, 1, 0, 1, 3]), decay=1.0, max_components=8)
+
+    assert profile.audio.tolist() == [1, 1]
+    assert profile.indices.tolist() == [3, 4]
+    assert profile.values.tolist() == [3, 3]
+    assert profile.weight == 2
+
+
+def test_decay_favours_recent_saves():
+    profile = TasteProfile.empty("v1", audio_dims=1)
+    profile.add(rows([1, 1, 0]), decay=0.5, max_components=8)
+    profile.add(rows([0, 0, 1]), decay=0.5, max_components=8)
+
+    assert profile.audio.tolist() == [0.5]
+    assert profile.values.tolist() == [0.5, 1.0]
+    assert profile.weight == 1.5
+
+
+def test_only_the_largest_components_are_kept():
+    profile = TasteProfile.empty("v1", audio_dims=0)
+    profile.add(rows([1, 5, 2, 4]), decay=1.0, max_components=2)
+
+    assert profile.indices.tolist() == [1, 3]
+    assert profile.values.tolist() == [5, 4]
+
+
+def test_columns_round_trip():
+    profile = TasteProfile.empty("v1", audio_dims=2)
+    profile.add(rows([1, 0, 0, 2]), decay=1.0, max_components=8)
+
+    restored = TasteProfile.from_columns(**profile.to_columns())
+    assert restored.model_version == "v1"
+    assert restored.weight == profile.weight
+    assert (restored.vector(4) != profile.vector(4)).nnz == 0
+
+
+def taste_for(generator, genre: str) -> TasteProfile:
+    df = generator.tracks_df
+    saved = df.loc[df["genre"] == genre, "catalog_id"].head(10)
+    return generator.update_taste(None, saved)
+
+
+def test_personalised_requests_share_the_cached_pool(generator):
+    preferences = {"genres": ["rock"], "artists": [], "features": {}}
+    taste = taste_for(generator, "jazz")
+
+    generator.recommend(preferences, 10)
+    generator.recommend(preferences, 10, taste=taste)
+    generator.recommend(preferences, 10, taste=taste)
+
+    stats = generator.result_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_blend_reranks_the_pool_towards_the_profile(generator):
+    taste = taste_for(generator, "jazz")
+    genres = generator.tracks_df["genre"].to_numpy()
+    pool = generator._score_candidates(["Artist 3"], [], {}, 60)
+
+    rows, scores = generator._blend_taste(pool, taste, taste_weight=1.0)
+    assert sorted(rows.tolist()) == sorted(pool[0].tolist())
+    assert np.all(np.diff(scores) <= 0)
+    assert genres[rows[0]] == "jazz"
+
+
+def test_taste_alone_scores_the_catalog(generator):
+    taste = taste_for(generator, "classical")
+    picked = generator.recommend({}, 10, taste=taste)
+
+    assert len(picked) == 10
+    genres = generator.tracks_df["genre"].to_numpy()[picked]
+    assert (genres == "classical").sum() > len(picked) / 2
+
+
+def test_profiles_for_another_model_are_ignored(generator, monkeypatch):
+    taste = taste_for(generator, "jazz")
+    taste.model_version = "another"
+
+    def blend(*args):
+        raise AssertionError("stale profile blended")
+
+    monkeypatch.setattr(generator, "_blend_taste", blend)
+    preferences = {"genres": ["rock"], "artists": [], "features": {}}
+    assert len(generator.recommend(preferences, 10, taste=taste)) == 10
+
+
+@pytest.fixture
+def saved_user(app, generator, monkeypatch):
+    """A user with one saved playlist of jazz tracks, and the model live"""
+    from app.models import Playlist, PlaylistTrack, Track, User, db
+    from app.routes import playlist as routes
+
+    monkeypatch.setattr(routes.registry, "_active", generator)
+    df = generator.tracks_df
+    jazz = df[df["genre"] == "jazz"].head(10)
+
+    with app.app_context():
+        user = User(username="taste", email="taste@example.com", password="pw")
+        playlist = Playlist(name="Jazz", user=user)
+        for position, track in enumerate(jazz.itertuples()):
+            row = Track(
+                catalog_id=int(track.catalog_id),
+                title=track.title,
+                artist=track.artist,
+            )
+            playlist.tracks.append(PlaylistTrack(track=row, position=position))
+        db.session.add(user)
+        db.session.commit()
+        yield user.id
+
+
+def test_generate_never_rebuilds_a_stale_profile(app, generator, saved_user):
+    from app.models import UserTaste, db
+    from app.routes.playlist import load_taste
+
+    with app.app_context():
+        assert load_taste(saved_user, generator) is None
+        assert db.session.get(UserTaste, saved_user) is None
+
+        profile = load_taste(saved_user, generator, rebuild=True)
+        assert profile is not None and profile.weight == 10
+        row = db.session.get(UserTaste, saved_user)
+        assert row.model_version == generator.model_version
+        assert load_taste(saved_user, generator).weight == 10
+
+
+def test_saving_rebuilds_a_stale_profile(app, generator, saved_user):
+    from app.models import UserTaste, db
+    from app.routes.playlist import update_taste
+
+    df = generator.tracks_df
+    track = df[df["genre"] == "rock"].iloc[0]
+    with app.app_context():
+        db.session.add(UserTaste(user_id=saved_user, model_version="another"))
+        db.session.commit()
+
+        update_taste(saved_user, [{"id": str(track["catalog_id"])}])
+        db.session.commit()
+
+        row = db.session.get(UserTaste, saved_user)
+        assert row.model_version == generator.model_version
+        # Every saved track, plus the playlist being saved
+        assert row.weight == 11
+
+
+def test_saving_leaves_profiles_alone_when_personalisation_is_off(
+    app, generator, saved_user, monkeypatch
+):
+    from app.models import UserTaste, db
+    from app.routes import playlist as routes
+
+    monkeypatch.setattr(routes, "taste_weight", 0.0)
+    track = generator.tracks_df.iloc[0]
+    with app.app_context():
+        routes.update_taste(saved_user, [{"id": str(track["catalog_id"])}])
+        db.session.commit()
+
+        assert db.session.get(UserTaste, saved_user) is None